@@ -0,0 +1,248 @@
+from constantes import (DATA_PATH, DATA_OUT_PATH, PROCESSED_DATA_PATH, MANIFIESTO_INDIVIDUAL, MANIFIESTO_HOGAR,
+                        REGISTRO_PROCESADO_INDIVIDUAL, REGISTRO_PROCESADO_HOGAR)
+from concurrent.futures import ProcessPoolExecutor, wait
+from functools import partial
+import multiprocessing
+import codecs
+import csv
+import io
+import json
+import time
+from funcionalidad import creacion_datasets, registrar_archivo, contar_registros, fin_de_linea
+from procesamiento import actualizar_cache_columnas, actualizar_cubo, procesar_archivo, procesar_data, memoria_pico_mb
+from procesamiento import indexar_procesado, fuentes_del_manifiesto, tiene_filas
+
+
+def lineas_de_archivos(archivos, salida=None, manifiesto=None):
+    """
+    Devuelve una por una las líneas del dataset unificado, leyéndolas directamente de los
+    archivos trimestrales: el encabezado del primer archivo y luego el cuerpo de cada uno.
+
+    Las líneas son las mismas que se leerían del archivo que arma creacion_datasets con
+    copia_directa=True (incluido el BOM del encabezado), con fin de línea '\\n'.
+
+    Parámetros:
+    -----------
+    archivos : list of Path
+        Archivos .txt trimestrales, en el orden en que se unen.
+    salida : file, opcional
+        Si se indica, archivo abierto en modo binario donde se escribe además el dataset unificado,
+        byte por byte igual al de creacion_datasets con copia_directa=True.
+    manifiesto : dict, opcional
+        Manifiesto del archivo unificado. Se completa a medida que se copian los archivos.
+
+    Comportamiento:
+    ---------------
+    - Los archivos cuyo encabezado difiere del primero se copian fila por fila con csv.
+    - Si un archivo no se encuentra o no tiene permisos de lectura, imprime un aviso y continúa.
+    """
+
+    encabezado = None
+    for archivo in archivos:
+        try:
+            with archivo.open('rb') as f:
+                linea_encabezado = f.readline()
+                primera = linea_encabezado.rstrip(b'\r\n')
+                if encabezado is None:
+                    encabezado = primera
+                    if manifiesto is not None:
+                        manifiesto['encabezado'] = encabezado.decode('utf-8')
+                    if salida is not None:
+                        salida.write(codecs.BOM_UTF8 + encabezado + fin_de_linea(linea_encabezado))
+                    yield (codecs.BOM_UTF8 + encabezado).decode('utf-8') + '\n'
+
+                inicio = salida.tell() if salida is not None else 0
+                filas = 0
+                if primera != encabezado:
+                    print(f"El encabezado de {archivo.name} no coincide con el del primer archivo. Se copia fila por fila.")
+                    for campos in csv.reader(io.TextIOWrapper(f, encoding='utf-8'), delimiter=';'):
+                        linea = io.StringIO()
+                        csv.writer(linea, delimiter=';').writerow(campos)
+                        linea = linea.getvalue()
+                        if salida is not None:
+                            salida.write(linea.encode('utf-8'))
+                        filas += 1
+                        yield linea[:-2] + '\n'
+                else:
+                    comillas = 0
+                    for linea in f:
+                        if not linea.endswith(b'\n'): # El último archivo puede no terminar en salto de línea
+                            linea += fin_de_linea(linea_encabezado)
+                        if salida is not None:
+                            salida.write(linea)
+                        registros, comillas = contar_registros(linea, comillas)
+                        filas += registros
+                        texto = linea.decode('utf-8')
+                        yield texto[:-2] + '\n' if texto.endswith('\r\n') else texto
+
+                if manifiesto is not None:
+                    registrar_archivo(manifiesto, archivo, filas, inicio, salida.tell())
+        except FileNotFoundError:
+            print(f"Un archivo {archivo} fue eliminado antes de poder leerlo. Se omite.")
+        except PermissionError:
+            print(f"No se tienen permisos para leer el archivo {archivo}. Se omite.")
+
+
+INTERVALO_PROGRESO = 0.5 # segundos entre dos lecturas de los avisos de progreso de los procesos
+
+
+def actualizar_dataset(indicador=None, guardar_unificado=False, motor="columnar", tamanio_bloque=None,
+                       incremental=False, progreso=None):
+    """
+    Une los archivos trimestrales de individuos u hogares y los procesa en una sola pasada,
+    escribiendo directamente el archivo de processed_data.
+
+    Equivale a creacion_datasets(indicador, copia_directa=True) seguido de procesar_data(indicador),
+    pero sin escribir y volver a leer el archivo unificado intermedio.
+
+    Parámetros:
+    -----------
+    indicador : str
+        'I' o 'i' para individuos, 'H' o 'h' para hogares.
+    guardar_unificado : bool, opcional
+        Si es True también se escribe el archivo unificado de data_out (con su manifiesto),
+        en la misma pasada.
+    motor : str, opcional
+        Motor de procesamiento: 'columnar' (por defecto) o 'filas'.
+    tamanio_bloque : int, opcional
+        Cantidad de filas que se procesan por vez.
+    incremental : bool, opcional
+        Si es True, en lugar de la pasada única se agregan al archivo unificado solo los archivos
+        trimestrales nuevos y se procesan solo los períodos nuevos o modificados
+        (creacion_datasets y procesar_data con incremental=True). Siempre escribe data_out.
+    progreso : callable, opcional
+        Función progreso(etapa, filas, bytes_leidos) a la que se informa el avance: en modo
+        incremental, los archivos unidos ('union') y las filas procesadas ('procesamiento');
+        en la pasada única, las filas leídas de los archivos trimestrales ('procesamiento').
+        Al final se informa la etapa 'almacenes', sin filas, mientras se regeneran la caché
+        de columnas y el cubo.
+
+    Retorna:
+    --------
+    float
+        Segundos que llevó la actualización, o None si no se pudo realizar (en ese caso,
+        y también si los archivos trimestrales no tienen filas, se conserva el procesado anterior).
+    """
+
+    indicadores = ["I","H","i","h"]
+
+    if indicador not in indicadores:
+        print('Ingrese un indicador/Ingrese un indicador válido.')
+        return
+    elif motor not in ("filas", "columnar"):
+        print("Ingrese un motor adecuado ('filas' o 'columnar').")
+        return
+
+    for carpeta in (DATA_PATH, PROCESSED_DATA_PATH) + ((DATA_OUT_PATH,) if guardar_unificado else ()):
+        if not carpeta.exists():
+            print(f"La carpeta {carpeta} no existe. Verificá la estructura del proyecto.")
+            return
+
+    inicio = time.perf_counter()
+    if incremental:
+        if creacion_datasets(indicador, copia_directa=True, incremental=True, progreso=progreso) is None:
+            return
+        if not procesar_data(indicador, motor=motor, tamanio_bloque=tamanio_bloque, incremental=True,
+                             cache=True, cubo=True, progreso=progreso):
+            return
+        return time.perf_counter() - inicio
+
+    nombre = "individual" if indicador.upper() == "I" else "hogar"
+    archivos = [archivo for archivo in DATA_PATH.glob('*.txt') if f"usu_{nombre}" in archivo.name.lower()]
+    if not archivos:
+        print(f"No hay archivos de {nombre} en {DATA_PATH}.")
+        return
+
+    procesado_csv = PROCESSED_DATA_PATH / f'{nombre}_procesado.csv'
+    temporal_csv = PROCESSED_DATA_PATH / f'{nombre}_procesado.csv.tmp'
+    ruta_manifiesto = MANIFIESTO_INDIVIDUAL if indicador.upper() == "I" else MANIFIESTO_HOGAR
+    try:
+        with temporal_csv.open("w", newline="", encoding="utf-8") as procesado:
+            if guardar_unificado:
+                manifiesto = {'modo': 'directo', 'encabezado': None, 'archivos': []}
+                with (DATA_OUT_PATH / f"usu_{nombre}.csv").open('wb') as salida:
+                    procesar_archivo(lineas_de_archivos(archivos, salida, manifiesto), procesado,
+                                     indicador.upper(), motor, tamanio_bloque, progreso)
+                ruta_manifiesto.write_text(json.dumps(manifiesto, indent=4), encoding='utf-8')
+            else:
+                procesar_archivo(lineas_de_archivos(archivos), procesado, indicador.upper(), motor, tamanio_bloque,
+                                 progreso)
+        if not tiene_filas(temporal_csv):
+            temporal_csv.unlink()
+            print(f"Los archivos de {nombre} no tienen filas. Se conserva el archivo procesado anterior.")
+            return
+        temporal_csv.replace(procesado_csv)
+        # El registro de períodos de procesar_data deja de corresponder al nuevo archivo
+        (REGISTRO_PROCESADO_INDIVIDUAL if indicador.upper() == "I" else REGISTRO_PROCESADO_HOGAR).unlink(missing_ok=True)
+        # Los archivos de origen solo se conocen si se escribió el unificado con su manifiesto
+        indexar_procesado(indicador, fuentes_del_manifiesto(DATA_OUT_PATH / f"usu_{nombre}.csv", ruta_manifiesto)
+                          if guardar_unificado else None)
+        if progreso is not None:
+            progreso("almacenes", 0, 0)
+        actualizar_cache_columnas(indicador)
+        actualizar_cubo(indicador)
+    except Exception as e:
+        print(F'Error al procesar los datos. {e}')
+        return
+
+    segundos = time.perf_counter() - inicio
+    print(f"{procesado_csv.name}: {segundos:.2f} s")
+    pico = memoria_pico_mb()
+    if pico is not None:
+        print(f'Memoria pico del proceso: {pico:.1f} MB')
+    return segundos
+
+
+def avisar_progreso(cola, indicador, etapa, filas, leidos):
+    """
+    Pasa a la cola un aviso de progreso de actualizar_dataset, junto con el dataset al que corresponde.
+    Es la función de progreso de cada proceso de actualizar_datos.
+    """
+
+    cola.put((indicador, etapa, filas, leidos))
+
+
+def actualizar_datos(guardar_unificado=False, motor="columnar", incremental=False, progreso=None):
+    """
+    Actualiza los datasets procesados de individuos y de hogares al mismo tiempo,
+    cada uno en su propio proceso, con actualizar_dataset.
+
+    Parámetros:
+    -----------
+    guardar_unificado : bool, opcional
+        Si es True también se escriben los archivos unificados de data_out.
+    motor : str, opcional
+        Motor de procesamiento: 'columnar' (por defecto) o 'filas'.
+    incremental : bool, opcional
+        Si es True solo se unen y procesan los períodos nuevos o modificados.
+    progreso : callable, opcional
+        Función progreso(indicador, etapa, filas, bytes_leidos) que se llama en este proceso,
+        cada INTERVALO_PROGRESO segundos, con los avisos de los dos procesos (ver actualizar_dataset).
+
+    Retorna:
+    --------
+    dict
+        Segundos que llevó cada dataset ('I' y 'H'), o None si no se pudo actualizar.
+    """
+
+    # La app llama a esta función desde un hilo: con 'fork' los procesos podrían heredar locks tomados por otros hilos
+    contexto = multiprocessing.get_context("spawn")
+    if progreso is None:
+        with ProcessPoolExecutor(max_workers=2, mp_context=contexto) as pool:
+            tareas = {indicador: pool.submit(actualizar_dataset, indicador, guardar_unificado, motor, None, incremental)
+                      for indicador in ("I", "H")}
+            return {indicador: tarea.result() for indicador, tarea in tareas.items()}
+
+    # Los procesos no pueden llamar a progreso directamente: dejan sus avisos en una cola compartida
+    with contexto.Manager() as manager, ProcessPoolExecutor(max_workers=2, mp_context=contexto) as pool:
+        cola = manager.Queue()
+        tareas = {indicador: pool.submit(actualizar_dataset, indicador, guardar_unificado, motor, None, incremental,
+                                         partial(avisar_progreso, cola, indicador))
+                  for indicador in ("I", "H")}
+        pendientes = set(tareas.values())
+        while True:
+            pendientes = wait(pendientes, timeout=INTERVALO_PROGRESO).not_done
+            while not cola.empty():
+                progreso(*cola.get())
+            if not pendientes:
+                return {indicador: tarea.result() for indicador, tarea in tareas.items()}
@@ -0,0 +1,234 @@
+from constantes import CACHE_COLUMNAS_PATH
+from pathlib import Path
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+TAMANIO_BLOQUE_CACHE = 20000 # filas del CSV que se codifican por vez
+TIPOS_ENTEROS = (np.int8, np.int16, np.int32, np.int64)
+
+
+def carpeta_cache(archivo_csv):
+    """
+    Devuelve la carpeta donde se guarda la caché de columnas de un CSV procesado.
+    """
+
+    return CACHE_COLUMNAS_PATH / Path(archivo_csv).stem
+
+
+def origen(archivo_csv):
+    """
+    Datos del CSV (ruta, tamaño y fecha de modificación) con los que se controla si la caché está al día.
+    """
+
+    estado = Path(archivo_csv).stat()
+    return {"archivo": str(Path(archivo_csv).resolve()), "tamanio": estado.st_size, "mtime": estado.st_mtime}
+
+
+def es_entero(texto):
+    """
+    Indica si un texto es un entero escrito sin ceros a la izquierda, espacios ni signo '+',
+    es decir, si se puede guardar como número y volver a obtener exactamente el mismo texto.
+    """
+
+    return texto.lstrip("-").isdigit() and str(int(texto)) == texto
+
+
+def tipo_entero(minimo, maximo):
+    """
+    Devuelve el tipo entero de NumPy más chico que admite los valores entre minimo y maximo.
+    """
+
+    for tipo in TIPOS_ENTEROS:
+        if np.iinfo(tipo).min <= minimo and maximo <= np.iinfo(tipo).max:
+            return tipo
+    return np.int64
+
+
+def escribir_cache(archivo_csv, destino=None):
+    """
+    Guarda cada columna de un CSV procesado como un arreglo binario de NumPy (.npy),
+    para poder leerlas después con np.memmap sin volver a parsear el CSV.
+
+    Parameters
+    ----------
+    archivo_csv : Path
+        Archivo procesado (individual_procesado.csv o hogar_procesado.csv).
+    destino : Path, optional
+        Carpeta de la caché. Por defecto, la que devuelve carpeta_cache.
+
+    Returns
+    -------
+    int
+        Cantidad de filas guardadas.
+
+    -----
+    Las columnas cuyos valores son todos enteros se guardan como números, con el tipo entero
+    más chico que los admite. El resto se guarda como códigos enteros chicos (uint8, uint16 o int32)
+    junto con la lista de categorías, en columnas.json. En los dos casos el texto original
+    se puede recuperar exactamente.
+    El CSV se lee por bloques, así que la memoria usada depende del tamaño de una columna
+    y no del archivo completo. La caché se arma en una carpeta temporal que reemplaza a la anterior.
+    """
+
+    destino = carpeta_cache(archivo_csv) if destino is None else destino
+    temporal = destino.with_name(destino.name + ".tmp")
+    shutil.rmtree(temporal, ignore_errors=True)
+    temporal.mkdir(parents=True)
+
+    columnas = None
+    categorias = []
+    filas = 0
+    for bloque in pd.read_csv(archivo_csv, sep=";", dtype=str, na_filter=False, encoding="utf-8",
+                              chunksize=TAMANIO_BLOQUE_CACHE):
+        if columnas is None:
+            columnas = list(bloque.columns)
+            categorias = [{} for _ in columnas]
+        for i, col in enumerate(columnas):
+            locales, unicos = pd.factorize(bloque[col].to_numpy(), use_na_sentinel=False)
+            # Las filas con menos campos quedan con NaN, que se guarda como texto vacío
+            tabla = np.array([categorias[i].setdefault(valor if isinstance(valor, str) else "", len(categorias[i]))
+                              for valor in unicos], dtype=np.int32)
+            with open(temporal / f"{i}.codigos", "ab") as parcial:
+                tabla[locales].tofile(parcial)
+        filas += len(bloque)
+
+    metadatos = dict(origen(archivo_csv), filas=filas, columnas={})
+    for i, col in enumerate(columnas or []):
+        parcial = temporal / f"{i}.codigos"
+        codigos = np.fromfile(parcial, dtype=np.int32)
+        lista = list(categorias[i])
+        if lista and all(es_entero(valor) for valor in lista):
+            valores = np.array([int(valor) for valor in lista], dtype=np.int64)
+            arreglo = valores[codigos].astype(tipo_entero(valores.min(), valores.max()))
+            metadatos["columnas"][col] = {"archivo": f"{i}.npy", "categorias": None}
+        else:
+            tipo = np.uint8 if len(lista) <= 256 else np.uint16 if len(lista) <= 65536 else np.int32
+            arreglo = codigos.astype(tipo)
+            metadatos["columnas"][col] = {"archivo": f"{i}.npy", "categorias": lista}
+        np.save(temporal / f"{i}.npy", arreglo)
+        parcial.unlink()
+
+    # columnas.json se escribe al final: sin él la caché no se considera válida
+    (temporal / "columnas.json").write_text(json.dumps(metadatos), encoding="utf-8")
+    anterior = destino.with_name(destino.name + ".anterior")
+    if destino.exists():
+        destino.rename(anterior)
+    temporal.rename(destino)
+    shutil.rmtree(anterior, ignore_errors=True)
+    return filas
+
+
+def leer_metadatos(archivo_csv):
+    """
+    Devuelve el contenido de columnas.json si la caché corresponde a la versión actual del CSV, o None.
+    """
+
+    try:
+        metadatos = json.loads((carpeta_cache(archivo_csv) / "columnas.json").read_text(encoding="utf-8"))
+        vigente = {clave: metadatos[clave] for clave in ("archivo", "tamanio", "mtime")} == origen(archivo_csv)
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return None
+    return metadatos if vigente else None
+
+
+def cache_vigente(archivo_csv):
+    """
+    Indica si la caché de columnas fue generada a partir de la versión actual del CSV.
+    """
+
+    return leer_metadatos(archivo_csv) is not None
+
+
+def cargar_columnas(archivo_csv, nombres):
+    """
+    Abre columnas de la caché de un CSV procesado como arreglos mapeados en memoria (np.memmap).
+
+    Parameters
+    ----------
+    archivo_csv : Path
+        Archivo procesado del que se generó la caché.
+    nombres : list of str
+        Columnas a abrir.
+
+    Returns
+    -------
+    dict or None
+        Para cada nombre, una tupla (valores, categorias): si categorias es None, valores son los
+        números de la columna; si no, valores son códigos y categorias[codigo] es el texto original.
+        Devuelve None si la caché no existe, no está al día o le falta alguna de las columnas.
+
+    -----
+    Los arreglos son de solo lectura y se leen del disco recién cuando se usan, por lo que
+    abrirlos no cuesta nada y varios procesos comparten las mismas páginas del sistema operativo.
+    """
+
+    metadatos = leer_metadatos(archivo_csv)
+    if metadatos is None or any(nombre not in metadatos["columnas"] for nombre in nombres):
+        return None
+    carpeta = carpeta_cache(archivo_csv)
+    modo = "r" if metadatos["filas"] else None # Un arreglo vacío no se puede mapear
+    columnas = {}
+    for nombre in nombres:
+        datos = metadatos["columnas"][nombre]
+        columnas[nombre] = (np.load(carpeta / datos["archivo"], mmap_mode=modo), datos["categorias"])
+    return columnas
+
+
+def enteros(columna):
+    """
+    Devuelve los valores de una columna de la caché como enteros (int64).
+    Lanza ValueError si algún valor no es un número entero, igual que int().
+    """
+
+    valores, categorias = columna
+    if categorias is None:
+        return valores.astype(np.int64)
+    return np.array([int(valor) for valor in categorias], dtype=np.int64)[valores]
+
+
+def mascara(columna, *textos, recortar=False):
+    """
+    Devuelve un arreglo booleano que indica qué filas de la columna tienen alguno de los textos dados.
+    Si recortar es True, los valores se comparan sin los espacios de los extremos.
+    """
+
+    valores, categorias = columna
+    if categorias is None:
+        buscados = [int(texto) for texto in textos if es_entero(texto)]
+    else:
+        buscados = [codigo for codigo, valor in enumerate(categorias) if (valor.strip() if recortar else valor) in textos]
+    return np.isin(valores, buscados)
+
+
+def sumar_por(claves, pesos, filtro=None):
+    """
+    Suma los pesos agrupando las filas por los valores de una o más columnas enteras.
+
+    Parameters
+    ----------
+    claves : list of np.ndarray
+        Columnas por las que se agrupa (por ejemplo, enteros(ANO4) y enteros(TRIMESTRE)).
+    pesos : np.ndarray
+        Valores enteros a sumar (por ejemplo, PONDERA).
+    filtro : np.ndarray, optional
+        Arreglo booleano con las filas que se tienen en cuenta. Por defecto, todas.
+
+    Returns
+    -------
+    dict
+        {(valor_clave_1, ...): suma} con enteros de Python, en el orden en que cada
+        combinación aparece por primera vez en el archivo (el mismo que tendría un diccionario
+        armado recorriendo las filas).
+    """
+
+    if filtro is not None:
+        claves = [clave[filtro] for clave in claves]
+        pesos = pesos[filtro]
+    if len(pesos) == 0:
+        return {}
+    unicos, primeras, inversa = np.unique(np.column_stack(claves), axis=0, return_index=True, return_inverse=True)
+    sumas = np.zeros(len(unicos), dtype=np.int64)
+    np.add.at(sumas, inversa.reshape(-1), pesos)
+    return {tuple(int(valor) for valor in unicos[i]): int(sumas[i]) for i in np.argsort(primeras, kind="stable")}
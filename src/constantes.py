@@ -5,9 +5,16 @@ DATA_PATH = PROJECT_PATH / "files"
 DATA_OUT_PATH = PROJECT_PATH / "data_out"
 DATA_HOGAR = DATA_OUT_PATH / "usu_hogar.csv"
 DATA_INDIVIDUAL = DATA_OUT_PATH / "usu_individual.csv"
+MANIFIESTO_HOGAR = DATA_OUT_PATH / "usu_hogar_manifiesto.json"
+MANIFIESTO_INDIVIDUAL = DATA_OUT_PATH / "usu_individual_manifiesto.json"
 PROCESSED_DATA_PATH = PROJECT_PATH / "processed_data"
 PROCESSED_DATA_INDIVIDUAL = PROCESSED_DATA_PATH / "individual_procesado.csv"
 PROCESSED_DATA_HOGAR = PROCESSED_DATA_PATH / "hogar_procesado.csv"
+REGISTRO_PROCESADO_INDIVIDUAL = PROCESSED_DATA_PATH / "individual_procesado.json"
+REGISTRO_PROCESADO_HOGAR = PROCESSED_DATA_PATH / "hogar_procesado.json"
+CACHE_COLUMNAS_PATH = PROCESSED_DATA_PATH / "columnas"
+CUBO_PATH = PROCESSED_DATA_PATH / "cubo"
+INDICE_HOGARES_PATH = PROCESSED_DATA_PATH / "hogares"
 DATA_EPH = PROJECT_PATH / "data_EPH"
 COORDS = DATA_EPH / "aglomerados_coordenadas.json"
 CANASTA = DATA_EPH / "valores-canasta-basica-alimentos-canasta-basica-total-mensual-2016.csv"
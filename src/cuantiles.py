@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+MEDIANA = (0.5,)
+CUARTILES = (0.25, 0.5, 0.75)
+DECILES = tuple(i / 10 for i in range(1, 10))
+CELDAS_HISTOGRAMA = 4_000_000 # tamaño máximo (grupos x valores distintos) del histograma para valores enteros
+
+
+def nombre_cuantil(cuantil):
+    """
+    Devuelve el nombre de la columna de un cuantil: 'P10', 'P25', 'P50', ...
+    """
+
+    return f"P{cuantil * 100:g}"
+
+
+def agrupar(claves):
+    """
+    Numera los grupos que forman una o más columnas de claves.
+
+    Returns
+    -------
+    tuple
+        (grupos, unicos): el número de grupo de cada fila y, para cada columna, el valor
+        de la clave de cada grupo. Los grupos quedan numerados en el orden de sus claves.
+
+    -----
+    Cada columna se codifica por separado con pd.factorize y los códigos se combinan en un
+    único entero por fila, que vuelve a factorizarse. Las claves no pueden tener valores faltantes.
+    """
+
+    codigos = np.zeros(len(next(iter(claves.values()))), dtype=np.int64)
+    distintos = []
+    for columna in claves.values():
+        inversa, valores = pd.factorize(np.asarray(columna), sort=True)
+        codigos = codigos * len(valores) + inversa
+        distintos.append(valores)
+    grupos, combinados = pd.factorize(codigos, sort=True)
+    unicos = []
+    for valores in reversed(distintos):
+        combinados, indice = np.divmod(combinados, len(valores))
+        unicos.append(valores[indice])
+    return grupos, unicos[::-1]
+
+
+def cuantiles_ponderados(valores, pesos, cuantiles=MEDIANA, claves=None):
+    """
+    Calcula la media y los cuantiles ponderados de valores para cada grupo de filas,
+    en una sola pasada sobre todos los grupos juntos.
+
+    Parameters
+    ----------
+    valores : np.ndarray
+        Valores numéricos (por ejemplo, la edad CH06).
+    pesos : np.ndarray
+        Pesos no negativos de cada fila (por ejemplo, PONDERA).
+    cuantiles : sequence of float, optional
+        Cuantiles a calcular, entre 0 (excluido) y 1. Por defecto la mediana; también están
+        CUARTILES y DECILES.
+    claves : dict, optional
+        {nombre: arreglo} con las columnas que definen los grupos (por ejemplo ANO4 y TRIMESTRE).
+        Si es None, todas las filas forman un solo grupo.
+
+    Returns
+    -------
+    pd.DataFrame
+        Una fila por grupo, ordenadas por las claves, con las claves, 'total' (suma de pesos),
+        'media' (media ponderada) y una columna por cuantil (ver nombre_cuantil).
+        Los grupos cuyo peso total es 0 se omiten.
+
+    -----
+    El cuantil q de un grupo es el primer valor, en orden creciente, en el que el peso acumulado
+    del grupo alcanza q veces su peso total; con q = 0.5 es la mediana ponderada que se obtiene
+    ordenando el grupo y buscando con cumsum.
+    Si los valores son enteros con pocos valores distintos (como una edad), se arma un histograma
+    de pesos por grupo y valor con np.bincount y se acumula por filas, sin ordenar.
+    Si no, se ordena una sola vez por (grupo, valor), se acumulan los pesos de todo el arreglo
+    y cada cuantil se ubica con una búsqueda binaria (np.searchsorted) sobre ese acumulado.
+    """
+
+    valores = np.asarray(valores)
+    pesos = np.asarray(pesos)
+    if claves:
+        grupos, unicos = agrupar(claves) if len(valores) else (np.zeros(0, dtype=np.int64), [[] for _ in claves])
+    else:
+        claves, grupos, unicos = {}, np.zeros(len(valores), dtype=np.int64), []
+    cantidad = len(unicos[0]) if claves else int(len(valores) > 0)
+
+    totales = np.bincount(grupos, weights=pesos, minlength=cantidad)
+    medias = np.bincount(grupos, weights=valores * pesos, minlength=cantidad) / np.where(totales == 0, 1, totales)
+
+    resultado = pd.DataFrame({nombre: np.asarray(unico, dtype=np.asarray(claves[nombre]).dtype)
+                              for nombre, unico in zip(claves, unicos)}, index=range(cantidad))
+    resultado["total"] = totales
+    resultado["media"] = medias
+
+    if len(valores) == 0:
+        for cuantil in cuantiles:
+            resultado[nombre_cuantil(cuantil)] = valores
+        return resultado
+
+    minimo, maximo = valores.min(), valores.max()
+    if np.issubdtype(valores.dtype, np.integer) and cantidad * (int(maximo) - int(minimo) + 1) <= CELDAS_HISTOGRAMA:
+        ancho = int(maximo) - int(minimo) + 1
+        histograma = np.bincount(grupos * ancho + (valores - minimo), weights=pesos, minlength=cantidad * ancho)
+        acumulado = np.cumsum(histograma.reshape(cantidad, ancho), axis=1)
+        for cuantil in cuantiles:
+            posiciones = np.argmax(acumulado >= (cuantil * totales)[:, None], axis=1)
+            resultado[nombre_cuantil(cuantil)] = (posiciones + minimo).astype(valores.dtype)
+    else:
+        orden = np.lexsort((valores, grupos))
+        ordenados = valores[orden]
+        acumulado = np.cumsum(pesos[orden])
+        # Inicio de cada grupo en el arreglo ordenado y peso acumulado antes de él
+        inicios = np.searchsorted(grupos[orden], np.arange(cantidad), side="left")
+        previos = np.where(inicios > 0, acumulado[inicios - 1], 0)
+        for cuantil in cuantiles:
+            posiciones = np.searchsorted(acumulado, previos + cuantil * totales, side="left")
+            resultado[nombre_cuantil(cuantil)] = ordenados[np.clip(np.maximum(posiciones, inicios), 0, len(orden) - 1)]
+    return resultado[totales != 0].reset_index(drop=True)
@@ -0,0 +1,158 @@
+from constantes import CUBO_PATH
+from pathlib import Path
+import json
+import shutil
+import tempfile
+import pandas as pd
+
+TAMANIO_BLOQUE_CUBO = 100000 # filas del CSV que se agregan por vez
+DIMENSIONES_INDIVIDUAL = ["ANO4", "TRIMESTRE", "AGLOMERADO", "CH04_str", "GRUPO_EDAD", "NIVEL_ED_str",
+                          "ESTADO", "CONDICION_LABORAL"]
+DIMENSIONES_HOGAR = ["ANO4", "TRIMESTRE", "AGLOMERADO", "IV1", "II7", "MATERIAL_TECHUMBRE",
+                     "CONDICION_DE_HABITABILIDAD"]
+MEDIDAS = ["PONDERA", "FILAS"]
+
+
+def archivo_cubo(archivo_csv):
+    """
+    Devuelve el archivo donde se guarda el cubo de un CSV procesado.
+    """
+
+    return CUBO_PATH / f"{Path(archivo_csv).stem}.csv"
+
+
+def origen(archivo_csv):
+    """
+    Datos del CSV (ruta, tamaño y fecha de modificación) con los que se controla si el cubo está al día.
+    """
+
+    estado = Path(archivo_csv).stat()
+    return {"archivo": str(Path(archivo_csv).resolve()), "tamanio": estado.st_size, "mtime": estado.st_mtime}
+
+
+def grupo_edad(edad):
+    """
+    Devuelve el grupo de edad de 10 años ("0-9", "10-19", ..., "90-99" o "100+"), o None si la edad falta.
+    """
+
+    if pd.isna(edad):
+        return None
+    for inicio in range(0, 100, 10):
+        if inicio <= edad < inicio + 10:
+            return f"{inicio}-{inicio + 9}"
+    return "100+"
+
+
+def escribir_cubo(archivo_csv, destino=None):
+    """
+    Agrega un CSV procesado en un cubo de conteos ponderados: una fila por cada combinación
+    de dimensiones presente en el archivo, con la suma de PONDERA y la cantidad de filas.
+
+    Parameters
+    ----------
+    archivo_csv : Path
+        Archivo procesado (individual_procesado.csv o hogar_procesado.csv).
+    destino : Path, optional
+        Archivo del cubo. Por defecto, el que devuelve archivo_cubo.
+
+    Returns
+    -------
+    int
+        Cantidad de filas del cubo.
+
+    -----
+    Las dimensiones se toman de DIMENSIONES_INDIVIDUAL o DIMENSIONES_HOGAR según las columnas
+    del archivo; GRUPO_EDAD se calcula a partir de CH06. Las combinaciones con valores faltantes
+    también se guardan, y se descartan recién al consultar, igual que en un groupby de pandas.
+    El CSV se lee por bloques y el cubo se escribe primero en un archivo temporal.
+    """
+
+    destino = archivo_cubo(archivo_csv) if destino is None else destino
+    columnas = list(pd.read_csv(archivo_csv, sep=";", nrows=0).columns)
+    if "CH06" in columnas:
+        dimensiones = [col for col in DIMENSIONES_INDIVIDUAL if col in columnas or col == "GRUPO_EDAD"]
+    else:
+        dimensiones = [col for col in DIMENSIONES_HOGAR if col in columnas]
+    leidas = [col for col in columnas if col in dimensiones or col in ("PONDERA", "CH06")]
+
+    parciales = []
+    for bloque in pd.read_csv(archivo_csv, sep=";", usecols=leidas, dtype=str, chunksize=TAMANIO_BLOQUE_CUBO):
+        if "CH06" in bloque:
+            edades = pd.to_numeric(bloque.pop("CH06"))
+            bloque["GRUPO_EDAD"] = edades.map({edad: grupo_edad(edad) for edad in edades.unique()})
+        bloque["PONDERA"] = pd.to_numeric(bloque["PONDERA"])
+        bloque["FILAS"] = 1
+        parciales.append(bloque.groupby(dimensiones, dropna=False, sort=False)[MEDIDAS].sum())
+
+    if parciales:
+        cubo = pd.concat(parciales).groupby(level=dimensiones, dropna=False).sum().reset_index()
+    else:
+        cubo = pd.DataFrame(columns=dimensiones + MEDIDAS)
+
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    # Un temporal propio por escritura: dos actualizaciones a la vez no escriben el mismo archivo
+    with tempfile.NamedTemporaryFile("w", dir=destino.parent, prefix=destino.name, suffix=".tmp", delete=False,
+                                     newline="", encoding="utf-8") as temporal:
+        cubo.to_csv(temporal, sep=";", index=False)
+    # NamedTemporaryFile crea el archivo solo para el dueño: el cubo queda con los permisos del CSV procesado
+    shutil.copymode(archivo_csv, temporal.name)
+    Path(temporal.name).replace(destino)
+    # El origen se escribe al final: sin él el cubo no se considera válido
+    destino.with_suffix(".json").write_text(json.dumps(origen(archivo_csv)), encoding="utf-8")
+    return len(cubo)
+
+
+def cubo_vigente(archivo_csv):
+    """
+    Indica si el cubo fue generado a partir de la versión actual del CSV.
+    """
+
+    try:
+        guardado = json.loads(archivo_cubo(archivo_csv).with_suffix(".json").read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    return guardado == origen(archivo_csv) and archivo_cubo(archivo_csv).exists()
+
+
+def ruta_cubo(archivo_csv):
+    """
+    Devuelve el archivo del cubo de un CSV procesado, o None si no existe o no está al día.
+
+    El cubo no se regenera aquí: lo arma la actualización de los datos (procesar_data con cubo=True,
+    o actualizacion.actualizar_datos), nunca la app mientras dibuja una página.
+    """
+
+    return archivo_cubo(archivo_csv) if cubo_vigente(archivo_csv) else None
+
+
+def consultar_cubo(cubo, por, filtros=None, medida="PONDERA"):
+    """
+    Suma una medida del cubo agrupando por algunas dimensiones (roll-up), después de
+    quedarse con las filas que cumplen los filtros (slice).
+
+    Parameters
+    ----------
+    cubo : pd.DataFrame
+        Cubo leído de ruta_cubo, o las filas del CSV procesado con las mismas columnas
+        (ver cargador.cargar_cubo), que dan el mismo resultado.
+    por : list of str
+        Dimensiones por las que se agrupa, por ejemplo ["GRUPO_EDAD", "CH04_str"].
+    filtros : dict, optional
+        {dimension: valor} o {dimension: lista de valores}, por ejemplo {"ANO4": 2024, "ESTADO": [1, 2]}.
+    medida : str, optional
+        'PONDERA' (población estimada, por defecto) o 'FILAS' (cantidad de registros de la encuesta).
+
+    Returns
+    -------
+    pd.Series
+        La suma de la medida para cada combinación de las dimensiones, ordenada por ellas.
+        Las combinaciones con valores faltantes en alguna dimensión se descartan, como en
+        df.groupby(por)[medida].sum() sobre el archivo procesado, que da el mismo resultado.
+    """
+
+    for dimension, valor in (filtros or {}).items():
+        if isinstance(valor, (list, tuple, set)):
+            cubo = cubo[cubo[dimension].isin(valor)]
+        else:
+            cubo = cubo[cubo[dimension] == valor]
+    return cubo.groupby(por)[medida].sum()
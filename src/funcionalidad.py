@@ -1,8 +1,318 @@
-from constantes import DATA_PATH, DATA_OUT_PATH
+from constantes import DATA_PATH, DATA_OUT_PATH, MANIFIESTO_INDIVIDUAL, MANIFIESTO_HOGAR
+from constantes import PROCESSED_DATA_HOGAR, PROCESSED_DATA_INDIVIDUAL
+from reportes import etapa, reporte, ejecutar_reportes, informar_error, accesor, leer_encabezado
+from indice_periodos import leer_indice
+from indice_hogares import periodos_hogares, cargar_hogares
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import codecs
 import csv
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+import time
+
+TAMANIO_BLOQUE = 1024 * 1024 # bytes que se copian por lectura al unir archivos
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-def creacion_datasets (indicador=None):
+def escribir_filas(filas, salida):
+    """
+    Escribe filas ya separadas en campos en el archivo unificado, con el formato de csv.writer.
+
+    Parámetros:
+    -----------
+    filas : iterable
+        Filas a escribir (listas de campos).
+    salida : file
+        Archivo abierto en modo binario.
+
+    Retorna:
+    --------
+    int
+        Cantidad de filas escritas.
+    """
+
+    texto_salida = io.TextIOWrapper(salida, encoding='utf-8', newline='')
+    writer = csv.writer(texto_salida, delimiter=';')
+    cantidad = 0
+    for line in filas:
+        writer.writerow(line)
+        cantidad += 1
+    texto_salida.flush()
+    texto_salida.detach() # Se libera el archivo sin cerrarlo
+    return cantidad
+
+
+def fin_de_linea(linea):
+    """
+    Devuelve el fin de línea (b'\r\n' o b'\n') con el que termina una línea leída en modo binario.
+    """
+
+    return b'\r\n' if linea.endswith(b'\r\n') else b'\n'
+
+
+def contar_registros(bloque, comillas=0):
+    """
+    Cuenta los registros de CSV que terminan dentro de un bloque de bytes.
+
+    Un salto de línea solo es fin de registro si antes hay una cantidad par de comillas
+    (igual que en procesamiento.dividir_en_rangos), así que un campo entre comillas con
+    saltos de línea no se cuenta como varias filas.
+
+    Parámetros:
+    -----------
+    bloque : bytes
+        Bloque leído del archivo.
+    comillas : int, opcional
+        Comillas leídas desde el último fin de registro, antes de este bloque.
+
+    Retorna:
+    --------
+    tuple
+        (registros, comillas): los registros terminados en el bloque y las comillas leídas
+        desde el último fin de registro, para pasarlas al bloque siguiente.
+    """
+
+    if comillas % 2 == 0 and b'"' not in bloque:
+        registros = bloque.count(b'\n')
+        return registros, comillas if registros == 0 else 0
+    registros = 0
+    partes = bloque.split(b'\n')
+    for parte in partes[:-1]:
+        comillas += parte.count(b'"')
+        if comillas % 2 == 0:
+            registros += 1
+            comillas = 0
+    return registros, comillas + partes[-1].count(b'"')
+
+
+def escribir_encabezado(archivo, salida, copia_directa):
+    """
+    Escribe en el archivo unificado el encabezado del archivo trimestral recibido.
+
+    Parámetros:
+    -----------
+    archivo : Path
+        Primer archivo trimestral que se une.
+    salida : file
+        Archivo unificado abierto en modo binario.
+    copia_directa : bool
+        Si es True el encabezado se copia tal cual; si no, se reescribe con csv.
+
+    Retorna:
+    --------
+    str
+        Primera línea del archivo, sin el salto de línea.
+    """
+
+    with archivo.open('rb') as f:
+        linea = f.readline()
+    encabezado = linea.rstrip(b'\r\n')
+    if copia_directa:
+        salida.write(encabezado + fin_de_linea(linea)) # Mismo fin de línea que las filas copiadas
+    else:
+        escribir_filas(csv.reader([encabezado.decode('utf-8')], delimiter=';'), salida)
+    return encabezado.decode('utf-8')
+
+
+def copiar_archivo_csv(archivo, salida):
+    """
+    Copia las filas de un archivo trimestral (sin su encabezado) leyéndolas y escribiéndolas con csv.
+
+    Parámetros:
+    -----------
+    archivo : Path
+        Archivo .txt trimestral descargado del INDEC.
+    salida : file
+        Archivo de destino abierto en modo binario.
+
+    Retorna:
+    --------
+    int
+        Cantidad de filas copiadas.
+    """
+
+    with archivo.open('r', encoding='utf-8') as f:
+        reader = csv.reader(f, delimiter=';')
+        next(reader)  # El encabezado se escribe una sola vez
+        return escribir_filas(reader, salida)
+
+
+def copiar_archivo_directo(archivo, salida, encabezado):
+    """
+    Copia el cuerpo de un archivo trimestral al archivo unificado en bloques de bytes,
+    sin separar las filas en campos.
+
+    Si el encabezado del archivo no coincide con el del primer archivo unido,
+    las filas se leen y escriben una por una con csv, como en la unificación común.
+
+    Parámetros:
+    -----------
+    archivo : Path
+        Archivo .txt trimestral a copiar.
+    salida : file
+        Archivo unificado abierto en modo binario.
+    encabezado : str
+        Encabezado del primer archivo unido, sin el salto de línea.
+
+    Retorna:
+    --------
+    int
+        Cantidad de filas copiadas.
+    """
+
+    with archivo.open('rb') as f:
+        primera = f.readline()
+        if primera.rstrip(b'\r\n') != encabezado.encode('utf-8'):
+            print(f"El encabezado de {archivo.name} no coincide con el del primer archivo. Se copia fila por fila.")
+            return escribir_filas(csv.reader(io.TextIOWrapper(f, encoding='utf-8'), delimiter=';'), salida)
+
+        filas = 0
+        comillas = 0
+        ultimo = b'\n'
+        while bloque := f.read(TAMANIO_BLOQUE):
+            salida.write(bloque)
+            registros, comillas = contar_registros(bloque, comillas)
+            filas += registros
+            ultimo = bloque[-1:]
+        if ultimo != b'\n': # El último archivo puede no terminar en salto de línea
+            salida.write(fin_de_linea(primera))
+            filas += 1
+        return filas
+
+
+def volcar_archivo(archivo, destino):
+    """
+    Copia las filas de un archivo trimestral (sin su encabezado) a un archivo parcial.
+    Se usa como tarea de cada proceso cuando la unificación se hace en paralelo.
+
+    Parámetros:
+    -----------
+    archivo : Path
+        Archivo .txt trimestral descargado del INDEC.
+    destino : Path
+        Archivo parcial donde se escriben las filas, con el mismo formato que el archivo unificado.
+
+    Retorna:
+    --------
+    tuple
+        (filas, segundos, error). Si el archivo no se pudo leer, error contiene el mensaje a informar.
+    """
+
+    inicio = time.perf_counter()
+    try:
+        with open(destino, 'wb') as parcial:
+            filas = copiar_archivo_csv(archivo, parcial)
+    except FileNotFoundError:
+        return 0, 0, f"Un archivo {archivo} fue eliminado antes de poder leerlo. Se omite."
+    except PermissionError:
+        return 0, 0, f"No se tienen permisos para leer el archivo {archivo}. Se omite."
+    return filas, time.perf_counter() - inicio, None
+
+
+def hash_archivo(archivo):
+    """
+    Calcula el hash SHA-256 del contenido de un archivo, leyéndolo por bloques.
+
+    Parámetros:
+    -----------
+    archivo : Path
+        Archivo a resumir.
+
+    Retorna:
+    --------
+    str
+        Hash en hexadecimal.
+    """
+
+    resumen = hashlib.sha256()
+    with archivo.open('rb') as f:
+        while bloque := f.read(TAMANIO_BLOQUE):
+            resumen.update(bloque)
+    return resumen.hexdigest()
+
+
+def registrar_archivo(manifiesto, archivo, filas, inicio, fin):
+    """
+    Agrega al manifiesto la entrada de un archivo trimestral recién unido.
+
+    Parámetros:
+    -----------
+    manifiesto : dict
+        Manifiesto del archivo unificado.
+    archivo : Path
+        Archivo trimestral unido.
+    filas : int
+        Cantidad de filas que aportó (sin el encabezado).
+    inicio, fin : int
+        Rango de bytes [inicio, fin) que ocupan sus filas en el archivo unificado.
+    """
+
+    estado = archivo.stat()
+    manifiesto['archivos'].append({
+        'nombre': archivo.name,
+        'tamanio': estado.st_size,
+        'mtime': estado.st_mtime,
+        'hash': hash_archivo(archivo),
+        'filas': filas,
+        'inicio': inicio,
+        'fin': fin,
+    })
+
+
+def manifiesto_vigente(ruta_manifiesto, archivos, archivo_salida, modo):
+    """
+    Lee el manifiesto de un archivo unificado y verifica que siga describiendo a los archivos trimestrales.
+
+    Un archivo trimestral ya unido se considera sin cambios si conserva tamaño y fecha de modificación,
+    o si cambió su fecha pero su hash es el mismo.
+
+    Parámetros:
+    -----------
+    ruta_manifiesto : Path
+        Ruta del manifiesto JSON.
+    archivos : list of Path
+        Archivos trimestrales presentes en DATA_PATH.
+    archivo_salida : Path
+        Archivo unificado que describe el manifiesto.
+    modo : str
+        'directo' o 'csv', según cómo se unen los archivos.
+
+    Retorna:
+    --------
+    dict or None
+        El manifiesto si el archivo unificado puede extenderse agregando solo los archivos nuevos,
+        o None si hay que reconstruirlo (no hay manifiesto, cambió el modo, o algún archivo
+        ya unido se modificó o fue eliminado).
+    """
+
+    try:
+        manifiesto = json.loads(ruta_manifiesto.read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if manifiesto.get('modo') != modo or not manifiesto.get('archivos') or not archivo_salida.exists():
+        return None
+    if archivo_salida.stat().st_size != manifiesto['archivos'][-1]['fin']:
+        return None # El archivo unificado fue modificado o quedó incompleto
+
+    actuales = {archivo.name: archivo for archivo in archivos}
+    for entrada in manifiesto['archivos']:
+        archivo = actuales.get(entrada['nombre'])
+        if archivo is None:
+            return None
+        estado = archivo.stat()
+        if estado.st_size == entrada['tamanio'] and estado.st_mtime == entrada['mtime']:
+            continue
+        if estado.st_size != entrada['tamanio'] or hash_archivo(archivo) != entrada['hash']:
+            return None
+        entrada['mtime'] = estado.st_mtime
+    return manifiesto
+
+
+def creacion_datasets (indicador=None, procesos=None, copia_directa=False, incremental=False, progreso=None):
     """
     Unifica todos los datasets descargados de individuos o hogares en un solo archivo CSV.
 
@@ -14,12 +324,39 @@ def creacion_datasets (indicador=None):
         - 'I' o 'i' para datasets de individuos.
         - 'H' o 'h' para datasets de hogares.
         Si no se especifica un indicador válido, la función imprime un mensaje y no realiza acción.
+    procesos : int, opcional
+        Cantidad de procesos con los que se leen los archivos trimestrales en paralelo.
+        Si es None o 1, los archivos se leen uno detrás de otro.
+    copia_directa : bool, opcional
+        Si es True, el cuerpo de cada archivo se copia como bloques de bytes sin procesar las filas.
+        Solo los archivos cuyo encabezado difiere del primero se copian fila por fila.
+        Tiene prioridad sobre procesos.
+    incremental : bool, opcional
+        Si es True y existe un manifiesto vigente, solo se agregan al final del archivo unificado
+        los archivos trimestrales que todavía no fueron unidos.
+    progreso : callable, opcional
+        Función progreso(etapa, filas, bytes_leidos) a la que se informan, cada vez que se termina
+        de unir un archivo trimestral, sus filas y los bytes que ocupan en el archivo unificado
+        (etapa es 'union').
+
+    Retorna:
+    --------
+    dict
+        Tiempo en segundos que llevó leer cada archivo, con el nombre del archivo como clave.
 
     Comportamiento:
     ---------------
     - Verifica que las carpetas de datos (DATA_PATH) y salida (DATA_OUT_PATH) existan.
     - Busca archivos que coincidan con el patrón correspondiente al indicador dado.
     - Concadena todos los archivos encontrados en un único archivo de salida, preservando el encabezado solo una vez.
+    - En modo paralelo cada proceso vuelca su archivo a un parcial y los parciales se unen en el mismo orden
+      que en el modo secuencial, por lo que el archivo resultante es idéntico.
+    - En copia directa las filas conservan el formato del archivo original (comillas y saltos de línea) y el
+      encabezado usa el mismo fin de línea que el primer archivo, mientras que en los otros modos se reescriben con csv. Leídos con csv o pandas, los datos son los mismos.
+    - Guarda junto al archivo unificado un manifiesto (MANIFIESTO_INDIVIDUAL / MANIFIESTO_HOGAR) con nombre,
+      tamaño, fecha de modificación, hash, cantidad de filas y rango de bytes de cada archivo unido.
+    - En modo incremental, si algún archivo ya unido cambió o fue eliminado, se reconstruye todo el archivo.
+    - Imprime el tiempo que llevó cada archivo.
     - En caso de error al leer algún archivo (no encontrado o sin permisos), imprime un aviso y continúa.
     """
     
@@ -39,26 +376,71 @@ def creacion_datasets (indicador=None):
     
         nombre_archivo = "usu_individual" if indicador.upper() == "I" else "usu_hogar"
         archivo_salida = DATA_OUT_PATH / f"{nombre_archivo}.csv"
-        tiene_encabezado = False
-
-        with archivo_salida.open('w', newline='', encoding='utf-8-sig') as salida:
-            writer = csv.writer(salida, delimiter=';')
-            for archivo in DATA_PATH.glob('*.txt'):
-                if nombre_archivo in archivo.name.lower():
+        ruta_manifiesto = MANIFIESTO_INDIVIDUAL if indicador.upper() == "I" else MANIFIESTO_HOGAR
+        archivos = [archivo for archivo in DATA_PATH.glob('*.txt') if nombre_archivo in archivo.name.lower()]
+        modo = "directo" if copia_directa else "csv"
+        tiempos = {}
+
+        manifiesto = manifiesto_vigente(ruta_manifiesto, archivos, archivo_salida, modo) if incremental else None
+        if manifiesto is None:
+            manifiesto = {'modo': modo, 'encabezado': None, 'archivos': []}
+            apertura = 'wb'
+        else:
+            apertura = 'ab'
+        unidos = {entrada['nombre'] for entrada in manifiesto['archivos']}
+        pendientes = [archivo for archivo in archivos if archivo.name not in unidos]
+        if apertura == 'ab':
+            print(f"{len(unidos)} archivo(s) sin cambios. Se agregan {len(pendientes)} archivo(s) nuevo(s).")
+
+        with archivo_salida.open(apertura) as salida:
+            if apertura == 'wb':
+                salida.write(codecs.BOM_UTF8) # Mismo BOM que escribe la codificación 'utf-8-sig'
+
+            if procesos is not None and procesos > 1 and not copia_directa:
+                with tempfile.TemporaryDirectory(dir=DATA_OUT_PATH) as carpeta_temporal:
+                    parciales = [Path(carpeta_temporal) / f"{i}.csv" for i in range(len(pendientes))]
+                    with ProcessPoolExecutor(max_workers=procesos) as pool:
+                        resultados = list(pool.map(volcar_archivo, pendientes, parciales))
+
+                    for archivo, parcial, (filas, segundos, error) in zip(pendientes, parciales, resultados):
+                        if error:
+                            print(error)
+                            continue
+                        if manifiesto['encabezado'] is None:
+                            manifiesto['encabezado'] = escribir_encabezado(archivo, salida, copia_directa)
+                        inicio = salida.tell()
+                        with open(parcial, 'rb') as f:
+                            shutil.copyfileobj(f, salida, TAMANIO_BLOQUE)
+                        registrar_archivo(manifiesto, archivo, filas, inicio, salida.tell())
+                        tiempos[archivo.name] = segundos
+                        if progreso is not None:
+                            progreso("union", filas, salida.tell() - inicio)
+            else:
+                for archivo in pendientes:
+                    inicio_lectura = time.perf_counter()
                     try:
-                        with archivo.open('r', encoding='utf-8') as f:
-                            reader = (csv.reader(f, delimiter=';'))
-                            encabezado = next(reader)  # Leer el encabezado del archivo
-                            if not tiene_encabezado:
-                                writer.writerow(encabezado)
-                                tiene_encabezado = True
-                            for line in reader:
-                                writer.writerow(line)
+                        if manifiesto['encabezado'] is None:
+                            manifiesto['encabezado'] = escribir_encabezado(archivo, salida, copia_directa)
+                        inicio = salida.tell()
+                        if copia_directa:
+                            filas = copiar_archivo_directo(archivo, salida, manifiesto['encabezado'])
+                        else:
+                            filas = copiar_archivo_csv(archivo, salida)
+                        registrar_archivo(manifiesto, archivo, filas, inicio, salida.tell())
+                        tiempos[archivo.name] = time.perf_counter() - inicio_lectura
+                        if progreso is not None:
+                            progreso("union", filas, salida.tell() - inicio)
                     except FileNotFoundError:
                         print(f"Un archivo {archivo} fue eliminado antes de poder leerlo. Se omite.")
                     except PermissionError:
                         print(f"No se tienen permisos para leer el archivo {archivo}. Se omite.") 
 
+        ruta_manifiesto.write_text(json.dumps(manifiesto, indent=4), encoding='utf-8')
+
+        for nombre, segundos in tiempos.items():
+            print(f"{nombre}: {segundos:.2f} s")
+        return tiempos
+
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 #ESTAS FUNCIONES SE USAN EN LOS SIGUIENTES INCISOS
 
@@ -140,24 +522,31 @@ def calcular_fechas(archivocsv):
     Salida:
     Retorna una tupla con cuatro valores enteros: (menor_año, menor_trimestre, mayor_año, mayor_trimestre),
     representando el rango de fechas encontradas en el archivo.
+    Si el archivo tiene su índice de períodos al día (ver indice_periodos.py), el rango sale de ahí,
+    sin leer los datos; si no, se recorre el archivo.
 
     Excepciones:
     FileNotFoundError: Si el archivo CSV no se encuentra.
     Exception: Cubre cualquier otro error inesperado.
     """
-    
+
+    indice = leer_indice(archivocsv)
+    if indice is not None and indice.get("desde") is not None:
+        return (*indice["desde"], *indice["hasta"])
+
     menor_anio = float('inf')
     menor_trimestre = float('inf')
     mayor_anio = float('-inf')
     mayor_trimestre = float('-inf')
 
     try:
+        obtener = accesor(leer_encabezado(archivocsv), ("ANO4", "TRIMESTRE"))
         with open(archivocsv, encoding="utf-8") as f:
             next(f)  # Saltar encabezado
             for linea in f:
-                columnas = linea.strip().split(";")
-                anio = int(columnas[1])
-                trimestre = int(columnas[2])
+                anio, trimestre = obtener(linea.strip().split(";"))
+                anio = int(anio)
+                trimestre = int(trimestre)
                 if anio < menor_anio:
                     menor_anio = anio
                     menor_trimestre = trimestre
@@ -233,9 +622,124 @@ def calcular_fechas_comparadas(archivocsv_hogar, archivocsv_individual):
     return menor_anio, menor_trimestre, mayor_anio, mayor_trimestre
 
 
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# Cada inciso se arma como un reporte de reportes.py: una o más etapas con un acumulador (iniciar, actualizar y
+# finalizar) que recibe las filas de un archivo. Así ejecutar_incisos puede resolver varios incisos con una sola
+# lectura de cada archivo, y cada función de inciso ejecuta solo su propio reporte.
+
+def ejecutar_inciso(reporte_inciso, archivo_hogar=None, archivo_individual=None):
+    """
+    Ejecuta un único reporte y devuelve su resultado (None si el reporte no se pudo armar o falló).
+    """
+
+    if reporte_inciso is None:
+        return None
+    return ejecutar_reportes({"inciso": reporte_inciso}, {"H": archivo_hogar, "I": archivo_individual})["inciso"]
+
+
+# Los incisos que usan un solo trimestre indican qué períodos leer (ver reportes.etapa): con el índice de períodos
+# del archivo procesado se leen solo esas filas en lugar de todo el archivo.
+
+def ultimo_periodo(previo, disponibles):
+    """
+    Períodos a leer en una etapa que usa solo el último período del archivo.
+    """
+
+    return disponibles[-1:]
+
+
+def ultimo_periodo_del_anio(anio, disponibles):
+    """
+    Períodos a leer en una etapa que usa solo el último trimestre de un año (ninguno si el año no está).
+    """
+
+    return [periodo for periodo in disponibles if str(periodo[0]) == str(anio)][-1:]
+
+
+def periodo_elegido(estado, disponibles):
+    """
+    Períodos a leer en una etapa que usa el período que eligió la etapa anterior (en estado['periodo']).
+    """
+
+    return [estado["periodo"]] if estado["periodo"] is not None else []
+
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 # INCISO 1 SECCION B = Imprime año tras año el porcentaje de personas +6 años alfabetizados y analfabetizados.
 
+def alfabetizacion_desde_cache(archivo_csv):
+    """
+    Calcula los totales de porcentaje_alfabetizacion con la caché de columnas (ver cache_columnas.py),
+    como reducciones de NumPy en lugar de recorrer el CSV.
+
+    Retorna:
+    --------
+    dict or None
+        {año: {"total": ..., "cumple": ...}}, o None si la caché no está disponible
+        o algún dato no se puede interpretar (en ese caso se recorre el CSV).
+    """
+
+    try:
+        from cache_columnas import cargar_columnas, enteros, mascara, sumar_por
+        columnas = cargar_columnas(archivo_csv, ["ANO4", "TRIMESTRE", "PONDERA", "CH06", "CH09"])
+        if columnas is None or columnas["ANO4"][1] is not None: # El año se informa con el texto original
+            return None
+        filtro = mascara(columnas["TRIMESTRE"], "4") & (enteros(columnas["CH06"]) > 6)
+        anios = enteros(columnas["ANO4"])
+        pondera = enteros(columnas["PONDERA"])
+        totales = sumar_por([anios], pondera, filtro)
+        capaces = sumar_por([anios], pondera, filtro & mascara(columnas["CH09"], "1"))
+    except (ImportError, ValueError):
+        return None
+    return {str(anio): {"total": total, "cumple": capaces.get((anio,), 0)} for (anio,), total in totales.items()}
+
+
+# CH09: Sabe leer: 1= Sí; 2= No; 3 =Menor de 2 años / CH06: edad / PONDERA: cantidad de personas que contempla
+COLUMNAS_ALFABETIZACION = ("ANO4", "TRIMESTRE", "PONDERA", "CH06", "CH09")
+
+
+def actualizar_alfabetizacion(datos_por_anio, valores):
+    """
+    Suma una fila del archivo de personas a los totales por año de porcentaje_alfabetizacion.
+    """
+
+    anio, trimestre, pondera, edad, capacidad = valores
+
+    if (trimestre == "4"):
+        edad = int(edad)
+        if edad > 6:
+            cantidad = int(pondera)
+
+            if anio not in datos_por_anio:
+                datos_por_anio[anio] = {"total": 0, "cumple": 0}
+
+            datos_por_anio[anio]["total"] += cantidad
+            if capacidad == "1":
+                datos_por_anio[anio]["cumple"] += cantidad
+
+
+def imprimir_alfabetizacion(datos_por_anio):
+    """
+    Imprime, para cada año, el porcentaje de personas mayores a 6 años alfabetizadas y no alfabetizadas.
+    """
+
+    for anio in sorted(datos_por_anio):
+        total = datos_por_anio[anio]["total"]
+        capaces = datos_por_anio[anio]["cumple"]
+        porcentaje_leen = (capaces / total) * 100
+        porcentaje_no_leen = 100 - porcentaje_leen
+        print(f"En el año {anio} El porcentaje de personas > 6 años alfabetizadas es: "
+            f"{porcentaje_leen:.2f}% / El porcentaje de analfabetizadas: {porcentaje_no_leen:.2f}%")
+
+
+def reporte_alfabetizacion(archivo_csv):
+    """
+    Arma el reporte del inciso 1. Si la caché de columnas del archivo está al día, no hace falta recorrer el CSV.
+    """
+
+    return reporte(etapa("I", COLUMNAS_ALFABETIZACION, lambda previo: {}, actualizar_alfabetizacion,
+                         imprimir_alfabetizacion, desde_cache=lambda previo: alfabetizacion_desde_cache(archivo_csv)))
+
+
 def porcentaje_alfabetizacion (archivo_csv):
     """
     Calcula e imprime el porcentaje de personas mayores a 6 años que saben y que no saben leer y escribir,
@@ -248,6 +752,7 @@ def porcentaje_alfabetizacion (archivo_csv):
     Muestra por consola, por cada año presente en el archivo, el porcentaje de personas alfabetizadas
     (que saben leer y escribir) y no alfabetizadas (que no saben leer y escribir), considerando solo
     a las personas mayores de 6 años.
+    Si la caché de columnas del archivo está al día, los totales se calculan con ella.
 
     Excepciones:
     KeyError: Si falta alguna columna esperada en el CSV.
@@ -256,54 +761,75 @@ def porcentaje_alfabetizacion (archivo_csv):
     Exception: Cubre cualquier otro error inesperado.
     """
 
-    CH09 = 16 # Sabe leer: 1= Sí; 2= No; 3 =Menor de 2 años
-    CH06 = 13 # edad
-    pondera = 9 # cantidad de personas que contempla
-    trimestre = 2 # trimestre del registro
-    ANO4 = 1 # año del registro
-
-    datos_por_anio = {}
-
-    try:
-        with open(archivo_csv, 'r', encoding='utf-8') as archivo:
-            reader = csv.reader(archivo, delimiter=';')
-            next(reader)
-
-            for row in reader:
-                if (row[trimestre] == "4"):
-                    edad = int(row[CH06])
-                    if edad > 6:
-                        capacidad = row[CH09]
-                        anio = row[ANO4]
-                        cantidad = int(row[pondera])
-
-                        if anio not in datos_por_anio:
-                            datos_por_anio[anio] = {"total": 0, "cumple": 0}
-
-                        datos_por_anio[anio]["total"] += cantidad
-                        if capacidad == "1":
-                            datos_por_anio[anio]["cumple"] += cantidad
-
-        for anio in sorted(datos_por_anio):
-            total = datos_por_anio[anio]["total"]
-            capaces = datos_por_anio[anio]["cumple"]
-            porcentaje_leen = (capaces / total) * 100
-            porcentaje_no_leen = 100 - porcentaje_leen
-            print(f"En el año {anio} El porcentaje de personas > 6 años alfabetizadas es: "
-                f"{porcentaje_leen:.2f}% / El porcentaje de analfabetizadas: {porcentaje_no_leen:.2f}%")
-
-    except KeyError as e:
-        print(f"Error: faltan columnas esperadas en los CSV. Columna faltante: {e}")
-    except FileNotFoundError:
-        print("Error: no se encontró uno de los archivos especificados.")
-    except ValueError:
-        print("Error: se esperaba un número pero se recibió otro dato.")
-    except Exception as e:
-        print(f"Ocurrió un error inesperado: {e}")
+    ejecutar_inciso(reporte_alfabetizacion(archivo_csv), archivo_individual=archivo_csv)
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 # INCISO 2 SECCION B= Dado un año imprime el porcentaje de inmigrantes que hayan cursado nivel universitario o superior
 
+# CH12: ¿Cuál es el nivel más alto que cursa/ó? = 7 (universitario)
+# CH15: ¿Dónde nació? = 4 / 5 (fuera del país)
+COLUMNAS_INMIGRANTES = ("ANO4", "TRIMESTRE", "PONDERA", "CH12", "CH15")
+
+
+def actualizar_inmigrantes_academicos(estado, valores):
+    """
+    Suma una fila del archivo de personas a los totales de porcentaje_inmigrantes_academicos.
+    """
+
+    anio, trimestre, pondera, nivel, nacimiento = valores
+
+    if int(anio) == estado["anio"]:
+        if int(trimestre) == estado["trimestre"]:
+            estado["existe_año_trimestre"] = True
+            estado["total_personas"] += int(pondera)
+            if (nivel) >= "7":
+                if nacimiento in ["4", "5"]:
+                    estado["inmigrantes_universitarios"] += int(pondera)
+
+
+def imprimir_inmigrantes_academicos(estado):
+    """
+    Imprime el porcentaje de inmigrantes con nivel universitario del período pedido.
+    """
+
+    anio, trimestre = estado["anio"], estado["trimestre"]
+    if not estado["existe_año_trimestre"]:
+        print(f"No se encontraron datos para el año {anio} y trimestre {trimestre}.")
+    else:
+        if estado["total_personas"] == 0:
+            print("No hay personas ponderadas para esos criterios, no se puede calcular porcentaje.")
+        else:
+            print(f"En el año {anio}, trimestre numero {trimestre} "
+                  f"{(estado['inmigrantes_universitarios'] / estado['total_personas']) * 100}%"
+                  " son personas no nacidas en argentina que han cursado nivel universitario o superior.")
+
+
+def reporte_inmigrantes_academicos(archivo_csv):
+    """
+    Pide al usuario el año y el trimestre y arma el reporte del inciso 2, o devuelve None
+    (después de informarlo) si los valores ingresados no son válidos.
+    """
+
+    trimestre = input("Ingrese un trimestre: ")
+    anio = input("Ingrese un año: ")
+
+    if not trimestre.isdigit() or not anio.isdigit():
+        print('Ingrese un valor numerico.')
+        return None
+
+    trimestre = int(trimestre)
+    anio = int(anio)
+
+    if trimestre not in (1,2,3,4):
+        print("El trimestre debe ser un valor entre 1-4")
+        return None
+
+    estado = {"anio": anio, "trimestre": trimestre, "total_personas": 0, "inmigrantes_universitarios": 0,
+              "existe_año_trimestre": False}
+    return reporte(etapa("I", COLUMNAS_INMIGRANTES, lambda previo: estado, actualizar_inmigrantes_academicos,
+                         imprimir_inmigrantes_academicos, periodos=lambda previo, disponibles: [(anio, trimestre)]))
+
+
 def porcentaje_inmigrantes_academicos(archivo_csv):
     """
     Imprime el porcentaje de personas inmigrantes que han cursado nivel universitario o superior
@@ -323,65 +849,78 @@ def porcentaje_inmigrantes_academicos(archivo_csv):
     Exception: Para cualquier otro error inesperado.
     """
 
-    CH12 = 19 # ¿Cuál es el nivel más alto que cursa/ó? = 7 (universitario)
-    CH15 = 22 # ¿Dónde nació? = 4 / 5 (fuera del país)  
-    pondera = 9 # cantidad de personas que contempla
-    trim = 2 # trimestre del registro
-    year = 1 # año del registro
+    ejecutar_inciso(reporte_inmigrantes_academicos(archivo_csv), archivo_individual=archivo_csv)
 
-    total_personas = 0
-    inmigrantes_universitarios = 0
-    existe_año_trimestre = False
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# INCISO 3 SECCION B = Informa el año con menor desocupacion.
+
+def desocupados_desde_cache(archivo_csv):
+    """
+    Suma los desocupados por período (año, trimestre) con la caché de columnas (ver cache_columnas.py)
+    y el cálculo de tasas por grupo de tasas.py.
+
+    Retorna:
+    --------
+    dict or None
+        {(año, trimestre): desocupados}, ordenado por período, solo con los períodos que tienen desocupados,
+        o None si la caché no está disponible o algún dato no se puede interpretar.
+    """
 
     try:
-        trimestre = input("Ingrese un trimestre: ")
-        anio = input("Ingrese un año: ")
+        from cache_columnas import cargar_columnas, enteros
+        from tasas import tasas_laborales, codigos_condicion
+        columnas = cargar_columnas(archivo_csv, ["ANO4", "TRIMESTRE", "PONDERA", "CONDICION_LABORAL"])
+        if columnas is None:
+            return None
+        tasas = tasas_laborales(codigos_condicion(*columnas["CONDICION_LABORAL"]), enteros(columnas["PONDERA"]),
+                                claves={"ANO4": enteros(columnas["ANO4"]), "TRIMESTRE": enteros(columnas["TRIMESTRE"])})
+        tasas = tasas[tasas["desocupados"] != 0]
+        return {(int(anio), int(trimestre)): int(cantidad)
+                for anio, trimestre, cantidad in zip(tasas["ANO4"], tasas["TRIMESTRE"], tasas["desocupados"])}
+    except (ImportError, ValueError):
+        return None
 
-        if not trimestre.isdigit() or not anio.isdigit():
-            print('Ingrese un valor numerico.')
-            return
-        
-        trimestre = int(trimestre)
+
+# CONDICION_LABORAL: campo de strings, 'Desocupado.'
+COLUMNAS_DESOCUPACION = ("ANO4", "TRIMESTRE", "PONDERA", "CONDICION_LABORAL")
+
+
+def actualizar_desocupacion(desocupados_por_periodo, valores):
+    """
+    Suma una fila del archivo de personas a los desocupados por período de menor_desocupacion_anio_trim.
+    """
+
+    anio, trimestre, pondera, condicion = valores
+
+    condicion = condicion.strip()
+    if (condicion == "Desocupado."):
         anio = int(anio)
-        
-        if trimestre not in (1,2,3,4):
-            print("El trimestre debe ser un valor entre 1-4")
-            return
-        
-        with open(archivo_csv, 'r', encoding='utf-8') as archivo:
-            reader = csv.reader(archivo, delimiter=';')
-            next(reader)
-
-            for row in reader:
-                if int(row[year]) == anio:
-                    if int(row[trim]) == trimestre:
-                        existe_año_trimestre = True
-                        total_personas += int(row[pondera])
-                        if (row[CH12]) >= "7":
-                            if row[CH15] in ["4", "5"]:
-                                inmigrantes_universitarios += int(row[pondera])
-
-        if not existe_año_trimestre:
-            print(f"No se encontraron datos para el año {anio} y trimestre {trimestre}.")
-        else:
-            if total_personas == 0:
-                print("No hay personas ponderadas para esos criterios, no se puede calcular porcentaje.")
-            else:
-                print(f"En el año {anio}, trimestre numero {trimestre} "
-                      f"{(inmigrantes_universitarios / total_personas) * 100}%"
-                      " son personas no nacidas en argentina que han cursado nivel universitario o superior.")
-                
-    except KeyError as e:
-        print(f"Error: faltan columnas esperadas en los CSV. Columna faltante: {e}")
-    except FileNotFoundError:
-        print("Error: no se encontró uno de los archivos especificados.")
-    except ValueError:
-        print("Error: se esperaba un número pero se recibió otro dato.")
-    except Exception as e:
-        print(f"Ocurrió un error inesperado: {e}")
+        trimestre = int(trimestre)
+        cantidad = int(pondera)
+        clave = (anio,trimestre)
+
+        if clave not in desocupados_por_periodo:
+            desocupados_por_periodo[clave] = 0
+        desocupados_por_periodo[clave] += cantidad
+
+
+def imprimir_menor_desocupacion(desocupados_por_periodo):
+    """
+    Imprime el año y trimestre con menos desocupados.
+    """
+
+    anio_min, trim_min = min(desocupados_por_periodo, key= desocupados_por_periodo.get)
+    print(f"Menor desocupación: año {anio_min}, trimestre numero {trim_min}.")
+
+
+def reporte_menor_desocupacion(archivo_csv):
+    """
+    Arma el reporte del inciso 3. Si la caché de columnas del archivo está al día, no hace falta recorrer el CSV.
+    """
+
+    return reporte(etapa("I", COLUMNAS_DESOCUPACION, lambda previo: {}, actualizar_desocupacion,
+                         imprimir_menor_desocupacion, desde_cache=lambda previo: desocupados_desde_cache(archivo_csv)))
 
-# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-# INCISO 3 SECCION B = Informa el año con menor desocupacion.
 
 def menor_desocupacion_anio_trim(archivo_csv):
     """
@@ -392,6 +931,7 @@ def menor_desocupacion_anio_trim(archivo_csv):
 
     Salida:
     Muestra por consola el año y trimestre con la menor cantidad de desocupación total.
+    Si la caché de columnas del archivo está al día, los totales se calculan con ella.
 
     Excepciones:
     KeyError: Si falta alguna columna esperada.
@@ -399,45 +939,108 @@ def menor_desocupacion_anio_trim(archivo_csv):
     ValueError: Si un dato que debía ser numérico no lo es.
     Exception: Para cualquier otro error inesperado.
     """
-    
-    condicion_laboral = 179 # Campo de strings: Desocupado.
-    pondera = 9 # cantidad de personas que contempla
-    trim = 2 # trimestre del registro
-    year = 1 # año del registro
-    desocupados_por_periodo = {}
 
-    try:
-        with open(archivo_csv, 'r', encoding='utf-8') as archivo:
-            reader = csv.reader(archivo, delimiter=';')
-            next(reader)
-            
-            for row in reader:
-                condicion = row[condicion_laboral].strip()
-                if (condicion == "Desocupado."):
-                    anio = int(row[year])
-                    trimestre = int(row[trim])
-                    cantidad = int(row[pondera])
-                    clave = (anio,trimestre)
-
-                    if clave not in desocupados_por_periodo:
-                        desocupados_por_periodo[clave] = 0
-                    desocupados_por_periodo[clave] += cantidad
-
-        anio_min, trim_min = min(desocupados_por_periodo, key= desocupados_por_periodo.get)
-        print(f"Menor desocupación: año {anio_min}, trimestre numero {trim_min}.")
-
-    except KeyError as e:
-        print(f"Error: faltan columnas esperadas en los CSV. Columna faltante: {e}")
-    except FileNotFoundError:
-        print("Error: no se encontró uno de los archivos especificados.")
-    except ValueError:
-        print("Error: se esperaba un número pero se recibió otro dato.")
-    except Exception as e:
-        print(f"Ocurrió un error inesperado: {e}")
+    ejecutar_inciso(reporte_menor_desocupacion(archivo_csv), archivo_individual=archivo_csv)
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 # INCISO 4 SECCION B= Ranking 5 aglomerados con mas de 2 ocupantes en un hogar con estudios universitarios o superiores
 
+# CODUSU: codigo de vivienda, apareable con personas / NRO_HOGAR: codigo para distinguir hogares
+COLUMNAS_HOGARES = ("ANO4", "TRIMESTRE", "CODUSU", "NRO_HOGAR", "AGLOMERADO", "PONDERA")
+# UNIVERSITARIO: columna generada en la seccion a, inciso 6 (1: Sí, 0: No, 2: no aplica).
+COLUMNAS_UNIVERSITARIOS = ("ANO4", "TRIMESTRE", "CODUSU", "NRO_HOGAR", "UNIVERSITARIO")
+
+
+def actualizar_hogares_ultimo_periodo(estado, valores):
+    """
+    Guarda (hogar, aglomerado, ponderación) de los hogares del período más reciente visto hasta ahora.
+    Cuando aparece un período posterior, se descartan los hogares guardados.
+    """
+
+    anio, trimestre, codusu, nro_hogar, aglomerado, pondera_hogar = valores
+
+    periodo = (int(anio), int(trimestre))
+    if estado["periodo"] is None or periodo > estado["periodo"]:
+        estado["periodo"] = periodo
+        estado["hogares"] = []
+    if periodo == estado["periodo"]:
+        hogar_id = (codusu.strip(), nro_hogar.strip())
+        estado["hogares"].append((hogar_id, aglomerado.strip(), int(pondera_hogar)))
+
+
+def actualizar_universitarios_por_hogar(estado, valores):
+    """
+    Cuenta, en cada hogar del período elegido, las personas con estudios universitarios o superiores finalizados.
+    """
+
+    anio, trimestre, codusu, nro_hogar, universitario = valores
+
+    if (int(anio), int(trimestre)) == estado["periodo"]:
+        if universitario == '1': # si cumple identifica su hogar
+            hogar_id = (codusu.strip(), nro_hogar.strip())
+            personas_por_hogar = estado["personas_por_hogar"]
+            if hogar_id not in personas_por_hogar: # se agrega esa persona al hogar en el dict
+                personas_por_hogar[hogar_id] = 0
+            # cuento individualmente que en ese hogar id, 1 persona cumplió con ser universitario
+            personas_por_hogar[hogar_id] += 1
+
+
+def imprimir_top_5_universitarios(estado):
+    """
+    Imprime el ranking de los 5 aglomerados y devuelve la lista completa de (aglomerado, porcentaje).
+    """
+
+    AGLOMERADOS = aglo_dict()
+    diccionario_contador = defaultcantidades()
+
+    for valor in diccionario_contador.values():
+        valor['cantesp'] = 0  # agregamos campo extra que contabiliza la condicion de recibidos
+    for hogar_id, aglomerado, pondera_hogar in estado["hogares"]:
+        diccionario_contador[aglomerado]['cant'] += pondera_hogar
+        if estado["personas_por_hogar"].get(hogar_id, 0) >= 2:
+            diccionario_contador[aglomerado]['cantesp'] += pondera_hogar
+
+    # Obtener y mostrar el rankin de 5 aglomerados
+    resultados = sacar_porcentaje(diccionario_contador)
+    print("Top 5 aglomerados con mayor porcentaje de hogares con mas de 2 personas"
+    " con estudios universitarios o superiores finalizados:")
+    for codigo, porcentaje in resultados[:5]:
+        nombre = AGLOMERADOS.get(codigo, f"Aglomerado {codigo}")
+        print(f"{nombre}: {porcentaje:.2f}%")
+    return resultados
+
+
+def hogares_desde_indice(archivo_csv_hogares):
+    """
+    Arma el estado de la etapa de hogares del inciso 4 (los hogares del período más reciente)
+    con el índice de hogares (ver indice_hogares.py), sin leer el CSV de hogares.
+    Devuelve None si el índice no está al día (en ese caso se recorre el CSV).
+    """
+
+    periodos = periodos_hogares(archivo_csv_hogares)
+    if not periodos:
+        return None
+    hogares = cargar_hogares(archivo_csv_hogares, *periodos[-1])
+    return {"periodo": periodos[-1],
+            "hogares": [((codusu.strip(), nro_hogar.strip()), datos["AGLOMERADO"].strip(), int(datos["PONDERA"]))
+                        for (codusu, nro_hogar), datos in hogares.items()]}
+
+
+def reporte_top_5_universitarios(archivo_csv_hogares, archivo_csv_personas):
+    """
+    Arma el reporte del inciso 4: primero se leen los hogares del período más reciente
+    y después se cuentan los universitarios de cada uno en el archivo de personas.
+    Con el índice de hogares al día, solo se recorre el archivo de personas.
+    """
+
+    return reporte(
+        etapa("H", COLUMNAS_HOGARES, lambda previo: {"periodo": None, "hogares": []},
+              actualizar_hogares_ultimo_periodo, lambda estado: estado,
+              desde_cache=lambda previo: hogares_desde_indice(archivo_csv_hogares), periodos=ultimo_periodo),
+        etapa("I", COLUMNAS_UNIVERSITARIOS, lambda hogares: dict(hogares, personas_por_hogar={}),
+              actualizar_universitarios_por_hogar, imprimir_top_5_universitarios, periodos=periodo_elegido))
+
+
 def top_5_aglomerados_universitarios(archivo_csv_hogares, archivo_csv_personas, ok = False):
     """
     Imprime el ranking de los 5 aglomerados con mayor porcentaje de hogares con al menos
@@ -448,7 +1051,7 @@ def top_5_aglomerados_universitarios(archivo_csv_hogares, archivo_csv_personas,
     archivo_csv_personas (str): Ruta al archivo CSV de personas.
 
     Salida:
-    Muestra en consola el top 5 de aglomerados con mayor porcentaje de hogares que 
+    Muestra en consola el top 5 de aglomerados con mayor porcentaje de hogares que
     cumplen la condición.
 
     Excepciones:
@@ -457,77 +1060,66 @@ def top_5_aglomerados_universitarios(archivo_csv_hogares, archivo_csv_personas,
     ValueError: Si un dato numérico no es válido.
     Exception: Para cualquier otro error inesperado.
     """
-    
-    UNIVERSITARIO = 180 # columna generada en la seccion a, inciso 6 (1: Sí, 0: No, 2: no aplica).
-    CODUSU = 0 # codigo de vivienda, apareable con personas
-    NRO_HOGAR = 3 # codigo para distinguir hogares
-    AGLOMERADO_HOGAR = 7 # codigo de aglomerado
-    PONDERA_HOG = 8 # cantidad de personas que contempla
-    trim = 2 # trimestre del registro
-    year = 1 # año del registro
-    anio, trimestre = calcular_fechas(archivo_csv_hogares)[2:] # Obtener el año y trimestre más recientes
 
-    AGLOMERADOS = aglo_dict()
-    diccionario_contador = defaultcantidades()
-
-    for valor in diccionario_contador.values():
-        valor['cantesp'] = 0  # agregamos campo extra que contabiliza la condicion de recibidos
-    try:
-        # Leer archivo de personas y agrupar por hogar
-        personas_por_hogar = {}
-        with open(archivo_csv_personas, 'r', encoding='utf-8') as archivo_personas:
-            personas_reader = csv.reader(archivo_personas, delimiter=';')
-            next(personas_reader)
-            for row in personas_reader:
-                if int(row[year]) == anio and int(row[trim]) == trimestre:
-                    if row[UNIVERSITARIO] == '1': # si cumple identifica su hogar
-                        codusu = row[CODUSU].strip()
-                        nro_hogar = row[NRO_HOGAR].strip()
-                        hogar_id = (codusu, nro_hogar)
-
-                        if hogar_id not in personas_por_hogar: # se agrega esa persona al hogar en el dict
-                            personas_por_hogar[hogar_id] = 0 
-                        # cuento individualmente que en ese hogar id, 1 persona cumplió con ser universitario
-                        personas_por_hogar[hogar_id] += 1 
-
-        # Leer archivo de hogares
-        with open(archivo_csv_hogares, 'r', encoding='utf-8') as archivo_hogares:
-            hogares_reader = csv.reader(archivo_hogares, delimiter=';')
-            next(hogares_reader)
-            for row in hogares_reader:
-                if int(row[year]) == anio and int(row[trim]) == trimestre:
-                    codusu = row[CODUSU].strip()
-                    nro_hogar = row[NRO_HOGAR].strip()
-                    aglomerado = row[AGLOMERADO_HOGAR].strip()
-                    pondera_hogar = int(row[PONDERA_HOG])
-                    
-                    diccionario_contador[aglomerado]['cant'] += pondera_hogar
-                    
-                    hogar_id = (codusu, nro_hogar)
-                    if personas_por_hogar.get(hogar_id, 0) >= 2:
-                        diccionario_contador[aglomerado]['cantesp'] += pondera_hogar
-
-        # Obtener y mostrar el rankin de 5 aglomerados 
-        resultados = sacar_porcentaje(diccionario_contador)
-        print("Top 5 aglomerados con mayor porcentaje de hogares con mas de 2 personas"
-        " con estudios universitarios o superiores finalizados:")
-        for codigo, porcentaje in resultados[:5]:
-            nombre = AGLOMERADOS.get(codigo, f"Aglomerado {codigo}")
-            print(f"{nombre}: {porcentaje:.2f}%")
-        if ok == True:
-            return resultados
-    except KeyError as e:
-        print(f"Error: faltan columnas esperadas en los CSV. Columna faltante: {e}")
-    except FileNotFoundError:
-        print("Error: no se encontró uno de los archivos especificados.")
-    except ValueError:
-        print("Error: se esperaba un número pero se recibió otro dato.")
-    except Exception as e:
-        print(f"Ocurrió un error inesperado: {e}")
+    resultados = ejecutar_inciso(reporte_top_5_universitarios(archivo_csv_hogares, archivo_csv_personas),
+                                 archivo_csv_hogares, archivo_csv_personas)
+    if ok == True:
+        return resultados
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 # INCISO 5 SECCION B = Informar para cada aglomerado el porcentaje de viviendas ocupadas por sus propietarios.
 
+def iniciar_contador_especial(previo=None):
+    """
+    Devuelve los contadores por aglomerado de defaultcantidades con el campo extra 'cantesp'.
+    """
+
+    diccionariocontador = defaultcantidades()
+    for valor in diccionariocontador.values():
+        valor['cantesp'] = 0
+    return diccionariocontador
+
+
+COLUMNAS_PROPIETARIOS = ("AGLOMERADO", "PONDERA", "II7")
+
+
+def actualizar_propietarios(diccionariocontador, valores):
+    """
+    Suma una fila del archivo de hogares a los contadores de porcentaje_aglomerados_propietarios.
+    """
+
+    aglomerado_act, pondera_act, II7_act = valores
+
+    aglomerado_act = aglomerado_act.strip()
+    II7_act = II7_act.strip()
+    pondera_act = int(pondera_act)
+
+    diccionariocontador[aglomerado_act]['cant'] += pondera_act
+    if II7_act in ('1','2'):
+        diccionariocontador[aglomerado_act]['cantesp'] += pondera_act
+
+
+def imprimir_propietarios(diccionariocontador):
+    """
+    Imprime el porcentaje de viviendas ocupadas por sus propietarios en cada aglomerado.
+    """
+
+    AGLOMERADOS = aglo_dict()
+    print("\nPorcentajes de viviendas ocupadas por sus propietarios:")
+    listaporcentajes = sacar_porcentaje(diccionariocontador)
+    for aglomerado, porcentaje in listaporcentajes:
+        print(f"{AGLOMERADOS[aglomerado]}: {porcentaje:.2f}%")
+
+
+def reporte_propietarios(archivocsv):
+    """
+    Arma el reporte del inciso 5.
+    """
+
+    return reporte(etapa("H", COLUMNAS_PROPIETARIOS, iniciar_contador_especial, actualizar_propietarios,
+                         imprimir_propietarios))
+
+
 def porcentaje_aglomerados_propietarios(archivocsv):
     """
     Imprime el porcentaje de viviendas ocupadas por propietarios en cada aglomerado.
@@ -544,46 +1136,8 @@ def porcentaje_aglomerados_propietarios(archivocsv):
     ValueError: Si hay un dato que no puede convertirse a número.
     Exception: Para cualquier otro error inesperado.
     """
-    
-    AGLOMERADOS = aglo_dict()
-    
-    #INDEX'S
-    IDX_II7 = 37
-    AGLOMERADO = 7
-    PONDERA = 8
-    
-    # Inicializa el diccionario para contar las viviendas por aglomerado
-    diccionariocontador = defaultcantidades()
-    
-    #AÑADO NUEVO VALOR EN EL DICCIONARIO PARA CONTAR LAS CANTIDADES DE VIVIENDAS OCUPADAS POR PROPIETARIOS
-    for valor in diccionariocontador.values():
-        valor['cantesp'] = 0
-    try:
-        with open(archivocsv, 'r', encoding='utf-8') as archivo:
-            lector = csv.reader(archivo, delimiter=';')
-            next(lector)
-            
-            for linea in lector:
-                aglomerado_act = linea[AGLOMERADO].strip()
-                II7_act = linea[IDX_II7].strip()
-                pondera_act = int(linea[PONDERA])
-                
-                diccionariocontador[aglomerado_act]['cant'] += pondera_act
-                if II7_act in ('1','2'):
-                    diccionariocontador[aglomerado_act]['cantesp'] += pondera_act
-
-        print("\nPorcentajes de viviendas ocupadas por sus propietarios:")
-        listaporcentajes = sacar_porcentaje(diccionariocontador)
-        for aglomerado, porcentaje in listaporcentajes:
-            print(f"{AGLOMERADOS[aglomerado]}: {porcentaje:.2f}%")
-    except KeyError as e:
-        print(f"Error: faltan columnas esperadas en los CSV. Columna faltante: {e}")
-    except FileNotFoundError:
-        print("Error: no se encontró uno de los archivos especificados.")
-    except ValueError:
-        print("Error: se esperaba un número pero se recibió otro dato.")
-    except Exception as e:
-        print(f"Ocurrió un error inesperado: {e}")
+
+    ejecutar_inciso(reporte_propietarios(archivocsv), archivo_hogar=archivocsv)
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 # INCISO 6 SECCION B = Informar el aglomerado con mayor cantidad de viviendas con más de dos ocupantes y sin baño.
@@ -598,11 +1152,51 @@ def aglo_max_viviendas(diccionariocontador):
     Retorno:
     tuple: (código de aglomerado, cantidad máxima de viviendas).
     """
-    
+
     aglomerado_maximo = max(diccionariocontador.items(), key=lambda item: item[1]['cant'])
     return aglomerado_maximo[0], aglomerado_maximo[1]['cant']
 
 
+# IX_TOT: total de ocupantes / IV8: tiene baño (2 = No)
+COLUMNAS_VIVIENDAS_ESP = ("AGLOMERADO", "PONDERA", "IV8", "IX_TOT")
+
+
+def actualizar_viviendas_esp(diccionariocontador, valores):
+    """
+    Suma una fila del archivo de hogares a los contadores de viviendas_esp.
+    """
+
+    aglomerado_act, pondera_act, banio_act, total_ocupantes_act = valores
+
+    aglomerado_act = aglomerado_act.strip()
+    pondera_act = int(pondera_act)
+    no_banio_act = banio_act.strip() == '2'
+    total_ocupantes_act = int(total_ocupantes_act.strip())
+
+    if (no_banio_act and (total_ocupantes_act > 2)):
+        diccionariocontador[aglomerado_act]['cant'] += pondera_act
+
+
+def imprimir_viviendas_esp(diccionariocontador):
+    """
+    Imprime el aglomerado con más viviendas con más de dos ocupantes y sin baño.
+    """
+
+    AGLOMERADOS = aglo_dict()
+    aglomax,cantmax = aglo_max_viviendas(diccionariocontador)
+    print(f"EL AGLOMERADO, {AGLOMERADOS[aglomax]}, TIENE LA MAYOR CANTIDAD DE VIVIENDAS CON MAS DE DOS OCUPANTES "
+        f"Y SIN BAÑO CON UN TOTAL DE: {cantmax} VIVIENDAS")
+
+
+def reporte_viviendas_esp(archivocsv):
+    """
+    Arma el reporte del inciso 6.
+    """
+
+    return reporte(etapa("H", COLUMNAS_VIVIENDAS_ESP, lambda previo: defaultcantidades(), actualizar_viviendas_esp,
+                         imprimir_viviendas_esp))
+
+
 def viviendas_esp(archivocsv):
     """
     Imprime el aglomerado con más viviendas que tienen más de dos ocupantes y no tienen baño.
@@ -619,45 +1213,107 @@ def viviendas_esp(archivocsv):
     ValueError: Si hay un dato que no puede convertirse a número.
     Exception: Para cualquier otro error inesperado.
     """
-    
-    AGLOMERADOS = aglo_dict()
-    
-    #INDEX'S 
-    IX_TOT_OCUPANTES = 64
-    AGLOMERADO = 7
-    PONDERA = 8
-    IV8_BAÑO = 19
-    
-    # Inicializa el diccionario para contar las viviendas por aglomerado
-    diccionariocontador = defaultcantidades()
+
+    ejecutar_inciso(reporte_viviendas_esp(archivocsv), archivo_hogar=archivocsv)
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+#INCISO 7 SECCION B= Informar para cada aglomerado el porcentaje de personas que hayan cursado universitario o superior
+
+def estudios_desde_cache(archivocsv, diccionariocontador):
+    """
+    Completa los contadores de porc_aglo_estudios con la caché de columnas (ver cache_columnas.py).
+
+    Retorna:
+    --------
+    bool
+        True si se completaron los contadores; False si la caché no está disponible o algún dato
+        no se puede interpretar (en ese caso se recorre el CSV, que informa las líneas con errores).
+    """
+
     try:
-        with open(archivocsv, 'r', encoding='utf-8') as archivo:
-            lector = csv.reader(archivo, delimiter=';')
-            next(lector)  # Salta la primera línea (encabezados)
-        
-            for linea in lector:
-                aglomerado_act = linea[AGLOMERADO].strip()
-                pondera_act = int(linea[PONDERA])
-                no_banio_act = linea[IV8_BAÑO].strip() == '2'
-                total_ocupantes_act = int(linea[IX_TOT_OCUPANTES].strip())
-            
-                if (no_banio_act and (total_ocupantes_act > 2)):
-                    diccionariocontador[aglomerado_act]['cant'] += pondera_act
-        
-        aglomax,cantmax = aglo_max_viviendas(diccionariocontador)  
-        print(f"EL AGLOMERADO, {AGLOMERADOS[aglomax]}, TIENE LA MAYOR CANTIDAD DE VIVIENDAS CON MAS DE DOS OCUPANTES "
-            f"Y SIN BAÑO CON UN TOTAL DE: {cantmax} VIVIENDAS")
-    except KeyError as e:
-        print(f"Error: faltan columnas esperadas en los CSV. Columna faltante: {e}")
-    except FileNotFoundError:
+        from cache_columnas import cargar_columnas, enteros, mascara, sumar_por
+        columnas = cargar_columnas(archivocsv, ["AGLOMERADO", "PONDERA", "NIVEL_ED"])
+        if columnas is None or columnas["AGLOMERADO"][1] is not None: # Los contadores usan el texto original
+            return False
+        aglomerados = enteros(columnas["AGLOMERADO"])
+        pondera = enteros(columnas["PONDERA"])
+        totales = sumar_por([aglomerados], pondera)
+        universitarios = sumar_por([aglomerados], pondera, mascara(columnas["NIVEL_ED"], "5", "6", recortar=True))
+    except (ImportError, ValueError):
+        return False
+    if any(str(aglomerado) not in diccionariocontador for (aglomerado,) in totales):
+        return False
+    for (aglomerado,), total in totales.items():
+        diccionariocontador[str(aglomerado)]['cant'] += total
+        diccionariocontador[str(aglomerado)]['cantesp'] += universitarios.get((aglomerado,), 0)
+    return True
+
+
+COLUMNAS_ESTUDIOS = ("AGLOMERADO", "PONDERA", "NIVEL_ED")
+
+
+def actualizar_estudios(diccionariocontador, valores):
+    """
+    Suma una fila del archivo de personas a los contadores de porc_aglo_estudios.
+    Las líneas con errores se informan y se saltean.
+    """
+
+    try:
+        aglomerado_act, pondera_act, estudios_act = valores
+        aglomerado_act = aglomerado_act.strip()
+        pondera_act = int(pondera_act)
+        estudios_act = estudios_act.strip()
+
+        diccionariocontador[aglomerado_act]['cant'] += pondera_act
+
+        if  estudios_act in ('5','6'):
+            diccionariocontador[aglomerado_act]['cantesp'] += pondera_act
+    except(IndexError,ValueError,KeyError) as e:
+        print(f'Error procesando la linea {valores}. {e}')
+
+
+def imprimir_estudios(diccionariocontador):
+    """
+    Imprime el porcentaje de personas con nivel universitario o superior en cada aglomerado.
+    """
+
+    AGLOMERADOS = aglo_dict()
+    print("\nPorcentajes de personas que han cursado al menos nivel universitario o superior:")
+    listaporcentaje= sacar_porcentaje(diccionariocontador)
+
+    for aglomerado, porcentaje in listaporcentaje:
+        print(f"{AGLOMERADOS[aglomerado]}: {porcentaje:.2f}%")
+
+
+def informar_error_estudios(error):
+    """
+    Informa un error de porc_aglo_estudios.
+    """
+
+    if isinstance(error, FileNotFoundError):
         print("Error: no se encontró uno de los archivos especificados.")
-    except ValueError:
-        print("Error: se esperaba un número pero se recibió otro dato.")
-    except Exception as e:
-        print(f"Ocurrió un error inesperado: {e}")
+    else:
+        print(f"Ocurrió un error inesperado: {error}")
+
+
+def estudios_completos_desde_cache(archivocsv):
+    """
+    Devuelve los contadores de porc_aglo_estudios calculados con la caché de columnas, o None si no se puede.
+    """
+
+    diccionariocontador = iniciar_contador_especial()
+    return diccionariocontador if estudios_desde_cache(archivocsv, diccionariocontador) else None
+
+
+def reporte_estudios(archivocsv):
+    """
+    Arma el reporte del inciso 7. Si la caché de columnas del archivo está al día, no hace falta recorrer el CSV.
+    """
+
+    return reporte(etapa("I", COLUMNAS_ESTUDIOS, iniciar_contador_especial, actualizar_estudios, imprimir_estudios,
+                         desde_cache=lambda previo: estudios_completos_desde_cache(archivocsv)),
+                   errores=informar_error_estudios)
 
-# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
-#INCISO 7 SECCION B= Informar para cada aglomerado el porcentaje de personas que hayan cursado universitario o superior
 
 def porc_aglo_estudios(archivocsv):
     """
@@ -668,55 +1324,15 @@ def porc_aglo_estudios(archivocsv):
 
     Salida:
     Muestra en consola los porcentajes por aglomerado.
+    Si la caché de columnas del archivo está al día, los totales se calculan con ella.
 
     Excepciones:
     FileNotFoundError: Si el archivo no existe.
     Exception: Para otros errores inesperados durante el procesamiento.
     """
-    
-    AGLOMERADOS = aglo_dict()
 
-    IND_ESTUDIO = 26 
-    AGLOMERADO = 8
-    PONDERA = 9
-    
-    # Inicializa el diccionario para contar las viviendas por aglomerado
-    diccionariocontador = defaultcantidades()
-    
-    #CREO NUEVO VALOR EN EL DICCIONARIO PARA CONTAR LOS ESTUDIOS
-    for valor in diccionariocontador.values():
-        valor['cantesp'] = 0
-    
-    try:
-        with open(archivocsv, 'r', encoding='utf-8') as archivo:
-            lector = csv.reader(archivo, delimiter=';')
-            next(lector)
-        
-                
-            for linea in lector:
-                try:
-                    aglomerado_act = linea[AGLOMERADO].strip()
-                    pondera_act = int(linea[PONDERA])
-                    estudios_act = linea[IND_ESTUDIO].strip()
-            
-                    diccionariocontador[aglomerado_act]['cant'] += pondera_act
-                
-                    if  estudios_act in ('5','6'):
-                        diccionariocontador[aglomerado_act]['cantesp'] += pondera_act
-                except(IndexError,ValueError,KeyError) as e:
-                    print(f'Error procesando la linea {linea}. {e}')
-
-        print("\nPorcentajes de personas que han cursado al menos nivel universitario o superior:")
-        listaporcentaje= sacar_porcentaje(diccionariocontador)
-        
-        for aglomerado, porcentaje in listaporcentaje:
-            print(f"{AGLOMERADOS[aglomerado]}: {porcentaje:.2f}%")
+    ejecutar_inciso(reporte_estudios(archivocsv), archivo_individual=archivocsv)
 
-    except FileNotFoundError:
-        print("Error: no se encontró uno de los archivos especificados.")
-    except Exception as e:
-        print(f"Ocurrió un error inesperado: {e}")
-    
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 # INCISO 8 SECCION B = Informar las regiones en orden descendente según el porcentaje de inquilinos de cada una.
@@ -730,7 +1346,7 @@ def crear_acumulador_inquilinos():
     dict
         Diccionario con claves como códigos de región y valores como otro diccionario con las claves 'total' e 'inquilinos' inicializados en 0.
     """
-    
+
     REGIONES = ['1', '40', '41', '42', '43', '44']
     return {i: {'total': 0, 'inquilinos': 0} for i in REGIONES}
 
@@ -749,17 +1365,64 @@ def generar_porcentajes_inquilinos(estructura):
     list of tuples
         Lista ordenada descendentemente de tuplas (región, porcentaje_inquilinos).
     """
-    
-    porcentajes = [] 
+
+    porcentajes = []
     for region, datos in estructura.items(): # recorro la estructura
         total= datos['total'] # a total le doy total de personas en esa region
         inquilinos= datos['inquilinos'] # a inquilinos le doy el total de inquilinos en esa region
-        porcentaje = (inquilinos / total * 100 ) if total > 0 else 0.0 # saco porcentaje 
+        porcentaje = (inquilinos / total * 100 ) if total > 0 else 0.0 # saco porcentaje
         porcentajes.append ((region, round (porcentaje, 2))) # agrego la region y el porcentaje a la lista
     porcentajes_ordenados = sorted(porcentajes, key=lambda x: x[1], reverse=True) # ordeno en forma descendiente
     return porcentajes_ordenados
 
 
+COLUMNAS_INQUILINOS = ("REGION", "PONDERA", "II7")
+
+
+def actualizar_inquilinos(estructura, valores):
+    """
+    Suma una fila del archivo de hogares al total y a los inquilinos de su región.
+    """
+
+    region, pondera, tenencia = valores
+
+    estructura[region]['total'] += int (pondera)
+    if tenencia == '3':
+        estructura [region]['inquilinos'] += int (pondera)
+
+
+def imprimir_tabla_inquilinos(estructura):
+    """
+    Imprime la tabla con el porcentaje de inquilinos por región, de mayor a menor.
+    """
+
+    nombres_regiones = {
+        '1': 'Gran Buenos Aires',
+        '40': 'Noroeste',
+        '41': 'Noreste',
+        '42': 'Cuyo',
+        '43': 'Pampeana',
+        '44': 'Patagonia'
+    }
+    porcentajes_ordenados= generar_porcentajes_inquilinos(estructura)
+    print("\nPORCENTAJE DE INQUILINOS POR REGIÓN (Ordenado)")
+    print("-----------------------------------------------")
+    print("| Región               | Porcentaje         |")
+    print("|----------------------|--------------------|")
+    for r, p in porcentajes_ordenados:
+        nombre_region = nombres_regiones.get(r)
+        print(f'| {nombre_region:<20} | {p:>17}% |')
+
+
+def reporte_inquilinos(archivo_csv):
+    """
+    Arma el reporte del inciso 8.
+    """
+
+    return reporte(etapa("H", COLUMNAS_INQUILINOS, lambda previo: crear_acumulador_inquilinos(),
+                         actualizar_inquilinos, imprimir_tabla_inquilinos))
+
+
 def imprimir_region_inquilinos(archivo_csv):
     """
     Lee un archivo CSV y calcula el porcentaje de inquilinos por región, imprimiendo los resultados ordenados.
@@ -776,49 +1439,16 @@ def imprimir_region_inquilinos(archivo_csv):
     - Imprime una tabla con el porcentaje de inquilinos por región ordenada de mayor a menor.
     - Maneja excepciones relacionadas con archivos y datos faltantes o mal formateados.
     """
-    
-    nombres_regiones = {
-        '1': 'Gran Buenos Aires',
-        '40': 'Noroeste',
-        '41': 'Noreste',
-        '42': 'Cuyo',
-        '43': 'Pampeana',
-        '44': 'Patagonia'
-    }
-    try:
-        with open (archivo_csv,encoding='utf-8') as archivo:
-            reader = csv.reader(archivo,delimiter = ';')
-            II7 = 37
-            REGION = 5
-            PONDERA = 8
-            estructura = crear_acumulador_inquilinos()
-            encabezado = next(reader)
-            for row in reader:
-                estructura[row[REGION]]['total'] += int (row[PONDERA])
-                if row [II7] == '3':
-                    estructura [row[REGION]]['inquilinos'] += int (row[PONDERA])
-            porcentajes_ordenados= generar_porcentajes_inquilinos(estructura)
-            print("\nPORCENTAJE DE INQUILINOS POR REGIÓN (Ordenado)")
-            print("-----------------------------------------------")
-            print("| Región               | Porcentaje         |")
-            print("|----------------------|--------------------|")
-            for r, p in porcentajes_ordenados:
-                nombre_region = nombres_regiones.get(r)
-                print(f'| {nombre_region:<20} | {p:>17}% |')
-
-    except KeyError as e:
-        print(f"Error: faltan columnas esperadas en los CSV. Columna faltante: {e}")
-    except FileNotFoundError:
-        print("Error: no se encontró uno de los archivos especificados.")
-    except ValueError:
-        print("Error: se esperaba un número pero se recibió otro dato.")
-    except Exception as e:
-        print(f"Ocurrió un error inesperado: {e}")
+
+    ejecutar_inciso(reporte_inquilinos(archivo_csv), archivo_hogar=archivo_csv)
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 # INCISO 9 SECCION B = Pedir al usuario que seleccione un aglomerado y a partir de la información contenida
 # retornar una tabla que contenga la cantidad de personas mayores de edad según su nivel de estudios alcanzados.
 
+# Columnas que usan los incisos 9 y 10. CH06: edad
+COLUMNAS_NIVEL_EDUCATIVO = ("ANO4", "TRIMESTRE", "AGLOMERADO", "PONDERA", "CH06", "NIVEL_ED")
+
 def imprimir_tabla_formacion(estructuraPrincipal, nombre_aglomerado):
     """
     Imprime una tabla con la cantidad de personas mayores de edad
@@ -844,6 +1474,34 @@ def imprimir_tabla_formacion(estructuraPrincipal, nombre_aglomerado):
                 f"| {sec_inc:^20} | {sec_comp:^20} | {sup:^20}")
 
 
+def imprimir_formacion(estado):
+    """
+    Imprime la tabla de formación del aglomerado elegido.
+    """
+
+    nombre_aglomerado = aglo_dict()[estado["numero_aglomerado"]]
+    imprimir_tabla_formacion(estado["estructuraPrincipal"], nombre_aglomerado)
+
+
+def reporte_formacion_por_aglomerado(archivo_csv):
+    """
+    Pide al usuario el aglomerado y arma el reporte del inciso 9.
+    """
+
+    aglomerados = aglo_dict()
+    for codigo ,nombre in aglomerados.items():
+        print (f"{codigo} {nombre}")
+    numero_aglomerado= input (f"Ingrese el numero del aglomerado en el cual quiere obtener"
+        "la informacion de nivel de estudios alcanzados de las personas que viven en el:")
+    if not numero_aglomerado in aglomerados:
+        print (f"Aglomerado inexistente")
+    estado = {"numero_aglomerado": numero_aglomerado, "estructuraPrincipal": {}}
+    return reporte(etapa("I", COLUMNAS_NIVEL_EDUCATIVO, lambda previo: estado,
+                         lambda estado, valores: procesar_fila_formacion(valores, estado["estructuraPrincipal"],
+                                                                         numero_aglomerado),
+                         imprimir_formacion))
+
+
 def imprimir_formacion_por_aglomerado(archivo_csv):
     """
     Solicita al usuario seleccionar un aglomerado y muestra la distribución
@@ -855,32 +1513,10 @@ def imprimir_formacion_por_aglomerado(archivo_csv):
         Ruta al archivo CSV con datos individuales que incluye información educativa.
     """
 
-    try:
-        with open (archivo_csv,encoding='utf-8') as archivo:
-            reader = csv.reader(archivo,delimiter = ';')
-            encabezado = next(reader)
-            aglomerados = aglo_dict()
-            for codigo ,nombre in aglomerados.items():
-                print (f"{codigo} {nombre}")
-            numero_aglomerado= input (f"Ingrese el numero del aglomerado en el cual quiere obtener"
-                "la informacion de nivel de estudios alcanzados de las personas que viven en el:")
-            if not numero_aglomerado in aglomerados:
-                print (f"Aglomerado inexistente")
-            estructuraPrincipal = acumular_formacion_periodo(reader,numero_aglomerado)
-            nombre_aglomerado = aglomerados[numero_aglomerado]
-            imprimir_tabla_formacion(estructuraPrincipal,nombre_aglomerado)
-
-    except KeyError as e:
-        print(f"Error: faltan columnas esperadas en los CSV. Columna faltante: {e}")
-    except FileNotFoundError:
-        print("Error: no se encontró uno de los archivos especificados.")
-    except ValueError:
-        print("Error: se esperaba un número pero se recibió otro dato.")
-    except Exception as e:
-        print(f"Ocurrió un error inesperado: {e}")
+    ejecutar_inciso(reporte_formacion_por_aglomerado(archivo_csv), archivo_individual=archivo_csv)
 
 
-def procesar_fila_formacion(row,estructuraPrincipal,numero_aglomerado):
+def procesar_fila_formacion(valores,estructuraPrincipal,numero_aglomerado):
     """
     Procesa una fila del CSV y actualiza la estructura principal acumulando
     los conteos de personas mayores por nivel educativo, año y trimestre
@@ -888,75 +1524,34 @@ def procesar_fila_formacion(row,estructuraPrincipal,numero_aglomerado):
 
     Parámetros:
     -----------
-    row : list
-        Lista con los datos de una fila del CSV.
+    valores : tuple
+        Valores de las columnas COLUMNAS_NIVEL_EDUCATIVO de una fila del CSV.
     estructuraPrincipal : dict
         Diccionario donde se acumulan los datos por año y trimestre.
     numero_aglomerado : str
         Código del aglomerado para filtrar los datos relevantes.
     """
-    
-    PONDERA = 9
-    COLUM_AGLOMERADO = 8
-    EDAD = 13
-    ANIO = 1
-    TRIMESTRE = 2
-    NIVEL_ED = 26
-    try:
-        if (int(row[EDAD]) > 18) and (numero_aglomerado == row[COLUM_AGLOMERADO]):
-            if not (row [ANIO]) in estructuraPrincipal:
-                estructuraPrincipal[row [ANIO]]= {} # si es un nuevo anio, creamos el diccionario de ese anio
-            if not (row [TRIMESTRE]) in estructuraPrincipal[row [ANIO]]:
-                estructuraPrincipal[row [ANIO]][row [TRIMESTRE]] = [0,0,0,0,0]  # EN DEFAULT cuando es nuevo trimestre
-            if row [NIVEL_ED] == '1':
-                estructuraPrincipal[row [ANIO]][row [TRIMESTRE]][0] += int (row [PONDERA])
-            elif row [NIVEL_ED] == '2':
-                estructuraPrincipal[row [ANIO]][row [TRIMESTRE]][1] += int (row [PONDERA])
-            elif row [NIVEL_ED] == '3':
-                estructuraPrincipal[row [ANIO]][row [TRIMESTRE]][2] += int (row [PONDERA])
-            elif row [NIVEL_ED] == '4':
-                estructuraPrincipal[row [ANIO]][row [TRIMESTRE]][3] += int (row [PONDERA])
-            elif row [NIVEL_ED] == '5' or row [NIVEL_ED]== '6' :
-                estructuraPrincipal[row [ANIO]][row [TRIMESTRE]][4] += int (row [PONDERA])
-        # vamos cargando las personas que cumplen con cada condicion       
-    except (IndexError,ValueError,KeyError) as e:
-        print(f'Error procesando la fila {row}. {e}')
-
-
-def acumular_formacion_periodo(reader,numero_aglomerado):
-    """
-    Lee todas las filas de un CSV (desde un reader) y acumula la información educativa
-    para personas mayores por año y trimestre en un aglomerado determinado.
-
-    Parámetros:
-    -----------
-    reader : iterable
-        Objeto iterable (como csv.reader) que provee filas del archivo CSV.
-    numero_aglomerado : str
-        Código del aglomerado para filtrar los datos a acumular.
 
-    Retorna:
-    --------
-    dict
-        Diccionario acumulador con la estructura:
-        { año: { trimestre: [prim_inc, prim_comp, sec_inc, sec_comp, sup] } }
-    """
-    
+    anio, trimestre, aglomerado, pondera, edad, nivel_ed = valores
     try:
-        # defino las variables para moverme en el archivo csv 
-        estructuraPrincipal = {} ##creamos el diccionario principal
-        for row in reader:
-            procesar_fila_formacion(row,estructuraPrincipal,numero_aglomerado)
-        return estructuraPrincipal  
-
-    except KeyError as e:
-        print(f"Error: faltan columnas esperadas en los CSV. Columna faltante: {e}")
-    except FileNotFoundError:
-        print("Error: no se encontró uno de los archivos especificados.")
-    except ValueError:
-        print("Error: se esperaba un número pero se recibió otro dato.")
-    except Exception as e:
-        print(f"Ocurrió un error inesperado: {e}")      
+        if (int(edad) > 18) and (numero_aglomerado == aglomerado):
+            if not (anio) in estructuraPrincipal:
+                estructuraPrincipal[anio]= {} # si es un nuevo anio, creamos el diccionario de ese anio
+            if not (trimestre) in estructuraPrincipal[anio]:
+                estructuraPrincipal[anio][trimestre] = [0,0,0,0,0]  # EN DEFAULT cuando es nuevo trimestre
+            if nivel_ed == '1':
+                estructuraPrincipal[anio][trimestre][0] += int (pondera)
+            elif nivel_ed == '2':
+                estructuraPrincipal[anio][trimestre][1] += int (pondera)
+            elif nivel_ed == '3':
+                estructuraPrincipal[anio][trimestre][2] += int (pondera)
+            elif nivel_ed == '4':
+                estructuraPrincipal[anio][trimestre][3] += int (pondera)
+            elif nivel_ed == '5' or nivel_ed== '6' :
+                estructuraPrincipal[anio][trimestre][4] += int (pondera)
+        # vamos cargando las personas que cumplen con cada condicion
+    except (IndexError,ValueError,KeyError) as e:
+        print(f'Error procesando la fila {valores}. {e}')
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 # INCISO 10 SECCION B = Pedir al usuario que seleccione dos aglomerados y a partir de la información
@@ -997,48 +1592,78 @@ def imprimir_comparacion_aglomerados(estructuraAglomerado1,estructuraAglomerado2
                 print("-" * 50)
     print("Nota: Porcentajes de personas > 18 años con secundario incompleto\n")
 
-def procesar_aglo (numero_aglomerado,reader):
+
+def procesar_fila_aglo (valores, estructuraAglomerado, numero_aglomerado):
     """
-    Procesa las filas de un CSV para acumular el total de personas mayores
-    y la cantidad con secundario incompleto por año y trimestre para un aglomerado dado.
+    Suma una fila del CSV al total de personas mayores y a la cantidad con secundario
+    incompleto por año y trimestre, si pertenece al aglomerado dado.
 
     Parámetros:
     -----------
+    valores : tuple
+        Valores de las columnas COLUMNAS_NIVEL_EDUCATIVO de una fila del CSV.
+    estructuraAglomerado : dict
+        Diccionario con estructura:
+        { año: { trimestre: [secIncTotal, totalPersonas] } }
     numero_aglomerado : str
         Código del aglomerado a filtrar.
-    reader : iterable
-        Objeto iterable que provee las filas del CSV (por ejemplo csv.reader).
+    """
 
-    Retorna:
-    --------
-    dict
-        Diccionario con estructura:
-        { año: { trimestre: [secIncTotal, totalPersonas] } }
+    anio, trimestre, aglomerado, pondera, edad, nivel_ed = valores
+    # consulto por la edad y por el aglomerado
+    if ((edad) > '18') and (aglomerado == numero_aglomerado):
+        if not anio in estructuraAglomerado: # si ese anio no esta en la estructura, lo agregamos
+            estructuraAglomerado[anio] = {}
+        # si dentro de ese anio no esta el trimestre, lo agregamos
+        if not trimestre in estructuraAglomerado[anio]:
+            estructuraAglomerado [anio][trimestre] = [0,0]
+        if nivel_ed == '3':
+            # primer valor= acumulador de secundario incompleto
+            estructuraAglomerado [anio][trimestre][0] += int (pondera)
+        # segundo valor= acumulador de personas mayores, que estan en el aglomerado
+        estructuraAglomerado[anio][trimestre][1] += int (pondera)
+
+
+def actualizar_comparacion(estado, valores):
+    """
+    Suma una fila del CSV a las estructuras de los dos aglomerados comparados.
+    """
+
+    procesar_fila_aglo(valores, estado["estructuraAglomerado1"], estado["numero_aglomerado_1"])
+    procesar_fila_aglo(valores, estado["estructuraAglomerado2"], estado["numero_aglomerado_2"])
+
+
+def imprimir_comparacion(estado):
+    """
+    Imprime la tabla comparativa de los dos aglomerados elegidos.
+    """
+
+    aglomerados = aglo_dict()
+    ## me guardo el nombre de cada aglomerado para despues imprimirlos.
+    nombre_aglomerado_1 = aglomerados[estado["numero_aglomerado_1"]]
+    nombre_aglomerado_2 = aglomerados[estado["numero_aglomerado_2"]]
+    imprimir_comparacion_aglomerados(
+        estado["estructuraAglomerado1"], estado["estructuraAglomerado2"], nombre_aglomerado_1, nombre_aglomerado_2
+    )
+
+
+def reporte_comparacion_dos_aglomerados(archivo_csv):
+    """
+    Pide al usuario los dos aglomerados y arma el reporte del inciso 10. Los dos aglomerados
+    se acumulan en la misma lectura del archivo.
     """
-    
-    # defino la estructura que voy a utilizar y retornar
-    estructuraAglomerado = {}
-    # defino las variables para moverme en el archivo csv
-    ANIO = 1
-    TRIMESTRE = 2
-    NIVEL_ED = 26
-    PONDERA = 9
-    COLUM_AGLOMERADO = 8
-    EDAD = 13
-    for row in reader:
-        # consulto por la edad y por el aglomerado
-        if ((row[EDAD]) > '18') and (row[COLUM_AGLOMERADO] == numero_aglomerado):
-            if not row[ANIO] in estructuraAglomerado: # si ese anio no esta en la estructura, lo agregamos
-                estructuraAglomerado[row [ANIO]] = {}
-            # si dentro de ese anio no esta el trimestre, lo agregamos
-            if not row[TRIMESTRE] in estructuraAglomerado[row [ANIO]]: 
-                estructuraAglomerado [row [ANIO]][row [TRIMESTRE]] = [0,0] 
-            if row[NIVEL_ED] == '3': 
-                # primer valor= acumulador de secundario incompleto
-                estructuraAglomerado [row [ANIO]][row [TRIMESTRE]][0] += int (row [PONDERA])
-            # segundo valor= acumulador de personas mayores, que estan en el aglomerado 
-            estructuraAglomerado[row[ANIO]][row[TRIMESTRE]][1] += int (row [PONDERA])
-    return estructuraAglomerado
+
+    aglomerados = aglo_dict()
+    for codigo,nombre in aglomerados.items():
+        print (f'{codigo}  {nombre}')
+    ## pido los aglomerados a comparar
+    numero_aglomerado_1= input (f'INGRESE EL NUMERO DEL ALGOMERADO 1:  ')
+    numero_aglomerado_2 = input (f'INGRESE EL NUMERO DEL ALGOMERADO 2:  ')
+    estado = {"numero_aglomerado_1": numero_aglomerado_1, "numero_aglomerado_2": numero_aglomerado_2,
+              "estructuraAglomerado1": {}, "estructuraAglomerado2": {}}
+    return reporte(etapa("I", COLUMNAS_NIVEL_EDUCATIVO, lambda previo: estado, actualizar_comparacion,
+                         imprimir_comparacion))
+
 
 def comparacion_dos_aglomerados (archivo_csv):
     """
@@ -1051,35 +1676,8 @@ def comparacion_dos_aglomerados (archivo_csv):
     archivo_csv : str
         Ruta del archivo CSV con datos educativos.
     """
-    try:
-        with open (archivo_csv,encoding='utf-8') as archivo:
-            reader = csv.reader(archivo,delimiter = ';')
-            next (reader)
-            aglomerados = aglo_dict()
-            for codigo,nombre in aglomerados.items():
-                print (f'{codigo}  {nombre}')
-            ## pido los aglomerados a comparar    
-            numero_aglomerado_1= input (f'INGRESE EL NUMERO DEL ALGOMERADO 1:  ')
-            numero_aglomerado_2 = input (f'INGRESE EL NUMERO DEL ALGOMERADO 2:  ')
-            ## proceso aglomerado 1
-            estructuraAglomerado1 = procesar_aglo (numero_aglomerado_1, reader)
-            archivo.seek(1)
-            estructuraAglomerado2 = procesar_aglo (numero_aglomerado_2, reader)
-            ## me guardo el nombre de cada aglomerado para despues imprimirlos.
-            nombre_aglomerado_1 = aglomerados[numero_aglomerado_1]
-            nombre_aglomerado_2 = aglomerados[numero_aglomerado_2]
-            imprimir_comparacion_aglomerados(
-                estructuraAglomerado1,estructuraAglomerado2,nombre_aglomerado_1,nombre_aglomerado_2
-            )
-
-    except KeyError as e:
-        print(f"Error: faltan columnas esperadas en los CSV. Columna faltante: {e}")
-    except FileNotFoundError:
-        print("Error: no se encontró uno de los archivos especificados.")
-    except ValueError:
-        print("Error: se esperaba un número pero se recibió otro dato.")
-    except Exception as e:
-        print(f"Ocurrió un error inesperado: {e}")
+
+    ejecutar_inciso(reporte_comparacion_dos_aglomerados(archivo_csv), archivo_individual=archivo_csv)
 
 
 
@@ -1130,62 +1728,60 @@ def imprimir_aglo_material_precario (aglo_mayor,aglo_menor,ultimo_trimestre,anio
     print(f"Menor % Material precario: {aglo_menor[1]['nombre']} ({aglo_menor[1]['porcentaje']}%)")
 
 
-def procesar_material_precario (reader,anio):
+COLUMNAS_MATERIAL_PRECARIO = ("ANO4", "TRIMESTRE", "AGLOMERADO", "PONDERA", "MATERIAL_TECHUMBRE")
+
+
+def actualizar_material_precario (estado, valores):
+    """
+    Suma una fila del CSV de hogares a los contadores de material precario por aglomerado, si es del año
+    pedido. Para cada trimestre posterior que aparece, los contadores vuelven a cero, de modo que
+    al final solo quedan los datos del último trimestre del año.
+
+    Parámetros:
+    -----------
+    estado : dict
+        Estado del reporte, con 'anio', 'ultimo_trimestre', 'aglomerados' y 'anio_encontrado'.
+    valores : tuple
+        Valores de las columnas COLUMNAS_MATERIAL_PRECARIO de una fila del CSV.
     """
-    Procesa un iterable CSV para calcular el porcentaje de personas
-    viviendo en material precario en cada aglomerado, filtrando por año.
 
-    Para cada trimestre dentro del año dado, se actualizan los contadores,
-    manteniendo solo los datos del último trimestre.
+    anio, trimestre, aglomerado, pondera, material_techumbre = valores
+    aglomerados = estado['aglomerados']
+
+    if int(anio) == estado['anio']:
+        estado['anio_encontrado'] = True
+        trimestre_actual = int(trimestre)
+        if estado['ultimo_trimestre'] < trimestre_actual:
+            estado['ultimo_trimestre'] = trimestre_actual
+            for aglo in aglomerados.values():
+                aglo['personas_precario'] = 0
+                aglo['personas_totales'] = 0
+        if estado['ultimo_trimestre'] == trimestre_actual:
+            aglomerados[aglomerado]['personas_totales'] += int(pondera)
+            if material_techumbre == 'Material Precario':
+                aglomerados[aglomerado]['personas_precario'] += int(pondera)
+
+
+def finalizar_material_precario (estado):
+    """
+    Calcula el porcentaje de personas viviendo en material precario en cada aglomerado
+    e imprime el aglomerado con mayor y con menor porcentaje.
 
     Parámetros:
     -----------
-    reader : iterable
-        Iterador sobre las filas del CSV (como csv.reader).
-    anio : int
-        Año a filtrar en los datos.
+    estado : dict
+        Estado del reporte después de recorrer el archivo (ver actualizar_material_precario).
+    """
 
-    Retorna:
-    --------
-    tuple
-        (aglo_mayor, aglo_menor, ultimo_trimestre, anio), donde:
-        - aglo_mayor y aglo_menor son tuplas (codigo, datos) 
-            con el aglomerado con mayor y menor porcentaje respectivamente.
-        - ultimo_trimestre es el número del último trimestre analizado.
-        - anio es el año analizado.
-    """
-
-    col_anio = 1
-    col_trimestre = 2
-    col_material_techumbre = 89
-    col_aglomerado = 7
-    col_pondera = 8
-    ultimo_trimestre = 0
-    aglomerados = inicializar_algo_contadores()
-    encabezado = next(reader)
-
-    anio_encontrado = False 
-
-    for row in reader:  
-        if int(row[col_anio]) == anio:
-            anio_encontrado = True
-            trimestre_actual = int(row[col_trimestre])
-            if ultimo_trimestre < trimestre_actual:
-                ultimo_trimestre = trimestre_actual
-                for aglo in aglomerados.values():
-                    aglo['personas_precario'] = 0
-                    aglo['personas_totales'] = 0
-            if ultimo_trimestre == trimestre_actual:
-                aglomerados[row[col_aglomerado]]['personas_totales'] += int(row[col_pondera])
-                if row[col_material_techumbre] == 'Material Precario':
-                    aglomerados[row[col_aglomerado]]['personas_precario'] += int(row[col_pondera])
-    
-    if not anio_encontrado:
+    anio = estado['anio']
+    ultimo_trimestre = estado['ultimo_trimestre']
+
+    if not estado['anio_encontrado']:
         print(f"No se encuentra el año {anio} en el dataset.")
         return
 
     porcentaje_aglomerados = {}
-    for codigo, datos in aglomerados.items():
+    for codigo, datos in estado['aglomerados'].items():
         if datos['personas_totales'] > 0:
             porcentaje = (datos['personas_precario'] / datos['personas_totales']) * 100
             porcentaje_aglomerados[codigo] = {
@@ -1204,6 +1800,29 @@ def procesar_material_precario (reader,anio):
         print(f"El año {anio} sí está, pero no hay datos suficientes para calcular porcentajes.")
 
 
+def reporte_material_precario(archivo_csv):
+    """
+    Pide al usuario el año y arma el reporte del inciso 11, o devuelve None (después de informarlo)
+    si el año no es válido.
+    """
+
+    try:
+        anio = int(input(
+            "ENTRE EL 2016 Y EL 2024 INGRESE EL ANIO QUE QUIERE OBTENER "
+            "EL AGLOMERADO CON MAYOR Y MENOR PORCENTAJE DE MATERIAL PRECARIO: "
+        ))
+    except ValueError as e:
+        informar_error(e)
+        return None
+    if (anio < 2016) or (anio > 2024):
+        print('AÑO INCORRECTO')
+        return None
+    estado = {'anio': anio, 'ultimo_trimestre': 0, 'aglomerados': inicializar_algo_contadores(),
+              'anio_encontrado': False}
+    return reporte(etapa("H", COLUMNAS_MATERIAL_PRECARIO, lambda previo: estado, actualizar_material_precario,
+                         finalizar_material_precario,
+                         periodos=lambda previo, disponibles: ultimo_periodo_del_anio(anio, disponibles)))
+
 
 def algomerado_material_precario (archivo_csv):
     """
@@ -1219,26 +1838,7 @@ def algomerado_material_precario (archivo_csv):
     de datos o entrada incorrecta del usuario.
     """
 
-    try:
-        with open (archivo_csv,encoding='utf-8') as archivo:
-            reader = csv.reader(archivo,delimiter = ';')
-            anio = int(input(
-                "ENTRE EL 2016 Y EL 2024 INGRESE EL ANIO QUE QUIERE OBTENER "
-                "EL AGLOMERADO CON MAYOR Y MENOR PORCENTAJE DE MATERIAL PRECARIO: "
-            ))           
-            if (anio < 2016) or (anio > 2024):
-                print('AÑO INCORRECTO')
-            else:
-                procesar_material_precario(reader, anio)
-
-    except KeyError as e:
-        print(f"Error: faltan columnas esperadas en los CSV. Columna faltante: {e}")
-    except FileNotFoundError:
-        print("Error: no se encontró uno de los archivos especificados.")
-    except ValueError:
-        print("Error: se esperaba un número pero se recibió otro dato.")
-    except Exception as e:
-        print(f"Ocurrió un error inesperado: {e}")
+    ejecutar_inciso(reporte_material_precario(archivo_csv), archivo_hogar=archivo_csv)
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - EJERCICIO 12 - - - - - - - - - - - - - - - - - - - - - - -
 #​ A partir de la información del último trimestre almacenado en el sistema se debe
@@ -1267,6 +1867,94 @@ def inicializar_estructura_jubilados():
     return estructura
 
 
+COLUMNAS_VIVIENDAS_INSUFICIENTES = ("ANO4", "TRIMESTRE", "CODUSU", "AGLOMERADO", "CONDICION_DE_HABITABILIDAD")
+# CAT_INAC: categoría de inactividad (1 = jubilado/pensionado)
+COLUMNAS_JUBILADOS = ("ANO4", "TRIMESTRE", "CODUSU", "AGLOMERADO", "PONDERA", "CAT_INAC")
+
+
+def actualizar_viviendas_insuficientes(estado, valores):
+    """
+    Guarda las viviendas con habitabilidad insuficiente del período más reciente visto hasta ahora.
+    Cuando aparece un período posterior, se descartan las viviendas guardadas.
+    """
+
+    anio, trimestre, codusu, aglomerado, habitabilidad = valores
+
+    periodo = (int(anio), int(trimestre))
+    if estado["periodo"] is None or periodo > estado["periodo"]:
+        estado["periodo"] = periodo
+        estado["viviendas_insu"] = {}
+    if periodo == estado["periodo"] and habitabilidad.strip() == 'Insuficiente':
+        estado["viviendas_insu"][codusu] = aglomerado
+
+
+def actualizar_jubilados(estado, valores):
+    """
+    Suma una fila del archivo de personas a los jubilados de su aglomerado, si es del período elegido.
+    """
+
+    anio, trimestre, codusu, aglomerado, pondera, es_jubilado = valores
+    aglomerados = estado["aglomerados"]
+
+    if (
+            (int(anio), int(trimestre)) == estado["periodo"] and
+            es_jubilado.strip() == '1'
+        ):
+        aglomerados[(aglomerado)]['jubilados_totales'] += int(pondera)
+        if (codusu) in estado["viviendas_insu"]:
+            aglomerados[(aglomerado)]['jubilados_insuficiente'] += int(pondera)
+
+
+def imprimir_jubilados(estado):
+    """
+    Imprime el porcentaje de jubilados en viviendas insuficientes de cada aglomerado.
+    """
+
+    print("\n Porcentaje de jubilados en viviendas insuficientes por aglomerado, del ultimo trimestre :")
+    print("{:<6} {:<40} {:<10}".format("Código", "Aglomerado", "Porcentaje"))
+    print("-" * 45)
+
+    for codigo, datos in estado["aglomerados"].items():
+        porcentaje = (
+            (datos['jubilados_insuficiente'] / datos['jubilados_totales']) * 100
+            if datos['jubilados_totales'] > 0
+            else 0
+        )
+        print("{:<6} {:<40} {:<10.2f}%".format(codigo, datos['nombre'],porcentaje))
+
+
+def viviendas_insuficientes_desde_indice(archivo_csv_hogar):
+    """
+    Arma el estado de la etapa de hogares del inciso 12 (las viviendas insuficientes del último período)
+    con el índice de hogares, sin leer el CSV de hogares. Devuelve None si el índice no está al día.
+    """
+
+    periodos = periodos_hogares(archivo_csv_hogar)
+    if not periodos:
+        return None
+    hogares = cargar_hogares(archivo_csv_hogar, *periodos[-1])
+    return {"periodo": periodos[-1],
+            "viviendas_insu": {codusu: datos["AGLOMERADO"] for (codusu, nro_hogar), datos in hogares.items()
+                               if datos["CONDICION_DE_HABITABILIDAD"].strip() == 'Insuficiente'}}
+
+
+def reporte_jubilados(archivo_csv_hogar, archivo_csv_individual):
+    """
+    Arma el reporte del inciso 12: primero se buscan en hogares el último período y sus viviendas
+    insuficientes, y después se recorren los jubilados de ese período en el archivo de personas.
+    Con el índice de hogares al día, solo se recorre el archivo de personas.
+    """
+
+    return reporte(
+        etapa("H", COLUMNAS_VIVIENDAS_INSUFICIENTES, lambda previo: {"periodo": None, "viviendas_insu": {}},
+              actualizar_viviendas_insuficientes, lambda estado: estado,
+              desde_cache=lambda previo: viviendas_insuficientes_desde_indice(archivo_csv_hogar),
+              periodos=ultimo_periodo),
+        etapa("I", COLUMNAS_JUBILADOS,
+              lambda viviendas: dict(viviendas, aglomerados=inicializar_estructura_jubilados()),
+              actualizar_jubilados, imprimir_jubilados, periodos=periodo_elegido))
+
+
 def jubilados_habitabilidad_insuficiente (archivo_csv_hogar,archivo_csv_individual):
     """
     Imprime el porcentaje de jubilados que viven en viviendas con habitabilidad insuficiente,
@@ -1291,66 +1979,122 @@ def jubilados_habitabilidad_insuficiente (archivo_csv_hogar,archivo_csv_individu
     Exception: Para cualquier otro error inesperado.
     """
 
-    col_anio = 1
-    col_codusu = 0
-    col_trimestre = 2
-    col_condi_habitabilidad = 91
-    col_aglomerado = 8
-    aglomerados = inicializar_estructura_jubilados()
-    viviendas_insu = {}
-
-    ult_anio, ult_trimestre = calcular_fechas(archivo_csv_hogar, 'mayor')
-    try:     
-        with open (archivo_csv_hogar, encoding='utf-8') as archivo:
-            reader_hogar = csv.reader(archivo,delimiter = ';')
-            next (reader_hogar) 
-
-            for row in reader_hogar:
-                # Solo procesamos filas del último trimestre
-                if (int(row[col_anio]) == ult_anio and 
-                    int(row[col_trimestre]) == ult_trimestre and 
-                    row[col_condi_habitabilidad].strip() == 'Insuficiente'):
-                    
-                    viviendas_insu[row[col_codusu]] = row[col_aglomerado]
-
-        with open (archivo_csv_individual, encoding='utf-8') as archivo:
-            reader_individual = csv.reader(archivo,delimiter = ';')
-            col_es_jubiliado = 29
-            col_pondera = 9
-
-            next (reader_individual)
-            for row in reader_individual:
-                if (
-                        int(row[col_anio]) == ult_anio and
-                        int(row[col_trimestre]) == ult_trimestre and
-                        row[col_es_jubiliado].strip() == '1'
-                    ):
-                    aglomerados[(row[col_aglomerado])]['jubilados_totales'] += int(row[col_pondera])
-                    if (row[col_codusu]) in viviendas_insu:
-                        aglomerados[(row[col_aglomerado])]['jubilados_insuficiente'] += int(row[col_pondera])
-
-        print("\n Porcentaje de jubilados en viviendas insuficientes por aglomerado, del ultimo trimestre :")
-        print("{:<6} {:<40} {:<10}".format("Código", "Aglomerado", "Porcentaje"))
-        print("-" * 45)
-
-        for codigo, datos in aglomerados.items():
-            porcentaje = (
-                (datos['jubilados_insuficiente'] / datos['jubilados_totales']) * 100
-                if datos['jubilados_totales'] > 0
-                else 0
-            )
-            print("{:<6} {:<40} {:<10.2f}%".format(codigo, datos['nombre'],porcentaje))
-
-    except KeyError as e:
-        print(f"Error: faltan columnas esperadas en los CSV. Columna faltante: {e}")
-    except FileNotFoundError:
-        print("Error: no se encontró uno de los archivos especificados.")
-    except ValueError:
-        print("Error: se esperaba un número pero se recibió otro dato.")
-    except Exception as e:
-        print(f"Ocurrió un error inesperado: {e}")
+    ejecutar_inciso(reporte_jubilados(archivo_csv_hogar, archivo_csv_individual),
+                    archivo_csv_hogar, archivo_csv_individual)
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - EJERCICIO 13 - - - - - - - - - - - - - - - - - - - - - - -
 
+COLUMNAS_HABITABILIDAD_ANIO = ("ANO4", "TRIMESTRE", "CODUSU", "CONDICION_DE_HABITABILIDAD")
+COLUMNAS_UNIVERSITARIOS_ANIO = ("ANO4", "TRIMESTRE", "CODUSU", "PONDERA", "NIVEL_ED_str")
+
+
+def actualizar_viviendas_insuficientes_anio(estado, valores):
+    """
+    Guarda las viviendas con habitabilidad insuficiente del último trimestre visto hasta ahora del año pedido.
+    """
+
+    anio, trimestre, codusu, habitabilidad = valores
+
+    if anio.strip() == estado["anio_buscado"]:
+        trimestre = trimestre.strip()
+        if estado["ultimo_trim"] is None or int(trimestre) > int(estado["ultimo_trim"]):
+            estado["ultimo_trim"] = trimestre
+            estado["viviendas_insu"] = {}
+        if trimestre == estado["ultimo_trim"] and habitabilidad.strip() == "Insuficiente":
+            codusu = codusu.strip()
+            estado["viviendas_insu"][codusu] = True
+
+
+def finalizar_viviendas_insuficientes_anio(estado):
+    """
+    Devuelve el estado para la etapa de personas, o None (después de informarlo) si no hay datos del año.
+    """
+
+    if estado["ultimo_trim"] is None:
+        print(f"No hay datos disponibles para el año {estado['anio_buscado']}.")
+        return None
+    return estado
+
+
+def actualizar_universitarios_insuficientes(estado, valores):
+    """
+    Suma las personas con estudios universitarios o superiores que viven en una de las viviendas guardadas.
+    """
+
+    anio, trimestre, codusu, pondera, nivel_ed = valores
+
+    if anio.strip() == estado["anio_buscado"] and trimestre.strip() == estado["ultimo_trim"]:
+        codusu = codusu.strip()
+        if codusu in estado["viviendas_insu"] and nivel_ed.strip() == "Superior o universitario.":
+            estado["cantidad"] += int(pondera)
+
+
+def imprimir_universitarios_insuficientes(estado):
+    """
+    Imprime la cantidad de universitarios en viviendas insuficientes del último trimestre del año.
+    """
+
+    print(f'\nEn el último trimestre ({estado["ultimo_trim"]}) del año {estado["anio_buscado"]}, hubo {estado["cantidad"]} personas')
+    print('con estudios universitarios o superiores que vivían en viviendas con habitabilidad insuficiente.')
+
+
+def informar_error_universitarios(error):
+    """
+    Informa un error de cantidad_universitarios_en_vivienda_insuficiente_en_anio.
+    """
+
+    if isinstance(error, KeyError):
+        print(f"Se accedió a una columna inexistente/erronea. Columna: {error}") #Solo puede pasar si está mal creado el dataset.
+    elif isinstance(error, FileNotFoundError):
+        print("No se encontró alguno de los archivos.")
+    elif isinstance(error, ValueError):
+        print("Se produjo un error al realizar la conversión.")
+    elif isinstance(error, PermissionError):
+        print("No se poseen permisos para acceder a los archivos.")
+    elif isinstance(error, TypeError):
+        print("Error en el pasaje de parametros.")
+    else:
+        informar_error(error)
+
+
+def viviendas_insuficientes_anio_desde_indice(hogar_csv, anio_buscado):
+    """
+    Arma el estado de la etapa de hogares del inciso 13 (las viviendas insuficientes del último trimestre
+    del año) con el índice de hogares, sin leer el CSV de hogares. Devuelve None si el índice no está al día.
+    """
+
+    periodos = periodos_hogares(hogar_csv)
+    if periodos is None:
+        return None
+    estado = {"anio_buscado": anio_buscado, "ultimo_trim": None, "viviendas_insu": {}}
+    for anio, trimestre in ultimo_periodo_del_anio(anio_buscado, periodos):
+        estado["ultimo_trim"] = str(trimestre)
+        estado["viviendas_insu"] = {codusu.strip(): True for (codusu, nro_hogar), datos
+                                    in cargar_hogares(hogar_csv, anio, trimestre).items()
+                                    if datos["CONDICION_DE_HABITABILIDAD"].strip() == "Insuficiente"}
+    return estado
+
+
+def reporte_universitarios_vivienda_insuficiente(individuos_csv, hogar_csv):
+    """
+    Pide al usuario el año y arma el reporte del inciso 13: en una lectura de hogares se busca
+    el último trimestre del año y sus viviendas insuficientes, y después se recorren las personas.
+    Con el índice de hogares al día, solo se recorre el archivo de personas.
+    """
+
+    anio_buscado = input('Ingrese el año a verificar: ').strip()
+    return reporte(
+        etapa("H", COLUMNAS_HABITABILIDAD_ANIO,
+              lambda previo: {"anio_buscado": anio_buscado, "ultimo_trim": None, "viviendas_insu": {}},
+              actualizar_viviendas_insuficientes_anio, finalizar_viviendas_insuficientes_anio,
+              desde_cache=lambda previo: viviendas_insuficientes_anio_desde_indice(hogar_csv, anio_buscado),
+              periodos=lambda previo, disponibles: ultimo_periodo_del_anio(anio_buscado, disponibles)),
+        etapa("I", COLUMNAS_UNIVERSITARIOS_ANIO, lambda viviendas: dict(viviendas, cantidad=0),
+              actualizar_universitarios_insuficientes, imprimir_universitarios_insuficientes,
+              periodos=lambda viviendas, disponibles: [(int(viviendas["anio_buscado"]),
+                                                        int(viviendas["ultimo_trim"]))]),
+        errores=informar_error_universitarios)
+
+
 def cantidad_universitarios_en_vivienda_insuficiente_en_anio(individuos_csv, hogar_csv):
     """
     Imprime la cantidad de personas con estudios universitarios o superiores
@@ -1374,65 +2118,49 @@ def cantidad_universitarios_en_vivienda_insuficiente_en_anio(individuos_csv, hog
     Exception: Para cualquier otro error inesperado.
     """
 
-    ANIO = 1
-    TRIM = 2
-    NIVEL_ED_str = 178
-    CODUSU = 0
-    COND_HAB = 91
-    PONDERA = 9
+    ejecutar_inciso(reporte_universitarios_vivienda_insuficiente(individuos_csv, hogar_csv), hogar_csv, individuos_csv)
 
-    try:
-        anio_buscado = input('Ingrese el año a verificar: ').strip()
-        
-        viviendas_insu = {}  # codusu -> trimestre
-        trimestres_disponibles = set()
-
-        #Se busca el ultimo trimestre del año
-        with open(hogar_csv, encoding='utf-8') as hogar:
-            reader = csv.reader(hogar, delimiter=";")
-            next(reader)
-            for row in reader:
-                if row[ANIO].strip() == anio_buscado:
-                    trimestres_disponibles.add(row[TRIM].strip())
-
-        if not trimestres_disponibles:
-            print(f"No hay datos disponibles para el año {anio_buscado}.")
-            return
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# TODOS LOS INCISOS EN UNA LECTURA: los incisos pedidos se resuelven juntos, leyendo una sola vez cada archivo.
+
+INCISOS = {
+    1: lambda hogar, individual: reporte_alfabetizacion(individual),
+    2: lambda hogar, individual: reporte_inmigrantes_academicos(individual),
+    3: lambda hogar, individual: reporte_menor_desocupacion(individual),
+    4: lambda hogar, individual: reporte_top_5_universitarios(hogar, individual),
+    5: lambda hogar, individual: reporte_propietarios(hogar),
+    6: lambda hogar, individual: reporte_viviendas_esp(hogar),
+    7: lambda hogar, individual: reporte_estudios(individual),
+    8: lambda hogar, individual: reporte_inquilinos(hogar),
+    9: lambda hogar, individual: reporte_formacion_por_aglomerado(individual),
+    10: lambda hogar, individual: reporte_comparacion_dos_aglomerados(individual),
+    11: lambda hogar, individual: reporte_material_precario(hogar),
+    12: lambda hogar, individual: reporte_jubilados(hogar, individual),
+    13: lambda hogar, individual: reporte_universitarios_vivienda_insuficiente(individual, hogar),
+}
+
+
+def ejecutar_incisos(incisos=None, archivo_hogar=PROCESSED_DATA_HOGAR, archivo_individual=PROCESSED_DATA_INDIVIDUAL):
+    """
+    Ejecuta varios incisos de la sección B con una sola lectura de cada archivo, en lugar de una por inciso.
 
-        ultimo_trim = max(trimestres_disponibles, key=lambda x: int(x))
-
-        # Se guardan la cantidad de viviendas insuficientes
-        with open(hogar_csv, encoding='utf-8') as hogar:
-            reader = csv.reader(hogar, delimiter=";")
-            next(reader)
-            for row in reader:
-                if row[ANIO].strip() == anio_buscado and row[TRIM].strip() == ultimo_trim:
-                    if row[COND_HAB].strip() == "Insuficiente":
-                        codusu = row[CODUSU].strip()
-                        viviendas_insu[codusu] = True
-
-        cantidad = 0
-        with open(individuos_csv, encoding='utf-8') as ind:
-            reader = csv.reader(ind, delimiter=";")
-            next(reader)
-            for row in reader:
-                if row[ANIO].strip() == anio_buscado and row[TRIM].strip() == ultimo_trim:
-                    codusu = row[CODUSU].strip()
-                    if codusu in viviendas_insu and row[NIVEL_ED_str].strip() == "Superior o universitario.":
-                        cantidad += int(row[PONDERA])
-
-        print(f'\nEn el último trimestre ({ultimo_trim}) del año {anio_buscado}, hubo {cantidad} personas')
-        print('con estudios universitarios o superiores que vivían en viviendas con habitabilidad insuficiente.')
-
-    except KeyError as e:
-        print(f"Se accedió a una columna inexistente/erronea. Columna: {e}") #Solo puede pasar si está mal creado el dataset.
-    except FileNotFoundError:
-        print("No se encontró alguno de los archivos.")
-    except ValueError:
-        print("Se produjo un error al realizar la conversión.")
-    except PermissionError:
-        print("No se poseen permisos para acceder a los archivos.")
-    except TypeError:
-        print("Error en el pasaje de parametros.")
+    Parámetros:
+    incisos (list of int, opcional): Números de los incisos a ejecutar (ver INCISOS). Por defecto, todos.
+    archivo_hogar (str): Ruta al archivo CSV de hogares. Por defecto, el procesado.
+    archivo_individual (str): Ruta al archivo CSV de personas. Por defecto, el procesado.
+
+    Salida:
+    Primero se piden al usuario los datos de los incisos que los necesitan. Después cada inciso imprime
+    su resultado apenas se termina de leer el último archivo que usa: primero los de hogares y
+    después los de personas y los que cruzan los dos archivos.
+
+    Retorna:
+    dict: {inciso: resultado}, por ejemplo la lista de aglomerados del inciso 4.
+    """
 
-# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
\ No newline at end of file
+    reportes = {}
+    for numero in (sorted(INCISOS) if incisos is None else incisos):
+        reporte_inciso = INCISOS[numero](archivo_hogar, archivo_individual)
+        if reporte_inciso is not None:
+            reportes[numero] = reporte_inciso
+    return ejecutar_reportes(reportes, {"H": archivo_hogar, "I": archivo_individual})
@@ -0,0 +1,134 @@
+from constantes import INDICE_HOGARES_PATH
+from reportes import accesor, leer_encabezado
+from pathlib import Path
+import csv
+import json
+import shutil
+
+CLAVE_HOGAR = ["CODUSU", "NRO_HOGAR"]
+ATRIBUTOS_HOGAR = ["AGLOMERADO", "PONDERA", "CONDICION_DE_HABITABILIDAD"] # columnas del hogar que se guardan
+
+
+def carpeta_indice(archivo_csv):
+    """
+    Devuelve la carpeta donde se guarda el índice de hogares de un CSV de hogares procesado.
+    """
+
+    return INDICE_HOGARES_PATH / Path(archivo_csv).stem
+
+
+def origen(archivo_csv):
+    """
+    Datos del CSV (ruta, tamaño y fecha de modificación) con los que se controla si el índice está al día.
+    """
+
+    estado = Path(archivo_csv).stat()
+    return {"archivo": str(Path(archivo_csv).resolve()), "tamanio": estado.st_size, "mtime": estado.st_mtime}
+
+
+def escribir_indice_hogares(archivo_csv):
+    """
+    Arma el índice de hogares de un CSV de hogares procesado: para cada período, un CSV que asocia
+    cada hogar (CODUSU, NRO_HOGAR) con su número de fila en el archivo de hogares y las columnas
+    ATRIBUTOS_HOGAR. Con él, los reportes que cruzan personas con hogares recorren solo el archivo
+    de personas, sin volver a leer el de hogares.
+
+    Parameters
+    ----------
+    archivo_csv : Path
+        Archivo de hogares procesado.
+
+    Returns
+    -------
+    int
+        Cantidad de hogares indexados.
+
+    -----
+    El archivo de hogares se lee una sola vez y cada período se escribe en su propio archivo
+    (ANO4_TRIMESTRE.csv), así que un reporte carga solo el período que usa.
+    """
+
+    columnas = leer_encabezado(archivo_csv)
+    atributos = [col for col in ATRIBUTOS_HOGAR if col in columnas]
+    obtener = accesor(columnas, ["ANO4", "TRIMESTRE"] + CLAVE_HOGAR + atributos)
+
+    carpeta = carpeta_indice(archivo_csv)
+    shutil.rmtree(carpeta, ignore_errors=True)
+    carpeta.mkdir(parents=True)
+
+    archivos = {}
+    escritores = {}
+    cantidad = 0
+    try:
+        with open(archivo_csv, "r", encoding="utf-8") as archivo:
+            reader = csv.reader(archivo, delimiter=";")
+            next(reader)
+            for fila, valores in enumerate(reader):
+                anio, trimestre, *resto = obtener(valores)
+                if not (anio.strip().isdigit() and trimestre.strip().isdigit()):
+                    continue # una fila sin período no se puede buscar
+                periodo = (int(anio), int(trimestre))
+                if periodo not in escritores:
+                    archivos[periodo] = open(carpeta / f"{periodo[0]}_{periodo[1]}.csv", "w", newline="",
+                                             encoding="utf-8")
+                    escritores[periodo] = csv.writer(archivos[periodo], delimiter=";")
+                    escritores[periodo].writerow(CLAVE_HOGAR + ["FILA"] + atributos)
+                escritores[periodo].writerow(resto[:2] + [fila] + resto[2:])
+                cantidad += 1
+    finally:
+        for archivo in archivos.values():
+            archivo.close()
+
+    # El origen se escribe al final: sin él el índice no se considera válido
+    (carpeta / "indice.json").write_text(json.dumps({
+        "origen": origen(archivo_csv),
+        "atributos": atributos,
+        "periodos": sorted(list(periodo) for periodo in escritores),
+    }, indent=4), encoding="utf-8")
+    return cantidad
+
+
+def leer_indice_hogares(archivo_csv):
+    """
+    Devuelve los datos del índice de hogares del CSV, o None si no existe o no corresponde a la versión actual.
+    """
+
+    try:
+        indice = json.loads((carpeta_indice(archivo_csv) / "indice.json").read_text(encoding="utf-8"))
+        vigente = indice.get("origen") == origen(archivo_csv)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return indice if vigente else None
+
+
+def periodos_hogares(archivo_csv):
+    """
+    Devuelve los períodos (ANO4, TRIMESTRE) del índice de hogares, ordenados, o None si el índice no está al día.
+    """
+
+    indice = leer_indice_hogares(archivo_csv)
+    if indice is None:
+        return None
+    return [tuple(periodo) for periodo in indice["periodos"]]
+
+
+def cargar_hogares(archivo_csv, anio, trimestre):
+    """
+    Carga los hogares de un período del índice.
+
+    Returns
+    -------
+    dict or None
+        {(CODUSU, NRO_HOGAR): {'FILA': fila en el archivo de hogares, y los atributos como texto}},
+        en el orden del archivo de hogares, o None si el índice no está al día o no tiene ese período.
+    """
+
+    if (anio, trimestre) not in (periodos_hogares(archivo_csv) or []):
+        return None
+    with open(carpeta_indice(archivo_csv) / f"{anio}_{trimestre}.csv", "r", encoding="utf-8") as archivo:
+        hogares = {}
+        for fila in csv.DictReader(archivo, delimiter=";"):
+            clave = (fila.pop("CODUSU"), fila.pop("NRO_HOGAR"))
+            fila["FILA"] = int(fila["FILA"])
+            hogares[clave] = fila
+    return hogares
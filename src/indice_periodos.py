@@ -0,0 +1,198 @@
+from pathlib import Path
+import codecs
+import csv
+import json
+
+TAMANIO_LECTURA = 1024 * 1024 # bytes que se copian por vez al reordenar el archivo
+
+
+def archivo_indice(archivo_csv):
+    """
+    Devuelve el archivo donde se guarda el índice de períodos de un CSV procesado (junto al CSV).
+    """
+
+    return Path(archivo_csv).with_name(f"{Path(archivo_csv).stem}_periodos.json")
+
+
+def origen(archivo_csv):
+    """
+    Datos del CSV (ruta, tamaño y fecha de modificación) con los que se controla si el índice está al día.
+    """
+
+    estado = Path(archivo_csv).stat()
+    return {"archivo": str(Path(archivo_csv).resolve()), "tamanio": estado.st_size, "mtime": estado.st_mtime}
+
+
+def numero(texto):
+    """
+    Convierte el texto de ANO4 o TRIMESTRE en entero, o devuelve None si no es un número.
+    """
+
+    texto = texto.strip()
+    return int(texto) if texto.isdigit() else None
+
+
+def leer_tramos(archivo_csv):
+    """
+    Recorre el CSV en modo binario y lo divide en tramos de filas consecutivas del mismo período.
+
+    Returns
+    -------
+    tuple
+        (columnas, inicio, tramos): los nombres de las columnas, el byte donde empiezan los datos
+        (después del encabezado) y una lista de {'ANO4', 'TRIMESTRE', 'inicio', 'fin', 'filas', 'pondera'},
+        en el orden del archivo. 'pondera' es la suma de PONDERA de las filas del tramo (las que no
+        tienen un número no suman). El período es (None, None) en las filas en las que ANO4 o
+        TRIMESTRE no son números.
+
+    -----
+    Un registro termina en un salto de línea con una cantidad par de comillas antes,
+    así que un campo entre comillas con saltos de línea no se parte.
+    Las filas sin comillas se separan con split, sin pasar por el módulo csv.
+    """
+
+    tramos = []
+    with open(archivo_csv, "rb") as archivo:
+        encabezado = next(csv.reader([archivo.readline().decode("utf-8")], delimiter=";"))
+        encabezado[0] = encabezado[0].lstrip(codecs.BOM_UTF8.decode("utf-8"))
+        columnas = [nombre.strip() for nombre in encabezado]
+        if "ANO4" not in columnas or "TRIMESTRE" not in columnas:
+            raise KeyError("ANO4, TRIMESTRE")
+        pos_anio, pos_trimestre = columnas.index("ANO4"), columnas.index("TRIMESTRE")
+        pos_pondera = columnas.index("PONDERA") if "PONDERA" in columnas else None
+
+        inicio = posicion = archivo.tell()
+        registro = b""
+        for linea in archivo:
+            registro += linea
+            if registro.count(b'"') % 2:
+                continue # el salto de línea está dentro de un campo entre comillas
+            if b'"' in registro:
+                campos = next(csv.reader([registro.decode("utf-8")], delimiter=";"))
+            else:
+                campos = registro.rstrip(b"\r\n").decode("utf-8").split(";")
+            periodo = (numero(campos[pos_anio]), numero(campos[pos_trimestre]))
+            pondera = numero(campos[pos_pondera]) if pos_pondera is not None else None
+            fin = posicion + len(registro)
+            if not tramos or (tramos[-1]["ANO4"], tramos[-1]["TRIMESTRE"]) != periodo:
+                tramos.append({"ANO4": periodo[0], "TRIMESTRE": periodo[1], "inicio": posicion, "fin": posicion,
+                               "filas": 0, "pondera": 0})
+            tramos[-1]["fin"] = fin
+            tramos[-1]["filas"] += 1
+            tramos[-1]["pondera"] += pondera or 0
+            posicion = fin
+            registro = b""
+    return columnas, inicio, tramos
+
+
+def clave_periodo(tramo):
+    """
+    Clave para ordenar los tramos por año y trimestre, con los de período desconocido al final.
+    """
+
+    return (tramo["ANO4"] is None, tramo["ANO4"] or 0, tramo["TRIMESTRE"] is None, tramo["TRIMESTRE"] or 0)
+
+
+def agrupar_por_periodo(archivo_csv, fuentes=None):
+    """
+    Deja las filas del CSV agrupadas y ordenadas por período (ANO4, TRIMESTRE) y escribe al lado
+    el índice con el rango de bytes de cada período, para que los lectores vayan directo al
+    trimestre que necesitan (ver rango_de_periodo).
+
+    El índice sirve también de metadatos del archivo, para responder sin leer los datos: tiene las
+    columnas, el primer y el último período ('desde' y 'hasta', como [ANO4, TRIMESTRE]), las filas
+    y la suma de PONDERA de cada período, y los archivos de origen con sus hashes.
+
+    Parameters
+    ----------
+    archivo_csv : Path
+        Archivo procesado.
+    fuentes : list of dict, optional
+        Archivos trimestrales de los que sale el CSV, como {'archivo', 'hash'}
+        (ver procesamiento.fuentes_del_manifiesto).
+
+    Returns
+    -------
+    list
+        Tramos que cambiaron de lugar, como (inicio, fin, nuevo_inicio) en bytes. Está vacía
+        si el archivo ya estaba ordenado, que es lo normal: el archivo unificado se arma
+        concatenando los archivos trimestrales, cada uno de un único período.
+
+    -----
+    Dentro de cada período las filas conservan su orden. Para reordenar se copian los tramos
+    completos a un archivo temporal que después reemplaza al CSV.
+    """
+
+    archivo_csv = Path(archivo_csv)
+    columnas, inicio, tramos = leer_tramos(archivo_csv)
+    ordenados = sorted(tramos, key=clave_periodo)
+    movimientos = []
+    if any(clave_periodo(a) >= clave_periodo(b) for a, b in zip(tramos, tramos[1:])):
+        temporal = archivo_csv.with_name(archivo_csv.name + ".orden")
+        with open(archivo_csv, "rb") as entrada, temporal.open("wb") as salida:
+            salida.write(entrada.read(inicio))
+            for tramo in ordenados:
+                nuevo_inicio = salida.tell()
+                entrada.seek(tramo["inicio"])
+                restante = tramo["fin"] - tramo["inicio"]
+                while restante > 0 and (bloque := entrada.read(min(restante, TAMANIO_LECTURA))):
+                    salida.write(bloque)
+                    restante -= len(bloque)
+                if nuevo_inicio != tramo["inicio"]:
+                    movimientos.append((tramo["inicio"], tramo["fin"], nuevo_inicio))
+                tramo["fin"] = salida.tell()
+                tramo["inicio"] = nuevo_inicio
+        temporal.replace(archivo_csv)
+
+    periodos = []
+    for tramo in ordenados:
+        if periodos and clave_periodo(periodos[-1]) == clave_periodo(tramo):
+            periodos[-1]["fin"] = tramo["fin"]
+            periodos[-1]["filas"] += tramo["filas"]
+            periodos[-1]["pondera"] += tramo["pondera"]
+        else:
+            periodos.append(dict(tramo))
+    conocidos = [[p["ANO4"], p["TRIMESTRE"]] for p in periodos if p["ANO4"] is not None and p["TRIMESTRE"] is not None]
+    archivo_indice(archivo_csv).write_text(json.dumps({
+        "origen": origen(archivo_csv),
+        "columnas": columnas,
+        "fuentes": fuentes or [],
+        "desde": conocidos[0] if conocidos else None,
+        "hasta": conocidos[-1] if conocidos else None,
+        "inicio": inicio,
+        "periodos": periodos,
+    }, indent=4), encoding="utf-8")
+    return movimientos
+
+
+def leer_indice(archivo_csv):
+    """
+    Devuelve el índice de períodos del CSV, o None si no existe o no corresponde a la versión actual del CSV.
+    """
+
+    try:
+        indice = json.loads(archivo_indice(archivo_csv).read_text(encoding="utf-8"))
+        vigente = indice.get("origen") == origen(archivo_csv)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return indice if vigente else None
+
+
+def periodos_disponibles(indice):
+    """
+    Devuelve los períodos (ANO4, TRIMESTRE) del índice, ordenados, sin las filas de período desconocido.
+    """
+
+    return [(p["ANO4"], p["TRIMESTRE"]) for p in indice["periodos"] if p["ANO4"] is not None
+            and p["TRIMESTRE"] is not None]
+
+
+def rango_de_periodo(indice, anio, trimestre):
+    """
+    Devuelve el rango de bytes (inicio, fin) de las filas de un período, o None si no está en el CSV.
+    """
+
+    for periodo in indice["periodos"]:
+        if (periodo["ANO4"], periodo["TRIMESTRE"]) == (anio, trimestre):
+            return periodo["inicio"], periodo["fin"]
+    return None
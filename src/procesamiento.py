@@ -1,6 +1,24 @@
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 import csv
-from constantes import DATA_OUT_PATH, PROCESSED_DATA_PATH
+import json
+import shutil
+import sys
+import tempfile
+from constantes import (DATA_OUT_PATH, PROCESSED_DATA_PATH, MANIFIESTO_INDIVIDUAL, MANIFIESTO_HOGAR,
+                        REGISTRO_PROCESADO_INDIVIDUAL, REGISTRO_PROCESADO_HOGAR)
+from indice_periodos import agrupar_por_periodo, leer_indice
+from indice_hogares import escribir_indice_hogares, leer_indice_hogares
+
+TAMANIO_BLOQUE = 1000 # filas que se procesan por vez
+TAMANIO_LECTURA = 1024 * 1024 # bytes que se leen por vez al dividir el archivo en partes
+AVISO_PROGRESO = 10000 # filas leídas entre dos avisos de progreso
+
+NUEVAS_COLUMNAS = {
+    "I": ["CH04_str", "NIVEL_ED_str", "CONDICION_LABORAL", "UNIVERSITARIO"],
+    "H": ["TIPO_HOGAR","MATERIAL_TECHUMBRE","DENSIDAD_HOGAR","CONDICION_DE_HABITABILIDAD"],
+}
 
 
 """def load_files (type):
@@ -324,7 +342,637 @@ def procesar_hogares(hog):
         )
 
 
-def procesar_data(indicator=None):
+def memoria_pico_mb():
+    """
+    Devuelve el pico de memoria residente (RSS) alcanzado por el proceso actual.
+
+    Returns
+    -------
+    float or None
+        Pico de memoria en MB, o None si el sistema operativo no lo informa (por ejemplo, Windows).
+    """
+    
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa el valor en KB y macOS en bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def columnas_procesadas(columnas, indicator):
+    """
+    Agrega a las columnas del archivo unificado las nuevas columnas que faltan, en orden.
+    """
+
+    columnas = list(columnas)
+    for col in NUEVAS_COLUMNAS[indicator]:
+        if col not in columnas:
+            columnas.append(col)
+    return columnas
+
+
+def procesar_por_filas(entrada, procesado, indicator, tamanio_bloque):
+    """
+    Procesa un archivo unificado aplicando las funciones de transformación fila por fila.
+
+    Parameters
+    ----------
+    entrada : file
+        Archivo unificado abierto en modo texto.
+    procesado : file
+        Archivo de salida abierto en modo texto con newline="".
+    indicator : str
+        'I' para individuos, 'H' para hogares.
+    tamanio_bloque : int
+        Cantidad de filas que se procesan por vez.
+    """
+
+    procesar_filas = procesar_individuos if indicator == "I" else procesar_hogares
+    csv_reader = csv.DictReader(entrada,delimiter=';')
+    columnas = columnas_procesadas(csv_reader.fieldnames, indicator)
+
+    csv_writer = csv.DictWriter(procesado,fieldnames=columnas,delimiter=";")
+    csv_writer.writeheader()
+    while data := list(islice(csv_reader, tamanio_bloque)):
+        procesar_filas(data)
+        for row in data:
+            clean_row = {col: row.get(col, "") for col in columnas}
+            csv_writer.writerow(clean_row)
+
+
+def contar_lineas(entrada, progreso, etapa="procesamiento"):
+    """
+    Devuelve sin cambios las líneas de entrada (encabezado incluido) y cada AVISO_PROGRESO filas
+    llama a progreso(etapa, filas, bytes_leidos) con lo leído desde el aviso anterior.
+    El encabezado se cuenta en los bytes pero no en las filas.
+    """
+
+    filas = -1
+    leidos = 0
+    for linea in entrada:
+        filas += 1
+        leidos += len(linea.encode("utf-8"))
+        if filas == AVISO_PROGRESO:
+            progreso(etapa, filas, leidos)
+            filas = leidos = 0
+        yield linea
+    if leidos:
+        progreso(etapa, filas, leidos)
+
+
+def procesar_archivo(entrada, procesado, indicator, motor, tamanio_bloque, progreso=None):
+    """
+    Escribe en procesado el contenido de entrada (encabezado incluido) con las nuevas columnas,
+    usando el motor indicado ('filas' o 'columnar').
+    Si se indica progreso, se le informan las filas y bytes leídos (ver contar_lineas).
+    """
+
+    if progreso is not None:
+        entrada = contar_lineas(entrada, progreso)
+    if motor == "columnar":
+        # pandas solo se necesita para este motor
+        from vectorizado import procesar_columnar
+        procesar_columnar(entrada, procesado, indicator, tamanio_bloque)
+    else:
+        procesar_por_filas(entrada, procesado, indicator, tamanio_bloque or TAMANIO_BLOQUE)
+
+
+def leer_linea(archivo):
+    """
+    Lee una línea de un archivo abierto en modo binario y la decodifica, con fin de línea '\\n'
+    como al leer en modo texto.
+    """
+
+    linea = archivo.readline().decode("utf-8")
+    if linea.endswith("\r\n"):
+        linea = linea[:-2] + "\n"
+    return linea
+
+
+def tiene_filas(archivo_csv):
+    """
+    Indica si un CSV tiene al menos una fila de datos además del encabezado.
+    """
+
+    with open(archivo_csv, "rb") as archivo:
+        archivo.readline()
+        return any(linea.strip() for linea in archivo)
+
+
+def dividir_en_rangos(archivo_csv, partes):
+    """
+    Divide el cuerpo de un CSV (sin el encabezado) en rangos de bytes de tamaño parecido,
+    que empiezan y terminan en un fin de registro.
+
+    Parameters
+    ----------
+    archivo_csv : Path
+        Archivo unificado.
+    partes : int
+        Cantidad de rangos buscada.
+
+    Returns
+    -------
+    tuple
+        (encabezado, rangos): la primera línea del archivo y una lista de (inicio, fin) en bytes.
+
+    -----
+    Un salto de línea solo es fin de registro si antes hay una cantidad par de comillas,
+    así que un campo entre comillas con saltos de línea nunca queda partido entre dos rangos.
+    """
+
+    total = archivo_csv.stat().st_size
+    with archivo_csv.open("rb") as archivo:
+        encabezado = leer_linea(archivo)
+        cortes = [archivo.tell()]
+        comillas = 0 # comillas leídas desde el último corte
+        for parte in range(1, partes):
+            objetivo = cortes[0] + (total - cortes[0]) * parte // partes
+            if objetivo <= cortes[-1]:
+                continue
+            archivo.seek(cortes[-1])
+            while (restante := objetivo - archivo.tell()) > 0:
+                comillas += archivo.read(min(restante, TAMANIO_LECTURA)).count(b'"')
+            while linea := archivo.readline():
+                comillas += linea.count(b'"')
+                if comillas % 2 == 0:
+                    break
+            if archivo.tell() >= total:
+                break
+            cortes.append(archivo.tell())
+            comillas = 0
+    cortes.append(total)
+    return encabezado, list(zip(cortes[:-1], cortes[1:]))
+
+
+def lineas_de_rango(archivo_csv, inicio, fin):
+    """
+    Devuelve una por una las líneas de un rango de bytes de un archivo.
+    """
+
+    with open(archivo_csv, "rb") as archivo:
+        archivo.seek(inicio)
+        while archivo.tell() < fin:
+            yield leer_linea(archivo)
+
+
+def procesar_rango(entrada_csv, encabezado, inicio, fin, destino, indicator, motor, tamanio_bloque, progreso=None):
+    """
+    Procesa un rango de bytes del archivo unificado y lo escribe en un archivo parcial
+    (con encabezado). Se usa como tarea de cada proceso cuando el procesamiento se hace en paralelo.
+
+    Parameters
+    ----------
+    entrada_csv : Path
+        Archivo unificado.
+    encabezado : str
+        Primera línea del archivo unificado.
+    inicio, fin : int
+        Rango de bytes a procesar, alineado a fin de registro.
+    destino : Path
+        Archivo parcial donde se escribe el resultado.
+    indicator : str
+        'I' para individuos, 'H' para hogares.
+    motor : str
+        'filas' o 'columnar'.
+    tamanio_bloque : int or None
+        Cantidad de filas que se procesan por vez.
+    progreso : callable, optional
+        Función a la que se informan las filas y bytes leídos del rango (ver contar_lineas).
+
+    Returns
+    -------
+    int
+        Cantidad de filas del rango.
+    """
+
+    filas = 0
+    def contar(etapa, nuevas, leidos):
+        nonlocal filas
+        filas += nuevas
+        if progreso is not None:
+            progreso(etapa, nuevas, leidos)
+
+    with open(destino, "w", newline="", encoding="utf-8") as procesado:
+        entrada = chain([encabezado], lineas_de_rango(entrada_csv, inicio, fin))
+        procesar_archivo(entrada, procesado, indicator, motor, tamanio_bloque, contar)
+    return filas
+
+
+def procesar_rangos(entrada_csv, encabezado, rangos, carpeta, indicator, motor, tamanio_bloque, procesos=None,
+                    progreso=None):
+    """
+    Procesa cada rango de bytes del archivo unificado en su propio archivo parcial (con encabezado),
+    repartiendo los rangos entre procesos si procesos es mayor que 1.
+
+    Parameters
+    ----------
+    entrada_csv : Path
+        Archivo unificado.
+    encabezado : str
+        Primera línea del archivo unificado.
+    rangos : list of tuple
+        Rangos (inicio, fin) en bytes, alineados a fin de registro.
+    carpeta : Path
+        Carpeta donde se escriben los parciales.
+    indicator : str
+        'I' para individuos, 'H' para hogares.
+    motor : str
+        'filas' o 'columnar'.
+    tamanio_bloque : int or None
+        Cantidad de filas que se procesan por vez.
+    procesos : int, optional
+        Cantidad de procesos.
+    progreso : callable, optional
+        Función a la que se informan las filas y bytes leídos (ver contar_lineas). En paralelo
+        se informa cada rango completo a medida que termina.
+
+    Returns
+    -------
+    list of Path
+        Un archivo parcial por rango, en el mismo orden.
+    """
+
+    parciales = [Path(carpeta) / f"{i}.csv" for i in range(len(rangos))]
+    if procesos is not None and procesos > 1:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            tareas = [pool.submit(procesar_rango, entrada_csv, encabezado, inicio, fin, parcial,
+                                  indicator, motor, tamanio_bloque)
+                      for (inicio, fin), parcial in zip(rangos, parciales)]
+            for (inicio, fin), tarea in zip(rangos, tareas):
+                filas = tarea.result()
+                if progreso is not None:
+                    progreso("procesamiento", filas, fin - inicio)
+    else:
+        for (inicio, fin), parcial in zip(rangos, parciales):
+            procesar_rango(entrada_csv, encabezado, inicio, fin, parcial, indicator, motor, tamanio_bloque, progreso)
+    return parciales
+
+
+def copiar_parcial(parcial, procesado, con_encabezado=False):
+    """
+    Copia un archivo parcial al final del archivo procesado (abierto en modo binario).
+
+    Returns
+    -------
+    tuple
+        (inicio, fin): rango de bytes que ocupan sus filas en el archivo procesado.
+    """
+
+    with open(parcial, "rb") as f:
+        encabezado = f.readline()
+        if con_encabezado:
+            procesado.write(encabezado)
+        inicio = procesado.tell()
+        shutil.copyfileobj(f, procesado, TAMANIO_LECTURA)
+    return inicio, procesado.tell()
+
+
+def procesar_en_paralelo(entrada_csv, procesado, indicator, motor, tamanio_bloque, procesos, progreso=None):
+    """
+    Procesa el archivo unificado dividido en rangos de bytes, uno por proceso, y une
+    los resultados parciales en el orden del archivo original.
+
+    Parameters
+    ----------
+    entrada_csv : Path
+        Archivo unificado.
+    procesado : file
+        Archivo de salida abierto en modo binario.
+    indicator : str
+        'I' para individuos, 'H' para hogares.
+    motor : str
+        'filas' o 'columnar'.
+    tamanio_bloque : int or None
+        Cantidad de filas que procesa cada proceso por vez.
+    procesos : int
+        Cantidad de procesos.
+    progreso : callable, optional
+        Función a la que se informa cada rango procesado (ver procesar_rangos).
+    """
+
+    encabezado, rangos = dividir_en_rangos(entrada_csv, procesos)
+    with tempfile.TemporaryDirectory(dir=PROCESSED_DATA_PATH) as carpeta_temporal:
+        parciales = procesar_rangos(entrada_csv, encabezado, rangos, carpeta_temporal,
+                                    indicator, motor, tamanio_bloque, procesos, progreso)
+        for i, parcial in enumerate(parciales):
+            copiar_parcial(parcial, procesado, con_encabezado=(i == 0)) # El encabezado se escribe una sola vez
+
+
+def leer_json(ruta):
+    """
+    Lee un archivo JSON, devolviendo None si no existe o está dañado.
+    """
+
+    try:
+        return json.loads(ruta.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def periodo_de_rango(entrada_csv, columnas, inicio, fin):
+    """
+    Devuelve el año y trimestre (ANO4, TRIMESTRE) de la primera fila de un rango del archivo unificado.
+    Cada archivo trimestral del INDEC corresponde a un único período.
+    """
+
+    if inicio >= fin:
+        return None, None
+    with open(entrada_csv, "rb") as archivo:
+        archivo.seek(inicio)
+        fila = dict(zip(columnas, next(csv.reader([leer_linea(archivo)], delimiter=";"))))
+    periodo = []
+    for col in ("ANO4", "TRIMESTRE"):
+        valor = fila.get(col, "").strip()
+        periodo.append(int(valor) if valor.isdigit() else None)
+    return tuple(periodo)
+
+
+def copiar_rango(origen, procesado, inicio, fin):
+    """
+    Copia un rango de bytes de un archivo al final del archivo procesado (abierto en modo binario).
+
+    Returns
+    -------
+    tuple
+        (inicio, fin): rango de bytes que ocupa la copia en el archivo procesado.
+    """
+
+    nuevo_inicio = procesado.tell()
+    with open(origen, "rb") as archivo:
+        archivo.seek(inicio)
+        restante = fin - inicio
+        while restante > 0 and (bloque := archivo.read(min(restante, TAMANIO_LECTURA))):
+            procesado.write(bloque)
+            restante -= len(bloque)
+    return nuevo_inicio, procesado.tell()
+
+
+def periodo_procesado(entrada_csv, columnas, entrada, inicio, fin):
+    """
+    Arma la entrada del registro del archivo procesado para un archivo trimestral del manifiesto.
+
+    Parameters
+    ----------
+    entrada_csv : Path
+        Archivo unificado.
+    columnas : list of str
+        Columnas del archivo unificado.
+    entrada : dict
+        Entrada del archivo trimestral en el manifiesto del archivo unificado.
+    inicio, fin : int
+        Rango de bytes que ocupan sus filas en el archivo procesado.
+    """
+
+    ano4, trimestre = periodo_de_rango(entrada_csv, columnas, entrada["inicio"], entrada["fin"])
+    return {"ANO4": ano4, "TRIMESTRE": trimestre, "archivo": entrada["nombre"], "hash": entrada["hash"],
+            "filas": entrada["filas"], "inicio": inicio, "fin": fin}
+
+
+def procesar_incremental(entrada_csv, procesado_csv, temporal_csv, ruta_manifiesto, ruta_registro,
+                         indicator, motor, tamanio_bloque, procesos, progreso=None):
+    """
+    Actualiza el archivo procesado procesando solo los períodos (archivos trimestrales)
+    nuevos o modificados desde la última vez, según el manifiesto del archivo unificado.
+
+    Parameters
+    ----------
+    entrada_csv : Path
+        Archivo unificado.
+    procesado_csv : Path
+        Archivo procesado.
+    temporal_csv : Path
+        Archivo temporal donde se arma el procesado cuando hay que reescribirlo.
+    ruta_manifiesto : Path
+        Manifiesto del archivo unificado (ver creacion_datasets).
+    ruta_registro : Path
+        Registro del archivo procesado: un período por archivo trimestral, con el hash
+        de su archivo de origen y el rango de bytes que ocupan sus filas procesadas.
+    indicator : str
+        'I' para individuos, 'H' para hogares.
+    motor : str
+        'filas' o 'columnar'.
+    tamanio_bloque : int or None
+        Cantidad de filas que se procesan por vez.
+    procesos : int or None
+        Cantidad de procesos entre los que se reparten los períodos a procesar.
+    progreso : callable, optional
+        Función a la que se informan las filas y bytes leídos de los períodos procesados.
+
+    Returns
+    -------
+    bool
+        False si el archivo unificado no tiene un manifiesto vigente y hay que procesarlo completo.
+
+    -----
+    Si los períodos ya procesados siguen siendo los primeros del archivo unificado,
+    los nuevos se agregan al final del archivo procesado. Si algún archivo trimestral
+    cambió o se eliminó, el procesado se rearma copiando tal cual las filas de los
+    períodos sin cambios y procesando solo los modificados.
+    """
+
+    manifiesto = leer_json(ruta_manifiesto)
+    if (manifiesto is None or not manifiesto.get("archivos")
+            or entrada_csv.stat().st_size != manifiesto["archivos"][-1]["fin"]):
+        print("El archivo unificado no tiene un manifiesto vigente. Se procesa completo.")
+        return False
+
+    registro = leer_json(ruta_registro)
+    vigente = (registro is not None and registro.get("encabezado") == manifiesto["encabezado"]
+               and procesado_csv.exists() and procesado_csv.stat().st_size == registro.get("tamanio"))
+    anteriores = {(p["archivo"], p["hash"]): p for p in registro["periodos"]} if vigente else {}
+    entradas = manifiesto["archivos"]
+    pendientes = [e for e in entradas if (e["nombre"], e["hash"]) not in anteriores]
+    claves = [(e["nombre"], e["hash"]) for e in entradas]
+    solo_agregar = vigente and claves[:len(registro["periodos"])] == [(p["archivo"], p["hash"]) for p in registro["periodos"]]
+
+    if vigente and not pendientes and solo_agregar:
+        print("No hay períodos nuevos ni modificados para procesar.")
+        return True
+    print(f"{len(entradas) - len(pendientes)} período(s) sin cambios. Se procesan {len(pendientes)} período(s).")
+
+    columnas = next(csv.reader([manifiesto["encabezado"]], delimiter=";"))
+    with entrada_csv.open("rb") as archivo:
+        encabezado = leer_linea(archivo)
+
+    with tempfile.TemporaryDirectory(dir=PROCESSED_DATA_PATH) as carpeta_temporal:
+        parciales = procesar_rangos(entrada_csv, encabezado, [(e["inicio"], e["fin"]) for e in pendientes],
+                                    carpeta_temporal, indicator, motor, tamanio_bloque, procesos, progreso)
+        parcial_de = dict(zip([(e["nombre"], e["hash"]) for e in pendientes], parciales))
+
+        if solo_agregar:
+            periodos = registro["periodos"]
+            inicio_datos = registro["inicio"]
+            with procesado_csv.open("ab") as procesado:
+                for entrada in pendientes:
+                    inicio, fin = copiar_parcial(parcial_de[(entrada["nombre"], entrada["hash"])], procesado)
+                    periodos.append(periodo_procesado(entrada_csv, columnas, entrada, inicio, fin))
+        else:
+            periodos = []
+            with temporal_csv.open("wb") as procesado:
+                if parciales:
+                    with open(parciales[0], "rb") as f:
+                        procesado.write(f.readline())
+                else:
+                    copiar_rango(procesado_csv, procesado, 0, registro["inicio"])
+                inicio_datos = procesado.tell()
+                for entrada, clave in zip(entradas, claves):
+                    if clave in parcial_de:
+                        inicio, fin = copiar_parcial(parcial_de[clave], procesado)
+                        periodos.append(periodo_procesado(entrada_csv, columnas, entrada, inicio, fin))
+                    else:
+                        previo = anteriores[clave]
+                        inicio, fin = copiar_rango(procesado_csv, procesado, previo["inicio"], previo["fin"])
+                        periodos.append({**previo, "inicio": inicio, "fin": fin})
+            temporal_csv.replace(procesado_csv)
+
+    ruta_registro.write_text(json.dumps({
+        "encabezado": manifiesto["encabezado"],
+        "inicio": inicio_datos,
+        "tamanio": procesado_csv.stat().st_size,
+        "periodos": periodos,
+    }, indent=4), encoding="utf-8")
+    return True
+
+
+def fuentes_del_manifiesto(entrada_csv, ruta_manifiesto):
+    """
+    Devuelve los archivos trimestrales de los que sale el archivo unificado, como {'archivo', 'hash'},
+    según su manifiesto. Si el manifiesto no está al día con el archivo unificado, devuelve una lista vacía.
+    """
+
+    manifiesto = leer_json(ruta_manifiesto)
+    if (manifiesto is None or not manifiesto.get("archivos")
+            or entrada_csv.stat().st_size != manifiesto["archivos"][-1]["fin"]):
+        return []
+    return [{"archivo": entrada["nombre"], "hash": entrada["hash"]} for entrada in manifiesto["archivos"]]
+
+
+def actualizar_indice_periodos(procesado_csv, ruta_registro, fuentes=None):
+    """
+    Agrupa por período las filas del archivo procesado y regenera su índice de períodos y metadatos
+    (ver indice_periodos.py), si no está al día.
+
+    Parameters
+    ----------
+    procesado_csv : Path
+        Archivo procesado.
+    ruta_registro : Path
+        Registro del procesamiento incremental. Si el archivo se reordena, los rangos de bytes
+        del registro se corrigen; si alguno no se puede corregir, el registro se elimina y
+        la próxima actualización incremental procesa todo de nuevo.
+    fuentes : list of dict, optional
+        Archivos trimestrales de origen que se guardan en los metadatos (ver fuentes_del_manifiesto).
+    """
+
+    if leer_indice(procesado_csv) is not None:
+        return
+    movimientos = agrupar_por_periodo(procesado_csv, fuentes)
+    if not movimientos:
+        return
+    print("Las filas del archivo procesado se reordenaron por período.")
+
+    registro = leer_json(ruta_registro)
+    if registro is None:
+        return
+    for periodo in registro["periodos"]:
+        for inicio, fin, nuevo_inicio in movimientos:
+            if inicio <= periodo["inicio"] and periodo["fin"] <= fin:
+                desplazamiento = nuevo_inicio - inicio
+                periodo["inicio"] += desplazamiento
+                periodo["fin"] += desplazamiento
+                break
+        else:
+            if any(inicio < periodo["fin"] and periodo["inicio"] < fin for inicio, fin, _ in movimientos):
+                ruta_registro.unlink(missing_ok=True)
+                return
+    ruta_registro.write_text(json.dumps(registro, indent=4), encoding="utf-8")
+
+
+def indexar_procesado(indicator, fuentes=None):
+    """
+    Deja el archivo procesado agrupado por período y con su índice de períodos al día
+    (ver actualizar_indice_periodos) y, para hogares, también el índice de hogares
+    (ver actualizar_indice_hogares). Se llama cada vez que se reescribe el procesado,
+    desde procesar_data y desde actualizacion.actualizar_dataset.
+
+    Parameters
+    ----------
+    indicator : str
+        'I' o 'i' para individuos, 'H' o 'h' para hogares.
+    fuentes : list of dict, optional
+        Archivos trimestrales de origen que se guardan en los metadatos (ver fuentes_del_manifiesto).
+    """
+
+    es_individuo = indicator.upper() == "I"
+    procesado_csv = PROCESSED_DATA_PATH / ("individual_procesado.csv" if es_individuo else "hogar_procesado.csv")
+    ruta_registro = REGISTRO_PROCESADO_INDIVIDUAL if es_individuo else REGISTRO_PROCESADO_HOGAR
+    actualizar_indice_periodos(procesado_csv, ruta_registro, fuentes)
+    if not es_individuo:
+        actualizar_indice_hogares(procesado_csv)
+
+
+def actualizar_indice_hogares(procesado_csv):
+    """
+    Regenera el índice de hogares por período (ver indice_hogares.py) a partir del archivo
+    de hogares procesado, si no está al día.
+    """
+
+    if leer_indice_hogares(procesado_csv) is not None:
+        return
+    escribir_indice_hogares(procesado_csv)
+
+
+def actualizar_cache_columnas(indicator):
+    """
+    Regenera la caché binaria de columnas (ver cache_columnas.py) a partir del archivo procesado,
+    si no está al día. Si NumPy o pandas no están instalados, solo lo informa.
+
+    Parameters
+    ----------
+    indicator : str
+        'I' o 'i' para individuos, 'H' o 'h' para hogares.
+    """
+
+    try:
+        from cache_columnas import cache_vigente, escribir_cache
+    except ImportError:
+        print("NumPy o pandas no están instalados: no se genera la caché de columnas.")
+        return
+
+    procesado_csv = PROCESSED_DATA_PATH / ("individual_procesado.csv" if indicator.upper() == "I" else "hogar_procesado.csv")
+    if cache_vigente(procesado_csv):
+        return
+    escribir_cache(procesado_csv)
+
+
+def actualizar_cubo(indicator):
+    """
+    Regenera el cubo de conteos ponderados (ver cubo.py) a partir del archivo procesado,
+    si no está al día. Si pandas no está instalado, solo lo informa.
+
+    Parameters
+    ----------
+    indicator : str
+        'I' o 'i' para individuos, 'H' o 'h' para hogares.
+    """
+
+    try:
+        from cubo import cubo_vigente, escribir_cubo
+    except ImportError:
+        print("pandas no está instalado: no se genera el cubo de conteos ponderados.")
+        return
+
+    procesado_csv = PROCESSED_DATA_PATH / ("individual_procesado.csv" if indicator.upper() == "I" else "hogar_procesado.csv")
+    if cubo_vigente(procesado_csv):
+        return
+    escribir_cubo(procesado_csv)
+
+
+def procesar_data(indicator=None, tamanio_bloque=None, motor="filas", procesos=None, incremental=False,
+                  cache=False, cubo=False, progreso=None):
     """
     Esta función procesa todos los datos unificados en bruto y crea un nuevo archivo CSV 
     con las nuevas columnas en la carpeta processed_data.
@@ -334,10 +982,52 @@ def procesar_data(indicator=None):
     indicator : str, optional
         Indicador para seleccionar tipo de datos a procesar:
         'I' o 'i' para individuos, 'H' o 'h' para hogares.
+    tamanio_bloque : int, optional
+        Cantidad de filas que se leen, transforman y escriben por vez. Por defecto
+        TAMANIO_BLOQUE con el motor por filas y TAMANIO_BLOQUE_COLUMNAR con el columnar.
+    motor : str, optional
+        'filas' aplica las funciones de transformación fila por fila (por defecto).
+        'columnar' calcula las nuevas columnas sobre bloques completos con pandas/NumPy
+        (ver vectorizado.py); el archivo resultante es el mismo.
+    procesos : int, optional
+        Cantidad de procesos entre los que se reparte el archivo, dividido en rangos de bytes.
+        Si es None o 1, el archivo se procesa en el proceso actual.
+    incremental : bool, optional
+        Si es True, solo se procesan los períodos (archivos trimestrales) nuevos o modificados
+        según el manifiesto del archivo unificado, y el resto se conserva del procesado anterior
+        (ver procesar_incremental). Sin manifiesto vigente se procesa todo el archivo.
+    cache : bool, optional
+        Si es True también se regenera la caché binaria de columnas que usan los análisis de
+        consola de funcionalidad.py y la app (ver cache_columnas.py).
+    cubo : bool, optional
+        Si es True también se regenera el cubo de conteos ponderados con el que se dibujan
+        varios gráficos de la app (ver cubo.py).
+        La caché y el cubo se rearman a partir de todo el archivo, así que por defecto no se
+        regeneran aquí: lo hace la actualización de la app (actualizacion.actualizar_datos).
+    progreso : callable, optional
+        Función progreso(etapa, filas, bytes_leidos) a la que se informa, a medida que se procesa,
+        cuántas filas y bytes del archivo unificado se leyeron desde el aviso anterior
+        (etapa es 'procesamiento'). Antes de regenerar la caché y el cubo se informa
+        la etapa 'almacenes', sin filas. Se usa para mostrar el avance real de la actualización.
+
+    Returns
+    -------
+    bool or None
+        True si el archivo quedó procesado, o None si no se pudo procesar (el error se informa por pantalla).
 
     -----
     Verifica la existencia de archivos y directorios necesarios, maneja errores
     comunes y escribe el archivo procesado en la carpeta correspondiente.
+    El archivo se procesa por bloques de filas, por lo que la memoria usada no depende
+    del tamaño del dataset. El resultado se escribe primero en un archivo temporal que
+    reemplaza al procesado recién al terminar; si el archivo unificado no tiene filas, se descarta
+    y se conserva el procesado anterior. Al final se informa el pico de memoria del proceso.
+    Las filas del procesado quedan agrupadas por período y junto a él se escribe un índice con el
+    rango de bytes de cada período y los metadatos del archivo (ver actualizar_indice_periodos).
+    Con los hogares se arma además el índice que asocia cada hogar con sus datos, por período,
+    para cruzarlos con las personas sin releer el archivo (ver actualizar_indice_hogares).
+    En paralelo, cada proceso escribe su rango en un archivo parcial y los parciales se unen
+    en orden, por lo que el resultado es idéntico al del procesamiento en un solo proceso.
     """
     indicadores  = ['I','H','i','h']
     
@@ -345,12 +1035,16 @@ def procesar_data(indicator=None):
     if indicator not in indicadores:
         print("Ingrese un indicador o ingrese uno adecuado.")
         return
+    elif motor not in ("filas", "columnar"):
+        print("Ingrese un motor adecuado ('filas' o 'columnar').")
+        return
     else:
         try:
             nombre = "individual" if indicator.upper() == 'I' else 'hogar'
     
             entrada_csv = DATA_OUT_PATH / f'usu_{nombre}.csv'
             procesado_csv = PROCESSED_DATA_PATH / f'{nombre}_procesado.csv'
+            temporal_csv = PROCESSED_DATA_PATH / f'{nombre}_procesado.csv.tmp'
     
             if not (PROCESSED_DATA_PATH.exists()):
                 print(f'La carpeta {PROCESSED_DATA_PATH} no existe. Verificá la estructura del proyecto.')
@@ -359,28 +1053,45 @@ def procesar_data(indicator=None):
             if not (entrada_csv.exists()):
                 print(f'El archivo no se encontró. Unifique los datasets primero.')
                 return
-    
-            with entrada_csv.open("r",encoding='utf-8') as entrada:
-                csv_reader = csv.DictReader(entrada,delimiter=';')
-                data = list(csv_reader)
-                columnas = csv_reader.fieldnames.copy()
-        
-            if indicator.upper() == "I":
-                procesar_individuos(data)
-                nuevas_columnas = ["CH04_str", "NIVEL_ED_str", "CONDICION_LABORAL", "UNIVERSITARIO"]
-            else:
-                procesar_hogares(data)
-                nuevas_columnas = ["TIPO_HOGAR","MATERIAL_TECHUMBRE","DENSIDAD_HOGAR","CONDICION_DE_HABITABILIDAD"]
-    
-            for col in nuevas_columnas:
-                if col not in columnas:
-                    columnas.append(col)
-        
-            with procesado_csv.open("w",newline="",encoding="utf-8") as procesado:
-                csv_writer = csv.DictWriter(procesado,fieldnames=columnas,delimiter=";")
-                csv_writer.writeheader()
-                for row in data:
-                    clean_row = {col: row.get(col, "") for col in columnas}
-                    csv_writer.writerow(clean_row)
+
+            es_individuo = indicator.upper() == 'I'
+            ruta_registro = REGISTRO_PROCESADO_INDIVIDUAL if es_individuo else REGISTRO_PROCESADO_HOGAR
+            ruta_manifiesto = MANIFIESTO_INDIVIDUAL if es_individuo else MANIFIESTO_HOGAR
+            listo = False
+            if incremental:
+                listo = procesar_incremental(entrada_csv, procesado_csv, temporal_csv, ruta_manifiesto, ruta_registro,
+                                             indicator.upper(), motor, tamanio_bloque, procesos, progreso)
+
+            if not listo:
+                if procesos is not None and procesos > 1:
+                    with temporal_csv.open("wb") as procesado:
+                        procesar_en_paralelo(entrada_csv, procesado, indicator.upper(), motor, tamanio_bloque, procesos,
+                                             progreso)
+                else:
+                    with entrada_csv.open("r",encoding='utf-8') as entrada, \
+                            temporal_csv.open("w",newline="",encoding="utf-8") as procesado:
+                        procesar_archivo(entrada, procesado, indicator.upper(), motor, tamanio_bloque, progreso)
+
+                if not tiene_filas(temporal_csv):
+                    temporal_csv.unlink()
+                    print(f'El archivo {entrada_csv.name} no tiene filas. Se conserva el archivo procesado anterior.')
+                    return
+                # El registro de períodos deja de corresponder al archivo reescrito
+                ruta_registro.unlink(missing_ok=True)
+                temporal_csv.replace(procesado_csv)
+
+            indexar_procesado(indicator, fuentes_del_manifiesto(entrada_csv, ruta_manifiesto))
+
+            if progreso is not None and (cache or cubo):
+                progreso("almacenes", 0, 0)
+            if cache:
+                actualizar_cache_columnas(indicator)
+            if cubo:
+                actualizar_cubo(indicator)
+
+            pico = memoria_pico_mb()
+            if pico is not None:
+                print(f'Memoria pico del proceso: {pico:.1f} MB')
+            return True
         except Exception as e: #  Por ejemplo, cuando se corta la creacion del dataset(no hay permisos de escritura).
-            print(F'Error al procesar los datos. {e}')
\ No newline at end of file
+            print(F'Error al procesar los datos. {e}')
@@ -0,0 +1,288 @@
+from indice_periodos import leer_indice, periodos_disponibles, rango_de_periodo
+from contextlib import closing
+from operator import itemgetter
+import codecs
+import csv
+
+ARCHIVOS = ("H", "I") # orden en que se leen los archivos en cada vuelta: primero hogares, después individuos
+
+
+def etapa(archivo, columnas, iniciar, actualizar, finalizar, desde_cache=None, periodos=None):
+    """
+    Describe una etapa de un reporte: una lectura de un archivo con un acumulador.
+
+    Parámetros:
+    archivo (str): 'H' (hogares) o 'I' (individuos).
+    columnas (tuple of str): Nombres de las columnas del CSV que usa la etapa.
+    iniciar (function): Recibe el resultado de la etapa anterior (o None) y devuelve el estado inicial.
+    actualizar (function): Recibe el estado y los valores de una fila (tupla de textos, en el orden
+        de columnas) y actualiza el estado.
+    finalizar (function): Recibe el estado y devuelve el resultado de la etapa. En la última etapa
+        es el resultado del reporte (y normalmente lo imprime). Si una etapa que no es la última
+        devuelve None, el reporte termina ahí.
+    desde_cache (function, opcional): Recibe lo mismo que iniciar y devuelve el estado ya completo,
+        calculado sin leer el CSV (por ejemplo, con la caché de columnas), o None si no puede.
+    periodos (function, opcional): Para las etapas que solo usan algunos trimestres. Recibe lo mismo
+        que iniciar y la lista ordenada de períodos (ANO4, TRIMESTRE) del archivo, y devuelve los
+        períodos que hay que leer, o None para leer todo. Si el archivo tiene un índice de períodos
+        al día (ver indice_periodos.py), la etapa recibe solo las filas de esos períodos; si no,
+        recibe todas, así que actualizar tiene que seguir filtrando por período.
+
+    Retorna:
+    dict: La etapa.
+    """
+
+    return {"archivo": archivo, "columnas": tuple(columnas), "iniciar": iniciar, "actualizar": actualizar,
+            "finalizar": finalizar, "desde_cache": desde_cache, "periodos": periodos}
+
+
+def informar_error(error):
+    """
+    Imprime el mensaje de error de los incisos según el tipo de excepción.
+    """
+
+    if isinstance(error, KeyError):
+        print(f"Error: faltan columnas esperadas en los CSV. Columna faltante: {error}")
+    elif isinstance(error, FileNotFoundError):
+        print("Error: no se encontró uno de los archivos especificados.")
+    elif isinstance(error, ValueError):
+        print("Error: se esperaba un número pero se recibió otro dato.")
+    else:
+        print(f"Ocurrió un error inesperado: {error}")
+
+
+def reporte(*etapas, errores=informar_error):
+    """
+    Arma un reporte a partir de sus etapas, en el orden en que se ejecutan.
+
+    Parámetros:
+    etapas (dict): Etapas creadas con etapa.
+    errores (function, opcional): Recibe la excepción si el reporte falla e informa el error.
+        Por defecto, informar_error.
+
+    Retorna:
+    dict: El reporte, para pasarlo a ejecutar_reportes.
+    """
+
+    return {"etapas": list(etapas), "errores": errores}
+
+
+def leer_encabezado(ruta):
+    """
+    Devuelve los nombres de las columnas de un CSV separado por ';', sin el BOM inicial.
+    """
+
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        columnas = next(csv.reader(archivo, delimiter=';'))
+    columnas[0] = columnas[0].lstrip(codecs.BOM_UTF8.decode('utf-8'))
+    return columnas
+
+
+def accesor(encabezado, columnas):
+    """
+    Arma una función que toma de una fila del CSV los valores de las columnas pedidas,
+    buscando una sola vez la posición de cada columna en el encabezado.
+
+    Parámetros:
+    encabezado (list of str): Nombres de las columnas del CSV (ver leer_encabezado).
+    columnas (tuple of str): Columnas a tomar.
+
+    Retorna:
+    function: Recibe una fila (lista de textos) y devuelve la tupla de valores, en el orden de columnas.
+
+    Raises:
+    KeyError: Si alguna columna no está en el encabezado, antes de leer ninguna fila.
+    """
+
+    posiciones = {nombre.strip(): indice for indice, nombre in enumerate(encabezado)}
+    faltantes = [columna for columna in columnas if columna not in posiciones]
+    if faltantes:
+        raise KeyError(", ".join(faltantes))
+    indices = [posiciones[columna] for columna in columnas]
+    if len(indices) == 1:
+        indice = indices[0]
+        return lambda fila: (fila[indice],) # itemgetter con un solo índice no devuelve una tupla
+    return itemgetter(*indices)
+
+
+def lineas_de_rango(ruta, inicio, fin):
+    """
+    Devuelve una por una las líneas de un rango de bytes de un archivo, ya decodificadas.
+    """
+
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(inicio)
+        restante = fin - inicio
+        for linea in archivo:
+            if restante <= 0:
+                break
+            restante -= len(linea)
+            yield linea.decode('utf-8')
+
+
+def leer_filas(ruta, acumuladores, rango=None):
+    """
+    Recorre una vez un CSV y pasa cada fila a todos los acumuladores.
+
+    Parámetros:
+    ruta (str o Path): Archivo CSV, separado por ';' y con encabezado.
+    acumuladores (dict): {nombre: (obtener, actualizar, estado)}, donde obtener es el accesor
+        de las columnas que usa el acumulador.
+    rango (tuple, opcional): (inicio, fin) en bytes, alineado a fin de registro. Si se da,
+        solo se leen las filas de ese rango (por ejemplo, las de un período del índice).
+
+    Retorna:
+    dict: {nombre: excepción} de los acumuladores que fallaron. Un acumulador que falla
+    deja de recibir filas, y el resto sigue.
+    """
+
+    fallas = {}
+    lineas = open(ruta, 'r', encoding='utf-8') if rango is None else closing(lineas_de_rango(ruta, *rango))
+    with lineas as archivo:
+        reader = csv.reader(archivo, delimiter=';')
+        if rango is None:
+            next(reader)
+        activos = list(acumuladores.items())
+        for fila in reader:
+            for nombre, (obtener, actualizar, estado) in activos:
+                try:
+                    actualizar(estado, obtener(fila))
+                except Exception as error:
+                    fallas[nombre] = error
+            # Si en esta fila falló algún acumulador, se lo saca de los activos
+            if len(fallas) + len(activos) > len(acumuladores):
+                activos = [(nombre, acumulador) for nombre, acumulador in activos if nombre not in fallas]
+    return fallas
+
+
+def leer_por_periodos(ruta, acumuladores, pedidos, indice):
+    """
+    Pasa a cada acumulador las filas que necesita: los que pidieron algunos períodos reciben
+    solo las filas de esos períodos, leídas directamente de su rango de bytes, y el resto
+    recibe todo el archivo. Cada período se lee una sola vez para todos los que lo pidieron.
+
+    Parámetros:
+    ruta (str o Path): Archivo CSV.
+    acumuladores (dict): Como en leer_filas.
+    pedidos (dict): {nombre: conjunto de períodos (ANO4, TRIMESTRE)} de los acumuladores que
+        no necesitan todo el archivo. Los períodos que no están en el índice no se leen.
+    indice (dict or None): Índice de períodos del archivo (ver indice_periodos.leer_indice).
+
+    Retorna:
+    dict: {nombre: excepción} de los acumuladores que fallaron, como leer_filas.
+    """
+
+    lecturas = []
+    completos = {nombre: acumulador for nombre, acumulador in acumuladores.items() if nombre not in pedidos}
+    if completos:
+        lecturas.append((None, completos))
+    for periodo in periodos_disponibles(indice) if pedidos else []:
+        grupo = {nombre: acumuladores[nombre] for nombre, periodos in pedidos.items() if periodo in periodos}
+        if grupo:
+            lecturas.append((rango_de_periodo(indice, *periodo), grupo))
+
+    fallas = {}
+    for rango, grupo in lecturas:
+        grupo = {nombre: acumulador for nombre, acumulador in grupo.items() if nombre not in fallas}
+        try:
+            fallas.update(leer_filas(ruta, grupo, rango))
+        except Exception as error:
+            fallas.update({nombre: error for nombre in grupo})
+    return fallas
+
+
+def ejecutar_reportes(reportes, rutas):
+    """
+    Ejecuta varios reportes leyendo cada archivo la menor cantidad de veces posible: en cada lectura
+    de un archivo se actualizan a la vez todos los reportes cuya etapa actual usa ese archivo.
+
+    Parámetros:
+    reportes (dict): {nombre: reporte}, con reportes armados con reporte.
+    rutas (dict): {'H': archivo de hogares, 'I': archivo de individuos}. Solo hacen falta
+        los archivos que usan los reportes.
+
+    Retorna:
+    dict: {nombre: resultado de la última etapa}, o None para los reportes que fallaron o terminaron antes.
+
+    Nota:
+    Los reportes de un solo archivo se resuelven con una única lectura compartida. Los que cruzan
+    hogares e individuos leen primero hogares y después individuos, así que un conjunto de reportes
+    de los dos tipos se resuelve con una lectura de cada archivo.
+    Antes de leer ninguna fila se buscan en los encabezados las columnas de todas las etapas:
+    un reporte con columnas faltantes informa el error enseguida, sin esperar a que se lean los archivos.
+    Las etapas que indican sus períodos leen solo el rango de bytes de esos trimestres cuando
+    el archivo tiene un índice de períodos al día.
+    """
+
+    resultados = {nombre: None for nombre in reportes}
+    pendientes = {nombre: 0 for nombre in reportes} # etapa actual de cada reporte
+    previos = {nombre: None for nombre in reportes}
+    fallas = {}
+
+    encabezados = {}
+    indices = {} # índice de períodos de cada archivo, o None si no tiene uno al día
+    accesores = {} # {(nombre, etapa): accesor}
+    for nombre, datos in reportes.items():
+        try:
+            for indice, actual in enumerate(datos["etapas"]):
+                if actual["archivo"] not in encabezados:
+                    encabezados[actual["archivo"]] = leer_encabezado(rutas[actual["archivo"]])
+                accesores[nombre, indice] = accesor(encabezados[actual["archivo"]], actual["columnas"])
+        except Exception as error:
+            reportes[nombre]["errores"](error)
+            pendientes.pop(nombre)
+
+    while pendientes:
+        for archivo in ARCHIVOS:
+            actuales = {nombre: reportes[nombre]["etapas"][indice] for nombre, indice in pendientes.items()
+                        if reportes[nombre]["etapas"][indice]["archivo"] == archivo}
+            if not actuales:
+                continue
+
+            if archivo not in indices and any(actual["periodos"] for actual in actuales.values()):
+                indices[archivo] = leer_indice(rutas[archivo])
+            indice = indices.get(archivo)
+
+            estados = {}
+            acumuladores = {}
+            pedidos = {}
+            for nombre, actual in actuales.items():
+                try:
+                    estado = actual["desde_cache"](previos[nombre]) if actual["desde_cache"] else None
+                    if estado is None:
+                        estado = actual["iniciar"](previos[nombre])
+                        acumuladores[nombre] = (accesores[nombre, pendientes[nombre]], actual["actualizar"], estado)
+                        if actual["periodos"] and indice is not None:
+                            periodos = actual["periodos"](previos[nombre], periodos_disponibles(indice))
+                            if periodos is not None:
+                                pedidos[nombre] = {tuple(periodo) for periodo in periodos}
+                    estados[nombre] = estado
+                except Exception as error:
+                    fallas[nombre] = error
+                    acumuladores.pop(nombre, None)
+
+            if acumuladores:
+                fallas.update(leer_por_periodos(rutas[archivo], acumuladores, pedidos, indice))
+
+            for nombre, estado in estados.items():
+                if nombre in fallas:
+                    continue
+                try:
+                    resultado = actuales[nombre]["finalizar"](estado)
+                except Exception as error:
+                    fallas[nombre] = error
+                    continue
+                pendientes[nombre] += 1
+                if pendientes[nombre] == len(reportes[nombre]["etapas"]):
+                    resultados[nombre] = resultado
+                    pendientes.pop(nombre)
+                elif resultado is None:
+                    pendientes.pop(nombre)
+                else:
+                    previos[nombre] = resultado
+
+            # Los reportes que fallaron informan el error y no siguen
+            for nombre in fallas.keys() & pendientes.keys():
+                reportes[nombre]["errores"](fallas[nombre])
+                pendientes.pop(nombre)
+    return resultados
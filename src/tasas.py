@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from cuantiles import agrupar
+
+OTRO = 0 # inactivos, menores y personas sin información
+OCUPADO = 1
+DESOCUPADO = 2
+CONDICIONES = 3
+
+
+def codigos_estado(estado):
+    """
+    Codifica la columna ESTADO de la EPH (1 = ocupado, 2 = desocupado) como OCUPADO, DESOCUPADO u OTRO.
+    """
+
+    estado = np.asarray(estado)
+    return np.where(estado == 1, OCUPADO, np.where(estado == 2, DESOCUPADO, OTRO)).astype(np.int8)
+
+
+def codigo_condicion(texto):
+    """
+    Devuelve el código de un valor de CONDICION_LABORAL: OCUPADO para 'Ocupado Autónomo.' y
+    'Ocupado dependiente.', DESOCUPADO para 'Desocupado.' y OTRO para el resto.
+    """
+
+    texto = str(texto).strip()
+    if texto.startswith("Ocupado"):
+        return OCUPADO
+    if texto == "Desocupado.":
+        return DESOCUPADO
+    return OTRO
+
+
+def codigos_condicion(valores, categorias=None):
+    """
+    Codifica la columna CONDICION_LABORAL como OCUPADO, DESOCUPADO u OTRO, comparando
+    cada texto distinto una sola vez.
+
+    Parameters
+    ----------
+    valores : array-like
+        Textos de la columna, o sus códigos si se dan las categorías (como en la caché de columnas).
+    categorias : list of str, optional
+        Texto de cada código, por ejemplo las categorías que devuelve cache_columnas.cargar_columnas.
+    """
+
+    if categorias is None:
+        valores, categorias = pd.factorize(np.asarray(valores, dtype=object))
+    # El último lugar corresponde al código -1 que pd.factorize da a los valores faltantes
+    tabla = np.array([codigo_condicion(texto) for texto in categorias] + [OTRO], dtype=np.int8)
+    return tabla[np.asarray(valores)]
+
+
+def agregar_tasas(tabla):
+    """
+    Agrega a una tabla con las columnas 'ocupados', 'desocupados' y 'poblacion' las columnas
+    'activos' y las tasas 'empleo' (ocupados sobre activos), 'desempleo' (desocupados sobre activos)
+    y 'actividad' (activos sobre población), en porcentaje. Si el divisor es 0, la tasa es 0.
+
+    Sirve también para recalcular las tasas después de sumar filas de la tabla, por ejemplo
+    todos los aglomerados de un período.
+    """
+
+    tabla["activos"] = tabla["ocupados"] + tabla["desocupados"]
+    tabla["empleo"] = ((tabla["ocupados"] / tabla["activos"]) * 100).where(tabla["activos"] != 0, 0)
+    tabla["desempleo"] = ((tabla["desocupados"] / tabla["activos"]) * 100).where(tabla["activos"] != 0, 0)
+    tabla["actividad"] = ((tabla["activos"] / tabla["poblacion"]) * 100).where(tabla["poblacion"] != 0, 0)
+    return tabla
+
+
+def tasas_laborales(condicion, pesos, claves=None):
+    """
+    Calcula las tasas de empleo, desempleo y actividad de cada grupo de filas en una sola pasada.
+
+    Parameters
+    ----------
+    condicion : np.ndarray
+        Código de cada fila (OCUPADO, DESOCUPADO u OTRO), ver codigos_estado y codigos_condicion.
+    pesos : np.ndarray
+        Peso de cada fila (PONDERA).
+    claves : dict, optional
+        {nombre: arreglo} con las columnas que definen los grupos (por ejemplo ANO4, TRIMESTRE y AGLOMERADO).
+        Las claves no pueden tener valores faltantes. Si es None, todas las filas forman un solo grupo.
+
+    Returns
+    -------
+    pd.DataFrame
+        Una fila por grupo, ordenadas por las claves, con las claves, 'ocupados', 'desocupados' y
+        'poblacion' (sumas de pesos) y las columnas que agrega agregar_tasas.
+
+    -----
+    Las sumas de todos los grupos y condiciones salen de un único np.bincount sobre
+    grupo * CONDICIONES + condicion. Si los pesos son enteros, las sumas también lo son.
+    """
+
+    condicion = np.asarray(condicion)
+    pesos = np.asarray(pesos)
+    if claves:
+        grupos, unicos = agrupar(claves)
+        cantidad = len(unicos[0])
+    else:
+        claves, grupos, unicos, cantidad = {}, np.zeros(len(condicion), dtype=np.int64), [], 1
+
+    sumas = np.bincount(grupos * CONDICIONES + condicion, weights=pesos, minlength=cantidad * CONDICIONES)
+    sumas = sumas.reshape(cantidad, CONDICIONES)
+    if np.issubdtype(pesos.dtype, np.integer):
+        sumas = sumas.astype(np.int64)
+
+    tabla = pd.DataFrame({nombre: np.asarray(unico, dtype=np.asarray(claves[nombre]).dtype)
+                          for nombre, unico in zip(claves, unicos)}, index=range(cantidad))
+    tabla["ocupados"] = sumas[:, OCUPADO]
+    tabla["desocupados"] = sumas[:, DESOCUPADO]
+    tabla["poblacion"] = sumas.sum(axis=1)
+    return agregar_tasas(tabla)
@@ -0,0 +1,349 @@
+from itertools import islice
+import csv
+import io
+import re
+import numpy as np
+import pandas as pd
+from procesamiento import NUEVAS_COLUMNAS, columnas_procesadas
+
+TAMANIO_BLOQUE_COLUMNAR = 50000 # filas que se procesan por vez con el motor columnar
+
+# Columnas que usan las transformaciones de cada tipo de archivo
+COLUMNAS_NECESARIAS = {
+    "I": ["CH04", "NIVEL_ED", "ESTADO", "CAT_OCUP", "CH06"],
+    "H": ["IX_TOT", "V4", "IV2", "IV6", "IV7", "IV8", "IV9", "IV11"],
+}
+
+# Campos completos entre comillas que no necesitan comillas al reescribirse (como CODUSU)
+COMILLAS_SIMPLES = re.compile(r'(^|;)"([^";\n]*)"(?=[;\n]|\Z)', re.MULTILINE)
+
+NIVEL_ED = {
+    "1": "Primario incompleto.",
+    "2": "Primario completo.",
+    "3": "Secundario incompleto.",
+    "4": "Secundario completo.",
+    "5": "Superior o universitario.",
+    "6": "Superior o universitario.",
+    "7": "Sin información.",
+    "9": "Sin información.",
+}
+
+MATERIAL_TECHUMBRE = {
+    "1": "Material Durable",
+    "2": "Material Durable",
+    "3": "Material Durable",
+    "4": "Material Durable",
+    "5": "Material Precario",
+    "6": "Material Precario",
+    "7": "Material Precario",
+    "9": "No aplica",
+    "_": "N/S.",
+}
+
+
+def valores_distintos(serie):
+    """
+    Codifica una columna de texto como índices sobre sus valores distintos.
+
+    Parameters
+    ----------
+    serie : pd.Series
+        Columna de texto.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        (codigos, unicos): para cada fila, la posición de su valor en unicos.
+
+    -----
+    Las columnas de la EPH tienen pocos valores distintos, así que las clasificaciones
+    se calculan una vez por valor y se expanden a todas las filas con los códigos.
+    """
+
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    return codigos, np.asarray(unicos, dtype=object)
+
+
+def es(columna, *valores):
+    """
+    Máscara de las filas cuyo valor está entre los valores dados.
+    """
+
+    codigos, unicos = columna
+    return np.isin(unicos, valores)[codigos]
+
+
+def buscar(columna, tabla, defecto=""):
+    """
+    Reemplaza cada valor por el que le corresponde en la tabla.
+    """
+
+    codigos, unicos = columna
+    return np.array([tabla.get(valor, defecto) for valor in unicos], dtype=object)[codigos]
+
+
+def elegir(condiciones, opciones, defecto):
+    """
+    Como np.select, pero eligiendo sobre índices enteros y devolviendo una columna de texto.
+    """
+
+    tabla = np.array(opciones + [defecto], dtype=object)
+    return tabla[np.select(condiciones, list(range(len(opciones))), len(opciones))]
+
+
+def entero(valor):
+    """
+    Convierte un valor como lo hace int(), devolviendo NaN si no es un entero.
+    """
+
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def a_entero(columna):
+    """
+    Convierte una columna codificada a números, como lo haría int() sobre cada valor.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        (valido, valores): máscara de los valores que int() acepta y la columna
+        convertida (NaN donde el valor no es un entero).
+    """
+
+    codigos, unicos = columna
+    valores = np.array([entero(valor) for valor in unicos], dtype=float)[codigos]
+    return ~np.isnan(valores), valores
+
+
+def procesar_individuos_columnar(ind):
+    """
+    Versión columnar de procesar_individuos: crea las nuevas columnas operando sobre
+    columnas completas en lugar de fila por fila.
+
+    Parameters
+    ----------
+    ind : pd.DataFrame
+        Individuos unificados, con todas las columnas leídas como texto.
+
+    -----
+    Los casos en que las funciones por fila devuelven None quedan como cadena vacía,
+    que es lo que se escribe en el CSV en ambos casos.
+    """
+
+    sexo = valores_distintos(ind["CH04"])
+    nivel = valores_distintos(ind["NIVEL_ED"])
+    estado = valores_distintos(ind["ESTADO"])
+    ocupacion = valores_distintos(ind["CAT_OCUP"])
+
+    ind["CH04_str"] = elegir([es(sexo, "1"), es(sexo, "2")], ["Masculino", "Femenino"], "Desconocido")
+    ind["NIVEL_ED_str"] = buscar(nivel, NIVEL_ED)
+
+    con_datos = ~es(estado, "") & ~es(ocupacion, "")
+    ind["CONDICION_LABORAL"] = elegir(
+        [
+            con_datos & es(estado, "1") & es(ocupacion, "1", "2"),
+            con_datos & es(estado, "1") & es(ocupacion, "3", "4", "9"),
+            con_datos & es(estado, "2"),
+            con_datos & es(estado, "3"),
+            con_datos & es(estado, "4"),
+        ],
+        ["Ocupado Autónomo.", "Ocupado dependiente.", "Desocupado.", "Inactivo.",
+         "Fuera de categoría/Sin información."],
+        "")
+
+    edad_valida, edad = a_entero(valores_distintos(ind["CH06"]))
+    ind["UNIVERSITARIO"] = elegir([edad_valida & (edad < 18), edad_valida & es(nivel, "6")], ["2", "1"], "0")
+
+
+def procesar_hogares_columnar(hog):
+    """
+    Versión columnar de procesar_hogares: crea las nuevas columnas operando sobre
+    columnas completas en lugar de fila por fila.
+
+    Parameters
+    ----------
+    hog : pd.DataFrame
+        Hogares unificados, con todas las columnas leídas como texto.
+
+    -----
+    Los casos en que las funciones por fila devuelven None quedan como cadena vacía,
+    que es lo que se escribe en el CSV en ambos casos.
+    """
+
+    personas_valido, personas = a_entero(valores_distintos(hog["IX_TOT"]))
+    hog["TIPO_HOGAR"] = elegir(
+        [personas_valido & (personas == 1), personas_valido & (personas >= 2) & (personas <= 4), personas_valido],
+        ["Unipersonal.", "Nuclear.", "Extendido."], "Desconocido")
+
+    techo = valores_distintos(hog["V4"].str.strip())
+    hog["MATERIAL_TECHUMBRE"] = buscar(techo, MATERIAL_TECHUMBRE)
+
+    habitaciones_valido, habitaciones = a_entero(valores_distintos(hog["IV2"]))
+    valido = personas_valido & habitaciones_valido & (habitaciones != 0)
+    densidad = np.divide(personas, habitaciones, out=np.full(len(hog), np.nan), where=valido)
+    hog["DENSIDAD_HOGAR"] = elegir([~valido, densidad < 1, densidad <= 2],
+                                      ["Error al procesar los datos.", "Bajo", "Medio"], "Alto")
+
+    agua = valores_distintos(hog["IV6"])
+    origen_agua = valores_distintos(hog["IV7"])
+    banio = valores_distintos(hog["IV8"])
+    ubicacion_banio = valores_distintos(hog["IV9"])
+    drenaje = valores_distintos(hog["IV11"])
+    material = valores_distintos(hog["MATERIAL_TECHUMBRE"])
+
+    deficiente = es(drenaje, "4") | es(ubicacion_banio, "3") | es(origen_agua, "4")
+    intermedio = es(ubicacion_banio, "2") | es(origen_agua, "3")
+    agua_2 = es(agua, "2")
+    durable = es(material, "Material Durable")
+    hog["CONDICION_DE_HABITABILIDAD"] = elegir(
+        [
+            es(agua, "3") | es(material, "No aplica."),
+            agua_2 & (es(banio, "2") | deficiente),
+            agua_2 & intermedio,
+            agua_2,
+            durable & deficiente,
+            durable & intermedio,
+            durable,
+        ],
+        ["Insuficiente", "Insuficiente", "Regular", "Saludable", "Regular", "Saludable", "Buena"],
+        "Regular")
+
+
+def leer_bloques(entrada, tamanio_bloque=TAMANIO_BLOQUE_COLUMNAR):
+    """
+    Lee un CSV por bloques de texto de aproximadamente tamanio_bloque filas,
+    sin cortar registros que tengan saltos de línea entre comillas.
+
+    Parameters
+    ----------
+    entrada : file or iterator of str
+        Archivo abierto en modo texto (o sus líneas), posicionado después del encabezado.
+    tamanio_bloque : int, optional
+        Cantidad de líneas por bloque.
+
+    Returns
+    -------
+    iterator of str
+        Bloques de registros completos.
+    """
+
+    while lineas := list(islice(entrada, tamanio_bloque)):
+        texto = "".join(lineas)
+        # Una cantidad impar de comillas indica un campo que sigue en la línea siguiente
+        while texto.count('"') % 2:
+            linea = next(entrada, "")
+            if not linea:
+                break
+            texto += linea
+        yield texto
+
+
+def a_dataframe(texto, columnas, usecols=None):
+    """
+    Convierte un bloque de texto CSV en un DataFrame con todos los valores como texto.
+    Las celdas vacías o faltantes quedan como cadena vacía.
+    """
+
+    bloque = pd.read_csv(io.StringIO(texto), sep=";", header=None, names=columnas, usecols=usecols,
+                         dtype=str, keep_default_na=False, na_filter=False)
+    return bloque.fillna("")
+
+
+def escribir_campos(campos, cantidad_columnas):
+    """
+    Escribe un registro como lo hace el procesamiento fila por fila: completa las columnas
+    faltantes con vacío, descarta las sobrantes y aplica las comillas del módulo csv.
+    """
+
+    campos = (campos + [""] * cantidad_columnas)[:cantidad_columnas]
+    salida = io.StringIO()
+    csv.writer(salida, delimiter=";", lineterminator="\r\n").writerow(campos)
+    return salida.getvalue()[:-2]
+
+
+def lineas_normalizadas(texto, cantidad_columnas):
+    """
+    Devuelve los registros de un bloque tal como los escribiría el módulo csv, para copiarlos
+    al archivo procesado sin separarlos en columnas. Los registros vacíos se descartan.
+
+    Parameters
+    ----------
+    texto : str
+        Bloque de registros completos.
+    cantidad_columnas : int
+        Cantidad de columnas del encabezado.
+
+    Returns
+    -------
+    list of str
+        Un elemento por registro, sin el fin de línea.
+    """
+
+    if '"' in texto:
+        # Los campos entre comillas que no las necesitan (como CODUSU) se escriben sin ellas
+        texto = COMILLAS_SIMPLES.sub(r"\1\2", texto)
+    separadores = cantidad_columnas - 1
+    lineas = []
+    for linea in texto.split("\n"):
+        if not linea:
+            continue
+        if '"' in linea:
+            if linea.count('"') % 2:
+                # Hay registros de más de una línea: se interpreta todo el bloque con el módulo csv
+                return [escribir_campos(campos, cantidad_columnas)
+                        for campos in csv.reader(io.StringIO(texto), delimiter=";") if campos]
+            linea = escribir_campos(next(csv.reader([linea], delimiter=";")), cantidad_columnas)
+        elif linea.count(";") != separadores:
+            linea = escribir_campos(linea.split(";"), cantidad_columnas)
+        lineas.append(linea)
+    return lineas
+
+
+def procesar_columnar(entrada, procesado, indicator, tamanio_bloque=None):
+    """
+    Procesa un archivo unificado calculando las nuevas columnas sobre bloques completos.
+    Escribe el mismo CSV que el procesamiento fila por fila.
+
+    Parameters
+    ----------
+    entrada : file
+        Archivo unificado abierto en modo texto.
+    procesado : file
+        Archivo de salida abierto en modo texto con newline="".
+    indicator : str
+        'I' para individuos, 'H' para hogares.
+    tamanio_bloque : int, optional
+        Cantidad de filas que se procesan por vez.
+
+    -----
+    Solo se convierten a columnas las que usan las transformaciones; el resto de cada registro
+    se copia sin volver a separarse en columnas. Si el archivo ya tiene las columnas nuevas
+    (por ejemplo, un archivo ya procesado) los bloques se leen completos.
+    """
+
+    procesar_columnas = procesar_individuos_columnar if indicator == "I" else procesar_hogares_columnar
+    originales = next(csv.reader(entrada, delimiter=";"))
+    columnas = columnas_procesadas(originales, indicator)
+    nuevas = NUEVAS_COLUMNAS[indicator]
+    solo_agregar = columnas == originales + nuevas
+
+    csv.writer(procesado, delimiter=";").writerow(columnas)
+    for texto in leer_bloques(entrada, tamanio_bloque or TAMANIO_BLOQUE_COLUMNAR):
+        lineas = lineas_normalizadas(texto, len(originales))
+        if not lineas:
+            continue
+        if not solo_agregar:
+            bloque = a_dataframe("\n".join(lineas), originales)
+            procesar_columnas(bloque)
+            bloque[columnas].to_csv(procesado, sep=";", header=False, index=False, lineterminator="\r\n")
+            continue
+
+        bloque = a_dataframe("\n".join(lineas), originales, COLUMNAS_NECESARIAS[indicator])
+        procesar_columnas(bloque)
+        agregado = bloque[nuevas[0]]
+        for col in nuevas[1:]:
+            agregado = agregado + ";" + bloque[col]
+        procesado.write("".join(f"{linea};{valores}\r\n" for linea, valores in zip(lineas, agregado)))
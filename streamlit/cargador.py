@@ -0,0 +1,157 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from cache_columnas import cargar_columnas
+from cubo import ruta_cubo, grupo_edad
+
+# Tipo de cada columna que se puede pedir a cargar_cubo cuando no hay cubo y se leen las filas del CSV
+TIPOS_CUBO = {'ANO4': 'int64', 'TRIMESTRE': 'int64', 'AGLOMERADO': 'int64', 'ESTADO': 'int64', 'IV1': 'int64',
+              'II7': 'int64', 'CH06': 'int64', 'PONDERA': 'int64', 'CH04_str': 'object', 'NIVEL_ED_str': 'object',
+              'CONDICION_LABORAL': 'object', 'MATERIAL_TECHUMBRE': 'object', 'CONDICION_DE_HABITABILIDAD': 'object'}
+# Textos que pd.read_csv toma como valores faltantes por defecto
+VALORES_FALTANTES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                     '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+
+def leer_cache(ruta, tipos):
+    """
+    Arma el DataFrame con las columnas pedidas a partir de la caché binaria de columnas
+    (ver cache_columnas.py), sin parsear el CSV. El resultado es el mismo que el de pd.read_csv
+    con usecols y dtype, en el mismo orden de filas.
+
+    Parámetros:
+    ruta (str): Ruta al archivo CSV.
+    tipos (dict): Columnas a leer y su tipo ('int64', 'float64' u 'object').
+
+    Retorna:
+    pd.DataFrame o None: None si la caché no está al día o si alguna columna no se puede armar
+    desde la caché (por ejemplo, una columna numérica con valores faltantes).
+    """
+
+    columnas = cargar_columnas(ruta, list(tipos))
+    if columnas is None:
+        return None
+    datos = {}
+    for nombre, tipo in tipos.items():
+        valores, categorias = columnas[nombre]
+        if categorias is None:
+            datos[nombre] = valores.astype(str).astype(object) if tipo == 'object' else valores.astype(tipo)
+        elif tipo == 'object':
+            textos = np.array(categorias, dtype=object)
+            textos[np.isin(textos, VALORES_FALTANTES)] = np.nan
+            datos[nombre] = textos[valores]
+        else:
+            return None
+    return pd.DataFrame(datos)
+
+
+@st.cache_resource(show_spinner="Cargando datos...", max_entries=32)
+def leer_csv(ruta, sep, mtime, tamanio, columnas=None):
+    """
+    Lee un CSV con pandas. El resultado queda en memoria para todas las sesiones y reruns de la app,
+    una vez por cada combinación de ruta, separador, fecha de modificación, tamaño y columnas pedidas.
+
+    Parámetros:
+    ruta (str): Ruta al archivo CSV.
+    sep (str): Separador de columnas.
+    mtime (float): Fecha de modificación del archivo. Solo forma parte de la clave de la caché.
+    tamanio (int): Tamaño del archivo en bytes. Solo forma parte de la clave de la caché.
+    columnas (tuple, opcional): Pares (columna, tipo) a leer. Si es None se leen todas las columnas.
+
+    Retorna:
+    pd.DataFrame: El contenido del archivo. Las columnas quedan en el mismo orden que en el archivo.
+    """
+
+    if columnas is None:
+        return pd.read_csv(ruta, sep=sep)
+
+    # Las columnas que no están en el archivo se omiten, igual que si se leyera el archivo completo
+    encabezado = list(pd.read_csv(ruta, sep=sep, nrows=0).columns)
+    tipos = {columna: tipo for columna, tipo in columnas if columna in encabezado}
+    usadas = [columna for columna in encabezado if columna in tipos]
+    try:
+        df = leer_cache(ruta, {columna: tipos[columna] for columna in usadas})
+        if df is not None:
+            return df
+        return pd.read_csv(ruta, sep=sep, usecols=usadas, dtype=tipos)
+    except (ValueError, TypeError):
+        # Algún valor no admite el tipo declarado (por ejemplo, un entero faltante):
+        # se leen las mismas columnas con los tipos que infiere pandas
+        return pd.read_csv(ruta, sep=sep, usecols=usadas)
+
+
+def version_archivo(ruta):
+    """
+    Devuelve (fecha de modificación, tamaño) de un archivo. Sirve como parte de la clave de las
+    funciones con caché que dependen de su contenido, para que se recalculen cuando cambia.
+
+    Raises:
+    FileNotFoundError: Si el archivo no existe.
+    """
+
+    estado = Path(ruta).stat()
+    return estado.st_mtime, estado.st_size
+
+
+def cargar_csv(ruta, columnas=None, sep=';'):
+    """
+    Devuelve el contenido de un CSV leyéndolo una sola vez por versión del archivo.
+
+    Cuando el archivo cambia (por ejemplo, al actualizar la base desde la página de carga de datos)
+    cambian su fecha de modificación y su tamaño, y la siguiente llamada lo vuelve a leer.
+
+    Parámetros:
+    ruta (str o Path): Ruta al archivo CSV (por ejemplo, PROCESSED_DATA_INDIVIDUAL o PROCESSED_DATA_HOGAR).
+    columnas (dict, opcional): Columnas que se necesitan y su tipo, por ejemplo {'ANO4': 'int64', 'CODUSU': 'object'}.
+        Solo se leen esas columnas. Si algún valor no admite el tipo declarado, se usa el que infiere pandas.
+        Por defecto se leen todas las columnas.
+    sep (str): Separador de columnas. Por defecto ';', como en los archivos de la EPH.
+
+    Retorna:
+    pd.DataFrame: Una copia del DataFrame en caché, que se puede modificar libremente sin afectar
+    a las demás páginas.
+
+    Raises:
+    FileNotFoundError: Si el archivo no existe.
+
+    Nota:
+    Para los archivos procesados, si la caché binaria de columnas está al día las columnas
+    se toman de ahí, sin parsear el CSV.
+    """
+
+    ruta = Path(ruta).resolve()
+    mtime, tamanio = version_archivo(ruta)
+    columnas = tuple(columnas.items()) if columnas is not None else None
+    return leer_csv(str(ruta), sep, mtime, tamanio, columnas).copy()
+
+
+def cargar_cubo(ruta, dimensiones):
+    """
+    Devuelve el cubo de conteos ponderados de un CSV procesado (ver cubo.py), para consultarlo con consultar_cubo.
+
+    Si el cubo no está al día (por ejemplo, en una copia recién descargada o justo después de actualizar
+    la base), no se regenera mientras se dibuja la página: se devuelven las filas del CSV con las
+    dimensiones pedidas, PONDERA y FILAS = 1, y consultar_cubo las suma dando el mismo resultado.
+
+    Parámetros:
+    ruta (str o Path): Ruta al archivo CSV procesado.
+    dimensiones (list of str): Dimensiones que se van a consultar (ver TIPOS_CUBO; también 'GRUPO_EDAD').
+
+    Raises:
+    FileNotFoundError: Si el archivo no existe.
+    """
+
+    archivo = ruta_cubo(ruta)
+    if archivo is not None:
+        return cargar_csv(archivo)
+
+    leidas = [columna for columna in dimensiones if columna != 'GRUPO_EDAD'] + ['PONDERA']
+    if 'GRUPO_EDAD' in dimensiones:
+        leidas.append('CH06')
+    df = cargar_csv(ruta, {columna: TIPOS_CUBO[columna] for columna in leidas})
+    if 'GRUPO_EDAD' in dimensiones:
+        edades = df.pop('CH06')
+        df['GRUPO_EDAD'] = edades.map({edad: grupo_edad(edad) for edad in edades.unique()})
+    df['FILAS'] = 1
+    return df
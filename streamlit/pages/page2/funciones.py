@@ -1,5 +1,9 @@
 import streamlit as st
 from pathlib import Path
+import threading
+from actualizacion import actualizar_datos
+
+ETAPAS = {"union": "unión", "procesamiento": "procesamiento", "almacenes": "caché y cubo"}
 
 def verificar_coherencia_archivos(archivos_nuevos):
     hogares = [Path(f).stem.lower().strip() for f in archivos_nuevos if "hogar" in f.lower()]
@@ -34,3 +38,53 @@ def verificar_coherencia_archivos(archivos_nuevos):
 def verificar_coherencia_archivos_existentes(carpeta):
     archivos_existentes = [f.name for f in carpeta.iterdir() if f.is_file() and 'usu_' in f.name.lower()]
     return verificar_coherencia_archivos(archivos_existentes)
+
+
+@st.cache_resource
+def estado_actualizacion():
+    """
+    Estado de la actualización de la base en segundo plano. Es el mismo objeto para todas
+    las sesiones, así nunca corren dos actualizaciones a la vez.
+    """
+    return {"hilo": None, "avance": {}, "tiempos": None, "error": None}
+
+
+def ejecutar_actualizacion(estado):
+    """
+    Corre actualizar_datos (en el hilo de fondo) y va acumulando en estado el avance que informa.
+    Se usa el modo incremental, en dos pasos (unión y procesamiento), porque solo procesa los períodos
+    nuevos o modificados; la pasada única vuelve a procesar todos los archivos en cada actualización.
+    """
+    def progreso(indicador, etapa, filas, leidos):
+        avance = estado["avance"].setdefault(indicador, {"etapa": etapa, "filas": {}, "bytes": {}})
+        avance["etapa"] = etapa
+        avance["filas"][etapa] = avance["filas"].get(etapa, 0) + filas
+        avance["bytes"][etapa] = avance["bytes"].get(etapa, 0) + leidos
+
+    try:
+        estado["tiempos"] = actualizar_datos(guardar_unificado=True, incremental=True, progreso=progreso)
+    except Exception as e:
+        estado["error"] = str(e)
+
+
+def iniciar_actualizacion():
+    """
+    Lanza la actualización de la base en un hilo de fondo, para que la app siga atendiendo
+    mientras tanto. Devuelve False si ya había una actualización en curso.
+    """
+    estado = estado_actualizacion()
+    if estado["hilo"] is not None and estado["hilo"].is_alive():
+        return False
+    estado.update(avance={}, tiempos=None, error=None)
+    estado["hilo"] = threading.Thread(target=ejecutar_actualizacion, args=(estado,), daemon=True)
+    estado["hilo"].start()
+    return True
+
+
+def describir_avance(avance):
+    """ Texto con la etapa actual y las filas y MB leídos en cada etapa de un dataset. """
+    if avance is None:
+        return "esperando..."
+    partes = [f"{ETAPAS[etapa]}: {avance['filas'][etapa]:,} filas, {avance['bytes'][etapa] / 1024 ** 2:.1f} MB"
+              for etapa in ("union", "procesamiento") if etapa in avance["filas"]]
+    return f"etapa actual: {ETAPAS[avance['etapa']]}" + "".join(f" | {parte}" for parte in partes)
@@ -1,9 +1,7 @@
 import streamlit as st
-import altair as alt
 import pandas as pd
 from pathlib import Path
 import sys
-import time
 
 current_dir = Path().resolve()
 src_dir = current_dir.parents[2] / "src"
@@ -14,8 +12,7 @@ if str(src_dir) not in sys.path:
 
 
 from constantes import *
-from funcionalidad import creacion_datasets, calcular_fechas_comparadas
-from procesamiento import procesar_data
+from funcionalidad import calcular_fechas_comparadas
 from .funciones import *
 
 
@@ -31,7 +28,8 @@ def pagina2():
     individual debe existir su correspondiente de hogares y viceversa.
 
     Si la verificación es exitosa, muestra un botón para actualizar la base de datos. 
-    Al pulsarlo, ejecuta funciones para crear datasets y procesar datos, mostrando una barra de progreso.
+    Al pulsarlo, la actualización corre en segundo plano y la página muestra su avance real
+    (filas y bytes leídos de cada dataset) hasta que termina.
 
     Finalmente, muestra un resumen de fechas disponibles en la base de datos y mensajes de éxito o advertencia
     según corresponda.
@@ -101,36 +99,46 @@ def pagina2():
             actualizar_base()
             st.session_state["coherencia_ok"] = False
 
+    if st.session_state.get("actualizando", False):
+        seguir_actualizacion()
+    elif "resultado_actualizacion" in st.session_state:
+        mostrar_resultado_actualizacion(st.session_state.pop("resultado_actualizacion"))
+
 
 
 def actualizar_base():
-    """ Ejecuta la creación y el procesamiento de datasets para ambos tipos. """
-    st.write(":hourglass: Iniciando actualización de la base de datos...")
+    """ Lanza en segundo plano la unión y el procesamiento de los períodos nuevos o modificados. """
+    if not iniciar_actualizacion():
+        st.warning(":hourglass: Ya hay una actualización de la base de datos en curso. Esperá a que termine.")
+        return
+    st.session_state["actualizando"] = True
 
-    with st.spinner("Creando datasets de individuos..."):
-        creacion_datasets("I")
-        st.success(":white_check_mark: Dataset de individuos creado.")
 
-    with st.spinner("Procesando datos de individuos..."):
-        procesar_data("I")
-        st.success(":white_check_mark: Datos de individuos procesados.")
+@st.fragment(run_every=1)
+def seguir_actualizacion():
+    """
+    Muestra el avance de la actualización en segundo plano, consultándolo cada segundo.
+    Cuando termina, guarda el resultado en la sesión y vuelve a ejecutar la página completa.
+    """
+    estado = estado_actualizacion()
+    st.write(":hourglass: Actualizando la base de datos en segundo plano...")
+    for indicador, nombre in (("I", "Individuos"), ("H", "Hogares")):
+        st.write(f"**{nombre}:** {describir_avance(estado['avance'].get(indicador))}")
 
-    with st.spinner("Creando datasets de hogares..."):
-        creacion_datasets("H")
-        st.success(":white_check_mark: Dataset de hogares creado.")
+    if estado["hilo"] is None or not estado["hilo"].is_alive():
+        st.session_state["actualizando"] = False
+        st.session_state["resultado_actualizacion"] = (estado["tiempos"], estado["error"])
+        st.rerun()
 
-    with st.spinner("Procesando datos de hogares..."):
-        procesar_data("H")
-        st.success(":white_check_mark: Datos de hogares procesados.")
 
-    barra_placeholder = st.empty()
-    with barra_placeholder:
-        barra = st.progress(0)
-        for porcentaje in range(1, 101):
-            time.sleep(0.01)
-            barra.progress(porcentaje)
-    barra_placeholder.empty()
+def mostrar_resultado_actualizacion(resultado):
+    """ Informa cómo terminó la actualización y el rango de fechas de la base actualizada. """
+    tiempos, error = resultado
+    if error is not None or tiempos is None or None in tiempos.values():
+        st.error("No se pudo actualizar la base de datos. Revisá los archivos cargados.")
+        return
+    st.success(":white_check_mark: Datos de individuos y hogares procesados.")
 
     fechas = calcular_fechas_comparadas(PROCESSED_DATA_HOGAR, PROCESSED_DATA_INDIVIDUAL)
     st.subheader(f":green-background[BASE DE DATOS ACTUALIZADA: desde {fechas[1]}/{fechas[0]} hasta {fechas[3]}/{fechas[2]}] ")
-    st.success(":white_check_mark: Actualización finalizada con éxito.")
\ No newline at end of file
+    st.success(":white_check_mark: Actualización finalizada con éxito.")
@@ -1,10 +1,7 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import streamlit as st
 import sys
 from pathlib import Path
-import plotly.express as px
-import altair as alt
 
 current_dir = Path().resolve()
 src_dir = current_dir.parents[2] / "src"
@@ -15,26 +12,12 @@ if str(src_dir) not in sys.path:
 
 from funcionalidad import aglo_dict
 from constantes import *
+from cargador import cargar_csv, cargar_cubo, version_archivo
+from cubo import consultar_cubo
+from cuantiles import cuantiles_ponderados
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 3.1 - - - - - - - - - - - - - - - - - - - - - - - - - - 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 3.1 - - - - - - - - - - - - - - - - - - - - - - - - - - 
-def asignar_grupo_edad(edad):
-    """
-        Asigna un grupo de edad basado en el valor de edad proporcionado.
-
-    Args:
-        edad (int): Edad de la persona.
-
-    Returns:
-        str: Grupo de edad en formato "inicio-fin".
-        None: Si la edad es NaN.
-    """
-    if pd.isna(edad):
-        return None
-    for inicio in range(0, 100, 10):
-        if inicio <= edad < inicio + 10:
-            return f"{inicio}-{inicio + 9}"
-    return "100+"
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -MAIN 3.1 - - - - - - - - - - - - - - - - - - - - - - - - - -
 def mostrar_distribucion_edad_y_sexo():
     """
@@ -44,27 +27,25 @@ def mostrar_distribucion_edad_y_sexo():
         KeyError: Si falta una columna esperada en el archivo de datos.
         FileNotFoundError: Si no se encuentra el archivo de datos individuales.
     """
+    import plotly.express as px
 
     try:
-        df = pd.read_csv(PROCESSED_DATA_INDIVIDUAL, sep=";")
+        cubo = cargar_cubo(PROCESSED_DATA_INDIVIDUAL, ["ANO4", "TRIMESTRE", "GRUPO_EDAD", "CH04_str"])
 
         # Menú de selección de año y trimestre
-        anios = sorted(df["ANO4"].dropna().unique())
+        anios = sorted(cubo["ANO4"].dropna().unique())
         anio = st.selectbox("Seleccioná un año", anios, key="anio_1_3_1") # se suma la key para evitar conflictos
-        trimestres = sorted(df[df["ANO4"] == anio]["TRIMESTRE"].dropna().unique())
+        trimestres = sorted(cubo[cubo["ANO4"] == anio]["TRIMESTRE"].dropna().unique())
         trimestre = st.selectbox("Seleccioná un trimestre", trimestres, key="trim_1_3_1")
 
-        df_filtrado = df[(df["ANO4"] == anio) & (df["TRIMESTRE"] == trimestre)]
-
-        # Agrupar edades
+        # Grupos de edad cada 10 años
         edades = list(range(0, 101, 10))
         rangos_edades = [f"{i}-{i+9}" for i in edades[:-1]] # Crea el rango exceptuando el último valor
-        df_filtrado["grupo_edad"] = df_filtrado["CH06"].apply(asignar_grupo_edad)
         orden_edad = rangos_edades + ["100+"] 
 
-        # Agrupar y sumar ponderadores
-        agrupado = df_filtrado.groupby(["grupo_edad", "CH04_str"])["PONDERA"].sum()
-        df_agrupado = agrupado.reset_index()
+        # Sumar ponderadores por grupo de edad y sexo desde el cubo
+        agrupado = consultar_cubo(cubo, ["GRUPO_EDAD", "CH04_str"], {"ANO4": anio, "TRIMESTRE": trimestre})
+        df_agrupado = agrupado.reset_index().rename(columns={"GRUPO_EDAD": "grupo_edad"})
 
         # Gráfico de barras por edad y sexo
         figura = px.bar(
@@ -85,6 +66,8 @@ def mostrar_distribucion_edad_y_sexo():
         st.error("No se encontró el archivo de datos individuales.")
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 3.2 - - - - - - - - - - - - - - - - - - - - - - - - - -
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 3.2 - - - - - - - - - - - - - - - - - - - - - - - - - - 
+COLUMNAS_3_2 = {'ANO4': 'int64', 'TRIMESTRE': 'int64', 'CH06': 'int64', 'AGLOMERADO': 'int64', 'PONDERA': 'int64'}
+
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -MAIN 3.2 - - - - - - - - - - - - - - - - - - - - - - - - - -
 def edad_promedio_por_aglomerado():
     """
@@ -99,8 +82,9 @@ def edad_promedio_por_aglomerado():
     TypeError: Si hay un error en los parámetros de llamada de la función.
     Warning: Si faltan columnas necesarias en el DataFrame.
     """
+    import matplotlib.pyplot as plt
     try:
-        datos_personas = pd.read_csv(PROCESSED_DATA_INDIVIDUAL, delimiter=';')
+        datos_personas = cargar_csv(PROCESSED_DATA_INDIVIDUAL, COLUMNAS_3_2)
 
         columnas_necesarias = {'ANO4', 'TRIMESTRE', 'CH06', 'AGLOMERADO', 'PONDERA'}
         if not columnas_necesarias.issubset(datos_personas.columns):
@@ -151,6 +135,9 @@ def edad_promedio_por_aglomerado():
         st.error('Error en los parámetros de llamada de la función.')
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 3.3 - - - - - - - - - - - - - - - - - - - - - - - - - - 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 3.3 - - - - - - - - - - - - - - - - - - - - - - - - - - 
+COLUMNAS_3_3 = {'ANO4': 'int64', 'TRIMESTRE': 'int64', 'CH06': 'int64', 'AGLOMERADO': 'int64', 'PONDERA': 'int64'}
+COLUMNAS_3_4 = {'ANO4': 'int64', 'TRIMESTRE': 'int64', 'CH06': 'int64', 'PONDERA': 'int64'}
+
 def mostrar_aglo(aglomerado):
     """
     Muestra el nombre del aglomerado seleccionado.
@@ -170,6 +157,7 @@ def mostrar_grafico_dependencia(evolucion):
     Returns:
         chart: Gráfico de barras de Altair con la evolución.
     """
+    import altair as alt
     evolucion2 = pd.DataFrame(evolucion)
     # Crear columna de periodo combinado
     evolucion2['Periodo'] = 'Año: ' + evolucion2['Año'].astype(str) + ', Trim: ' + evolucion2['Trimestre'].astype(str)
@@ -189,53 +177,77 @@ def mostrar_grafico_dependencia(evolucion):
     
     return chart
 
-def hacer_calculo(grupo):
+def hacer_calculo(individuos):
     """
-    Calcula la proporción de población inactiva sobre la activa en un grupo de datos.
+    Calcula la proporción de población inactiva sobre la activa de cada aglomerado, año y trimestre.
     
     Parameters:
-        grupo (DataFrame): DataFrame que contiene los datos del grupo.
+        individuos (DataFrame): DataFrame con las columnas AGLOMERADO, ANO4, TRIMESTRE, CH06 y PONDERA.
+    Returns:
+        DataFrame: Columnas AGLOMERADO, Año, Trimestre y Proporcion (población inactiva sobre la activa,
+        multiplicada por 100), ordenado por aglomerado y período. Si la población activa es 0, la proporción es 0.
+    """
+    # Cada persona suma su PONDERA solo en el tramo de edad al que pertenece
+    inactiva = (individuos['CH06'] > 0) & ((individuos['CH06'] <= 14) | (individuos['CH06'] >= 65))
+    activa = (individuos['CH06'] >= 15) & (individuos['CH06'] <= 64)
+    poblacion = individuos[['AGLOMERADO', 'ANO4', 'TRIMESTRE']].assign(
+        INACTIVA=individuos['PONDERA'].where(inactiva, 0),
+        ACTIVA=individuos['PONDERA'].where(activa, 0)
+    ).groupby(['AGLOMERADO', 'ANO4', 'TRIMESTRE'])[['INACTIVA', 'ACTIVA']].sum()
+
+    proporcion = ((poblacion['INACTIVA'] / poblacion['ACTIVA']) * 100).where(poblacion['ACTIVA'] != 0, 0)
+    dependencia = proporcion.reset_index()
+    dependencia.columns = ['AGLOMERADO', 'Año', 'Trimestre', 'Proporcion']
+    return dependencia
+
+@st.cache_data(show_spinner="Calculando la dependencia demográfica...", max_entries=4)
+def tabla_dependencia(version):
+    """
+    Calcula la dependencia demográfica de todos los aglomerados y períodos, una sola vez por
+    versión del archivo de individuos.
+
+    Parameters:
+        version (tuple): Versión del archivo de individuos (ver version_archivo). Solo forma parte de la clave de la caché.
     Returns:
-        float: Proporción de población inactiva sobre la activa, multiplicada por 100.
-        Si la población activa es 0, retorna 0.
+        tuple: (aglomerados en el orden en que aparecen en el archivo, tabla devuelta por hacer_calculo),
+        o None si faltan columnas requeridas.
     """
-    pob_inactiva = grupo.loc[((grupo['CH06']> 0) & ((grupo['CH06']<=14) |  (grupo['CH06']>=65))), 'PONDERA'].sum()
-    pob_activa = grupo.loc[((grupo['CH06']>=15) & (grupo['CH06']<=64)), 'PONDERA'].sum()
-    return (pob_inactiva/pob_activa) * 100 if pob_activa != 0 else 0
+    individuos = cargar_csv(PROCESSED_DATA_INDIVIDUAL, COLUMNAS_3_3)
+    columnas_necesarias = {'ANO4', 'TRIMESTRE', 'CH06', 'AGLOMERADO', 'PONDERA'}
+    if not columnas_necesarias.issubset(individuos.columns):
+        return None
+
+    individuos['ANO4'] = pd.to_numeric(individuos['ANO4'], errors='coerce')
+    individuos['TRIMESTRE'] = pd.to_numeric(individuos['TRIMESTRE'], errors='coerce')
+    individuos['CH06'] = pd.to_numeric(individuos['CH06'], errors='coerce')
+    individuos['PONDERA'] = pd.to_numeric(individuos['PONDERA'], errors='coerce')
+    individuos['AGLOMERADO'] = individuos['AGLOMERADO'].astype(str)
+
+    return list(individuos['AGLOMERADO'].unique()), hacer_calculo(individuos)
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -MAIN 3.3 - - - - - - - - - - - - - - - - - - - - - - - - - -
 def calcular_dependencia_demografica():
     """
     Calcula y muestra la evolución de la dependencia demográfica por aglomerado, año y trimestre.
+    La tabla de todos los aglomerados se calcula una vez; al elegir otro aglomerado solo se filtra.
     Raises:
         FileNotFoundError: Si no se encuentra el archivo de datos procesados.
         ValueError: Si hay un error al convertir los datos a numéricos.
         Warning: Si faltan columnas requeridas en el DataFrame.
     """
     try:
-        individuos = pd.read_csv(PROCESSED_DATA_INDIVIDUAL, delimiter=';', encoding='utf-8')
-        columnas_necesarias = {'ANO4', 'TRIMESTRE', 'CH06', 'AGLOMERADO', 'PONDERA'}
-        if not columnas_necesarias.issubset(individuos.columns):
+        calculo = tabla_dependencia(version_archivo(PROCESSED_DATA_INDIVIDUAL))
+        if calculo is None:
             st.warning("Faltan columnas requeridas ('ANO4', 'TRIMESTRE', 'CH06', 'AGLOMERADO', 'PONDERA')")
-            
-
-        individuos['ANO4'] = pd.to_numeric(individuos['ANO4'], errors='coerce')
-        individuos['TRIMESTRE'] = pd.to_numeric(individuos['TRIMESTRE'], errors='coerce')
-        individuos['CH06'] = pd.to_numeric(individuos['CH06'], errors='coerce')
-        individuos['PONDERA'] = pd.to_numeric(individuos['PONDERA'], errors='coerce')
-        individuos['AGLOMERADO'] = individuos['AGLOMERADO'].astype(str)
+            return
+        aglo_disponibles, dependencia = calculo
 
-        aglo_disponibles = (individuos['AGLOMERADO'].unique())
         aglo_seleccionado = st.selectbox("Seleccionar aglomerado", aglo_disponibles, key='1.3.3')
         
 
         
         if aglo_seleccionado:
-            filtrar_hogar = individuos[(individuos ['AGLOMERADO'] == aglo_seleccionado)]
-            # calcula la dependencia demografica
-            depen_demografica = filtrar_hogar.groupby(['ANO4', 'TRIMESTRE']).apply (hacer_calculo).reset_index()
-            # columnas del df a imprimir
-            depen_demografica.columns = ['Año', 'Trimestre', 'Proporcion']
-            depen_demografica= depen_demografica.sort_values(['Año','Trimestre']).reset_index(drop=True)
+            depen_demografica = dependencia.loc[dependencia['AGLOMERADO'] == aglo_seleccionado,
+                                                ['Año', 'Trimestre', 'Proporcion']].reset_index(drop=True)
             # nombre del aglomerado
             nom_Aglo = mostrar_aglo(aglo_seleccionado)
             st.write (f'Evolucion del aglomerado llamado {nom_Aglo}')
@@ -250,12 +262,14 @@ def calcular_dependencia_demografica():
 def media_mediana():
     """
     Calcula y muestra la media y mediana de la edad de la población por año y trimestre.
+    Opcionalmente muestra también la banda entre los percentiles 10 y 90 de la edad.
 
     Returns
     """
+    import matplotlib.pyplot as plt
     try:
         # Cargar datos
-        datos = pd.read_csv(PROCESSED_DATA_INDIVIDUAL, delimiter=';')
+        datos = cargar_csv(PROCESSED_DATA_INDIVIDUAL, COLUMNAS_3_4)
         
         # Verificar columnas
         columnas_necesarias = {'ANO4', 'TRIMESTRE', 'CH06', 'PONDERA'}
@@ -271,43 +285,24 @@ def media_mediana():
         # Eliminar filas con valores nulos en columnas clave
         datos = datos.dropna(subset=['ANO4', 'TRIMESTRE', 'CH06', 'PONDERA'])
 
-        # Calcular resultados
-        resultados = []
-        grupos = datos.groupby(['ANO4', 'TRIMESTRE'])
-
-        for (anio, trimestre), grupo in grupos:
-            # Media ponderada
-            suma_edades = (grupo['CH06'] * grupo['PONDERA']).sum()
-            total_pondera = grupo['PONDERA'].sum()
-            
-            if total_pondera == 0:  # Evitar división por cero
-                continue
-                
-            media = suma_edades / total_pondera
-            
-            # Mediana ponderada
-            grupo_ordenado = grupo.sort_values('CH06')
-            pondera_acumulada = grupo_ordenado['PONDERA'].cumsum()
-            mitad_peso = total_pondera / 2
-            mediana = grupo_ordenado[pondera_acumulada >= mitad_peso]['CH06'].iloc[0]
-            
-            resultados.append({
-                'ANO4': int(anio),
-                'TRIMESTRE': int(trimestre),
-                'media_edad': round(media, 2),
-                'mediana_edad': int(mediana)
-            })
+        # Media, mediana y percentiles 10 y 90 ponderados de todos los períodos a la vez
+        cuantiles = cuantiles_ponderados(datos['CH06'].to_numpy(), datos['PONDERA'].to_numpy(), (0.1, 0.5, 0.9),
+                                         claves={'ANO4': datos['ANO4'].to_numpy(), 'TRIMESTRE': datos['TRIMESTRE'].to_numpy()})
 
         # Mostrar resultados
-        if not resultados:
+        if cuantiles.empty:
             st.warning("No hay datos válidos para mostrar.")
 
-        df = pd.DataFrame(resultados).rename(columns={
-            'ANO4': 'Año',
-            'TRIMESTRE': 'Trimestre',
-            'media_edad': 'Media',
-            'mediana_edad': 'Mediana'
+        df = pd.DataFrame({
+            'Año': cuantiles['ANO4'].astype(int),
+            'Trimestre': cuantiles['TRIMESTRE'].astype(int),
+            'Media': cuantiles['media'].round(2),
+            'Mediana': cuantiles['P50'].astype(int)
         })
+        mostrar_banda = st.checkbox("Mostrar banda P10–P90", value=False, key='3.4_banda')
+        if mostrar_banda:
+            df['P10'] = cuantiles['P10'].astype(int)
+            df['P90'] = cuantiles['P90'].astype(int)
 
         
         st.title("📊 Edad media y mediana por período")
@@ -315,7 +310,7 @@ def media_mediana():
         # Mostrar tabla
         st.dataframe(
             df.style
-            .format({'Media': "{:.1f} años", 'Mediana': "{:.0f} años"})
+            .format({'Media': "{:.1f} años", 'Mediana': "{:.0f} años", 'P10': "{:.0f} años", 'P90': "{:.0f} años"})
             .highlight_max(subset=['Media'], color="#009b15")
             .highlight_min(subset=['Media'], color="#7c7c7c"),
             height=min(300, len(df)*35 + 40)
@@ -327,6 +322,8 @@ def media_mediana():
         # Configurar el gráfico
         plt.plot(df['Media'], color='#1f77b4', marker='o', linestyle='-', linewidth=2, label='Media')
         plt.plot(df['Mediana'], color='#ff7f0e', marker='s', linestyle='--', linewidth=2, label='Mediana')
+        if mostrar_banda:
+            plt.fill_between(df.index, df['P10'], df['P90'], color='#ff7f0e', alpha=0.15, label='P10–P90')
         
         # Añadir títulos y etiquetas
         plt.title('Evolución de Edad Media vs Mediana', pad=20)
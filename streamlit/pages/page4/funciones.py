@@ -1,11 +1,7 @@
 import streamlit as st
-import altair as alt
 import pandas as pd
 from pathlib import Path
-import matplotlib.pyplot as plt
-import plotly.express as px
 import sys
-import time
 
 current_dir = Path().resolve()
 src_dir = current_dir.parents[2] / "src"
@@ -16,11 +12,17 @@ if str(src_dir) not in sys.path:
 
 from funcionalidad import aglo_dict
 from constantes import *
+from cargador import cargar_csv, cargar_cubo, version_archivo
+from cubo import consultar_cubo
+from indice_periodos import leer_indice, periodos_disponibles
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX PAGE 4 - - - - - - - - - - - - - - - - - - - - - - - - - - 
+COLUMNAS_ANIOS = {'ANO4': 'int64'}
+
 def determinar_años(data):
     """
     Lee un archivo CSV y extrae la lista ordenada de años únicos presentes en la columna 'ANO4'.
+    Si el archivo tiene su índice de períodos al día, los años salen de ahí, sin leer los datos.
 
     Parámetros:
     data (str): Ruta al archivo CSV.
@@ -33,8 +35,10 @@ def determinar_años(data):
     Warning: Si la columna 'ANO4' no existe, muestra un mensaje de advertencia en Streamlit.
     """
     try:
-        with open(data, 'r') as file:
-            df = pd.read_csv(file, sep=';')
+        indice = leer_indice(data)
+        if indice is not None:
+            return sorted({anio for anio, trimestre in periodos_disponibles(indice)})
+        df = cargar_csv(data, COLUMNAS_ANIOS)
         if 'ANO4' not in df.columns:
             st.warning("La columna de año no existe en el archivo.")
             return None
@@ -51,6 +55,8 @@ def determinar_años(data):
         return []
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 4.1 - - - - - - - - - - - - - - - - - - - - - - - - - - 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 4.1 - - - - - - - - - - - - - - - - - - - - - - - - - - 
+COLUMNAS_4_1 = {'CODUSU': 'object', 'ANO4': 'int64'}
+
 
 def cantidades(option, data , años):
     """
@@ -69,7 +75,7 @@ def cantidades(option, data , años):
     Warning: Si faltan columnas requeridas en el DataFrame, muestra un mensaje de advertencia en Streamlit.
     """
     try:
-        df = pd.read_csv(data, sep=';')
+        df = cargar_csv(data, COLUMNAS_4_1)
         
         if 'ANO4' not in df.columns or 'CODUSU' not in df.columns:
             st.warning("Faltan columnas requeridas ('ANO4' o 'CODUSU').")
@@ -97,9 +103,10 @@ def cant_viv_por_anio(option, anios):
     - Warning: Si faltan columnas requeridas en el DataFrame, muestra un mensaje de advertencia en Streamlit.
     - Warning: Si el calcuno no se puede realizar (cero viviendas), muestra un mensaje de advertencia en Streamlit.
     """
+    import altair as alt
     try:
         # Cargo el archivo procesado de hogares
-        df = pd.read_csv(PROCESSED_DATA_HOGAR, sep=';')
+        df = cargar_csv(PROCESSED_DATA_HOGAR, COLUMNAS_4_1)
 
         # Verifico que existan las columnas necesarias 'ANO4' (año) y 'CODUSU' (identificador único de vivienda)
         if 'ANO4' not in df.columns or 'CODUSU' not in df.columns:
@@ -171,6 +178,8 @@ def cant_viv_por_anio(option, anios):
         st.error(f"Error al procesar los datos: {e}")
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 4.2 - - - - - - - - - - - - - - - - - - - - - - - - - - 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 4.2 - - - - - - - - - - - - - - - - - - - - - - - - - - 
+COLUMNAS_4_2 = {'ANO4': 'int64', 'IV1': 'int64'}
+
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -MAIN 4.2 - - - - - - - - - - - - - - - - - - - - - - - - - -
 def mostrar_grafico_torta_vivienda(option):
     """
@@ -183,9 +192,10 @@ def mostrar_grafico_torta_vivienda(option):
     - Exception: Si ocurre un error inesperado durante el procesamiento.
     - Warning: Si faltan columnas necesarias en el DataFrame.
     """
+    import plotly.express as px
 
     try:
-        df_hogar = pd.read_csv(PROCESSED_DATA_HOGAR, delimiter=';')
+        df_hogar = cargar_csv(PROCESSED_DATA_HOGAR, COLUMNAS_4_2)
 
         if 'ANO4' not in df_hogar.columns or 'IV1' not in df_hogar.columns:
             st.warning("Faltan columnas necesarias para el análisis ('ANO4' o 'IV1').")
@@ -228,6 +238,7 @@ def mostrar_grafico_torta_vivienda(option):
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 4.3 - - - - - - - - - - - - - - - - - - - - - - - - - - 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 4.3 - - - - - - - - - - - - - - - - - - - - - - - - - - 
+COLUMNAS_4_3 = {'CODUSU': 'object', 'ANO4': 'int64', 'TRIMESTRE': 'int64', 'AGLOMERADO': 'int64', 'IV3': 'int64'}
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -MAIN 4.3 - - - - - - - - - - - - - - - - - - - - - - - - - -
 def material_predominante_por_aglomerado(option, anios): 
@@ -243,13 +254,14 @@ def material_predominante_por_aglomerado(option, anios):
     - Exception: Si ocurre un error inesperado durante el procesamiento.
     - Warning: Si faltan columnas necesarias en el DataFrame.
     """
+    import matplotlib.pyplot as plt
     materiales_piso = {
         '1': 'Mosaico, baldosa, madera, cerámica, alfombra',
         '2': 'Cemento, ladrillo fijo',
         '3': 'Ladrillo suelto, tierra',
     }
     try:
-        datos_hogar = pd.read_csv(PROCESSED_DATA_HOGAR, delimiter=';')
+        datos_hogar = cargar_csv(PROCESSED_DATA_HOGAR, COLUMNAS_4_3)
 
         columnas = {'ANO4', 'TRIMESTRE', 'AGLOMERADO', 'IV3', 'CODUSU'}
         if not columnas.issubset(datos_hogar.columns):
@@ -308,6 +320,8 @@ def material_predominante_por_aglomerado(option, anios):
         st.error(f"Error: {e}")
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 4.4 - - - - - - - - - - - - - - - - - - - - - - - - - - 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 4.4 - - - - - - - - - - - - - - - - - - - - - - - - - - 
+COLUMNAS_4_4 = {'ANO4': 'int64', 'AGLOMERADO': 'int64', 'PONDERA': 'int64', 'IV9': 'int64'}
+
 def mostrar_aglo (aglomerado):
     """
     Muestra el nombre del aglomerado seleccionado.
@@ -319,6 +333,7 @@ def mostrar_aglo (aglomerado):
     return f' {aglo_dict()[aglomerado]}'
 
 def mostrar_grafico_prop_banio(estructura):
+    import matplotlib.pyplot as plt
     df = pd.DataFrame([
         {'Aglomerado': aglo, 'Proporción con baño dentro del hogar (%)': valor}
         for aglo, valor in estructura.items()
@@ -335,6 +350,28 @@ def mostrar_grafico_prop_banio(estructura):
 
     return fig
 
+def proporcion_banio(hogares, anios, aglomerados):
+    """
+    Calcula, con una sola agrupación, el porcentaje ponderado de viviendas con baño dentro del hogar
+    (IV9 == 1) de cada aglomerado, sumando los años indicados.
+
+    Parameters:
+        hogares: DataFrame con datos de hogares.
+        anios: Años que se tienen en cuenta.
+        aglomerados: Aglomerados a evaluar, en el orden en que se devuelven.
+
+    Returns:
+        Diccionario {nombre del aglomerado: porcentaje redondeado a 2 decimales}. Un aglomerado
+        sin viviendas en esos años queda con 0.
+    """
+    en_anios = hogares[hogares['ANO4'].isin(anios)]
+    sumas = (en_anios.assign(CON_BANIO=en_anios['PONDERA'].where(en_anios['IV9'] == 1, 0))
+             .groupby('AGLOMERADO')[['PONDERA', 'CON_BANIO']].sum()
+             .reindex(aglomerados, fill_value=0))
+    proporcion = (sumas['CON_BANIO'] / sumas['PONDERA']).where(sumas['PONDERA'] != 0, 0)
+    porcentajes = (proporcion * 100).round(2)
+    return {f'{mostrar_aglo(aglo)}': porcentaje for aglo, porcentaje in porcentajes.items()}
+
 def evaluarTodos(hogares, anios, aglomerados):
     """
     Calcula la proporción de viviendas con baño dentro del hogar por aglomerado,
@@ -348,28 +385,14 @@ def evaluarTodos(hogares, anios, aglomerados):
     Returns:
         dic_x_aglo: Diccionario con la proporción de viviendas con baño dentro del hogar por aglomerado.
     """
-    dic_x_aglo = {}
-    for aglo in aglomerados:
-        casas_totales = 0
-        cant_con_banio = 0
-        clave = f'{mostrar_aglo(aglo)}'
-        for anio in anios:
-            filtro = (hogares['AGLOMERADO'] == aglo) & (hogares['ANO4'] == anio)
-            casas_totales += (hogares[filtro]['PONDERA'].sum())
-            cant_con_banio += (hogares[filtro & (hogares['IV9']== 1)]['PONDERA'].sum())
-        proporcion = cant_con_banio/casas_totales if casas_totales != 0 else 0
-        dic_x_aglo[clave] = round(proporcion*100,2)
-    return dic_x_aglo
+    return proporcion_banio(hogares, anios, aglomerados)
 
 def evaluarUnAño(hogares, opcion, aglomerados):
-    dic_un_anio={}
-    for aglo in aglomerados:
-        clave = f'{mostrar_aglo(aglo)}'
-        casas_totales = (hogares[(hogares['ANO4'] == opcion) & (hogares['AGLOMERADO']== aglo)]['PONDERA'].sum())
-        cant_con_banio = hogares[(hogares['ANO4'] == opcion) & (hogares['AGLOMERADO']==aglo) & (hogares['IV9'] == 1)]['PONDERA'].sum()
-        proporcion = cant_con_banio/casas_totales if casas_totales != 0 else 0
-        dic_un_anio[clave] = ((proporcion*100).round(2))
-    return dic_un_anio
+    """
+    Calcula la proporción de viviendas con baño dentro del hogar por aglomerado para un solo año.
+    Devuelve un diccionario como el de evaluarTodos.
+    """
+    return proporcion_banio(hogares, [opcion], aglomerados)
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -MAIN 4.2 - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 
@@ -391,7 +414,7 @@ def banio_dentro_hogar_aglomerado(opcion, anios):
     Warning: Si faltan columnas requeridas en el DataFrame, muestra un mensaje de advertencia en Streamlit.
     """
     try:
-        hogares = pd.read_csv(PROCESSED_DATA_HOGAR, delimiter=';', encoding='utf-8')
+        hogares = cargar_csv(PROCESSED_DATA_HOGAR, COLUMNAS_4_4)
         columnas_necesarias = {'ANO4', 'IV9', 'AGLOMERADO', 'PONDERA'}
         if not columnas_necesarias.issubset(hogares.columns):
             st.warning("Faltan columnas requeridas ('PONDERA' , 'ANO4' o 'IV9').")
@@ -418,6 +441,8 @@ def banio_dentro_hogar_aglomerado(opcion, anios):
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 4.5 - - - - - - - - - - - - - - - - - - - - - - - - - - 
 # Inciso pag 4
+COLUMNAS_4_5 = {'CODUSU': 'object', 'ANO4': 'int64', 'AGLOMERADO': 'int64', 'II7': 'int64'}
+
 def evolucion_tenencia(option):
     """
     Versión optimizada que recibe:
@@ -426,6 +451,7 @@ def evolucion_tenencia(option):
     Raises:
     Exception: Si ocurre un error al leer el archivo o procesar los datos.
     """
+    import matplotlib.pyplot as plt
     ##chequeo si ingreso todos o un anio
     analizar_todos_los_años = option == 'Todos'
     año_especifico = int(option) if not analizar_todos_los_años else None
@@ -444,7 +470,7 @@ def evolucion_tenencia(option):
 
     # 3. Carga y limpieza de datos
     try:
-        df = pd.read_csv(PROCESSED_DATA_HOGAR, sep=';')
+        df = cargar_csv(PROCESSED_DATA_HOGAR, COLUMNAS_4_5)
         df = df.dropna(subset=['CODUSU', 'ANO4', 'II7', 'AGLOMERADO']).copy()
         df['II7'] = df['II7'].astype(str)  # Asegurar tipo string para II7
         df = df.drop_duplicates(subset=['CODUSU', 'ANO4'])  # Viviendas únicas
@@ -535,6 +561,7 @@ def evolucion_tenencia(option):
             st.dataframe(distribucion.round(1).to_frame('Porcentaje (%)'))
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 4.6 - - - - - - - - - - - - - - - - - - - - - - - - - - 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 4.6 - - - - - - - - - - - - - - - - - - - - - - - - - - 
+COLUMNAS_4_6 = {'CODUSU': 'object', 'ANO4': 'int64', 'TRIMESTRE': 'int64', 'AGLOMERADO': 'int64', 'IV12_3': 'int64'}
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -MAIN 4.6 - - - - - - - - - - - - - - - - - - - - - - - - - -
 def viviendas_en_villa_por_aglomerado(option, anios):
@@ -560,7 +587,7 @@ def viviendas_en_villa_por_aglomerado(option, anios):
     Warning: Si faltan columnas necesarias en el DataFrame.
     """
     try:
-        datos_hogar = pd.read_csv(PROCESSED_DATA_HOGAR, delimiter=';')
+        datos_hogar = cargar_csv(PROCESSED_DATA_HOGAR, COLUMNAS_4_6)
 
         columnas = {'ANO4', 'TRIMESTRE', 'AGLOMERADO', 'IV12_3', 'CODUSU'}
         if not columnas.issubset(datos_hogar.columns):
@@ -618,6 +645,7 @@ def viviendas_en_villa_por_aglomerado(option, anios):
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 4.7 - - - - - - - - - - - - - - - - - - - - - - - - - - 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 4.7 - - - - - - - - - - - - - - - - - - - - - - - - - - 
+
 def calcular_porcentaje_habitabilidad(archivo_csv_hogares, anio_filtro=None):
     """
     Calcula el porcentaje de viviendas por condición de habitabilidad en cada aglomerado.
@@ -628,25 +656,22 @@ def calcular_porcentaje_habitabilidad(archivo_csv_hogares, anio_filtro=None):
 
     Retorna:
     pd.DataFrame: Tabla con columnas ['AGLOMERADO', 'CONDICION_DE_HABITABILIDAD', 'AÑO', 'Porcentaje (%)'].
-    None: Si faltan columnas necesarias.
-    
-    Raises:
-    st.error: Faltan columnas necesarias en el CSV.
+    None: Si faltan columnas necesarias. No muestra el error: la función se llama desde reporte_habitabilidad,
+    que tiene caché, y Streamlit repetiría el mensaje en cada acierto de la caché.
     """
     
-    df = pd.read_csv(archivo_csv_hogares, delimiter=';')
+    cubo = cargar_cubo(archivo_csv_hogares, ['ANO4', 'AGLOMERADO', 'CONDICION_DE_HABITABILIDAD'])
 
     columnas_necesarias = {'AGLOMERADO', 'CONDICION_DE_HABITABILIDAD', 'ANO4'}
-    if not columnas_necesarias.issubset(df.columns):
-        st.error("Faltan columnas necesarias en el CSV.")
+    if not columnas_necesarias.issubset(cubo.columns):
         return None
     
-    if anio_filtro is not None:
-        # Filtra el dataframe por el año indicado
-        df = df[df['ANO4'] == anio_filtro]
+    # Filtra por el año indicado, si hay uno
+    filtros = {'ANO4': anio_filtro} if anio_filtro is not None else None
 
     # Cuenta la cantidad de registros por cada combinación de aglomerado + condición de habitabilidad
-    grupo = df.groupby(['AGLOMERADO', 'CONDICION_DE_HABITABILIDAD']).size().reset_index(name='Cantidad')
+    grupo = consultar_cubo(cubo, ['AGLOMERADO', 'CONDICION_DE_HABITABILIDAD'], filtros, medida='FILAS')
+    grupo = grupo.reset_index(name='Cantidad')
 
     # Suma total de viviendas por aglomerado (para calcular el %)
     total_x_aglomerado = grupo.groupby('AGLOMERADO')['Cantidad'].sum().reset_index(name='TOTAL_AGLOMERADO')
@@ -664,6 +689,26 @@ def calcular_porcentaje_habitabilidad(archivo_csv_hogares, anio_filtro=None):
     return grupo[['AGLOMERADO', 'CONDICION_DE_HABITABILIDAD', 'AÑO', 'Porcentaje (%)']]
 
 
+@st.cache_data(show_spinner="Generando el reporte...", max_entries=16)
+def reporte_habitabilidad(option, version):
+    """
+    Calcula el reporte de habitabilidad y lo serializa como CSV en memoria, una sola vez
+    por año elegido y versión del archivo de hogares.
+
+    Parámetros:
+    option (str o int): 'Todos' o un año específico.
+    version (tuple): Versión del archivo de hogares (ver version_archivo). Solo forma parte de la clave de la caché.
+
+    Retorna:
+    tuple: (tabla, contenido del CSV en bytes), o None si faltan columnas necesarias.
+    """
+
+    anio_filtro = None if option == 'Todos' else int(option)
+    df_resultado = calcular_porcentaje_habitabilidad(PROCESSED_DATA_HOGAR, anio_filtro=anio_filtro)
+    if df_resultado is None:
+        return None
+    return df_resultado, df_resultado.to_csv(index=False, sep=';').encode('utf-8')
+
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -MAIN 4.7 - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 
@@ -686,30 +731,18 @@ def exportar_porcentaje_habitabilidad(option, anios):
     
     if hacer:
         # Decide si filtrar por año o no
-        if option == 'Todos':
-            df_resultado = calcular_porcentaje_habitabilidad(PROCESSED_DATA_HOGAR)
-            nombre = "porcentaje_habitabilidad_todos.csv"
+        nombre = "porcentaje_habitabilidad_todos.csv" if option == 'Todos' else f"porcentaje_habitabilidad_{option}.csv"
+        reporte = reporte_habitabilidad(option, version_archivo(PROCESSED_DATA_HOGAR))
+
+        if reporte is None:
+            st.error("Faltan columnas necesarias en el CSV.")
         else:
-            df_resultado = calcular_porcentaje_habitabilidad(PROCESSED_DATA_HOGAR, anio_filtro=int(option))
-            nombre = f"porcentaje_habitabilidad_{option}.csv"
-
-        if df_resultado is not None:
-            # Barra de progreso visual
-            barra_placeholder = st.empty()
-            with barra_placeholder:
-                barra = st.progress(0)
-                for pct in range(0, 101):
-                    time.sleep(0.02)
-                    barra.progress(pct)
-            barra_placeholder.empty()
+            df_resultado, csv_data = reporte
 
             # Muestra tabla en pantalla
             st.success("¡Reporte generado con éxito!")
             st.dataframe(df_resultado)
 
-            # Prepara CSV en memoria para descarga
-            csv_data = df_resultado.to_csv(index=False, sep=';').encode('utf-8')
-
             # Botón para descargar CSV
             st.download_button(
                 label="📥 Descargar CSV",
@@ -1,13 +1,8 @@
 import streamlit as st
 import json
-import folium
-from streamlit_folium import folium_static
 import pandas as pd
-import altair as alt
 from pathlib import Path
 import sys
-import matplotlib.pyplot as plt
-import plotly.express as px
 
 
 current_dir = Path().resolve()
@@ -19,6 +14,9 @@ if str(src_dir) not in sys.path:
 
 from funcionalidad import aglo_dict
 from constantes import *
+from cargador import cargar_csv, cargar_cubo, version_archivo
+from cubo import consultar_cubo
+from tasas import tasas_laborales, agregar_tasas, codigos_estado, codigos_condicion
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 5.1 - - - - - - - - - - - - - - - - - - - - - - - - - - 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 5.1 - - - - - - - - - - - - - - - - - - - - - - - - - - 
@@ -34,21 +32,19 @@ def mostrar_desocupacion_por_estudios():
     KeyError: Error al procesar los datos de las columnas.
     Warning: Si no hay datos de personas desocupadas para el período seleccionado.
     """
+    import plotly.express as px
 
     try:
-        df = pd.read_csv(PROCESSED_DATA_INDIVIDUAL, sep=";")
+        cubo = cargar_cubo(PROCESSED_DATA_INDIVIDUAL, ["ANO4", "TRIMESTRE", "NIVEL_ED_str", "ESTADO"])
 
         # Filtros por año y trimestre
-        anios = sorted(df["ANO4"].dropna().unique())
+        anios = sorted(cubo["ANO4"].dropna().unique())
         anio = st.selectbox("Seleccioná un año", anios)
-        trimestres = sorted(df[df["ANO4"] == anio]["TRIMESTRE"].dropna().unique())
+        trimestres = sorted(cubo[cubo["ANO4"] == anio]["TRIMESTRE"].dropna().unique())
         trimestre = st.selectbox("Seleccioná un trimestre", trimestres)
 
-        # Tomo los datos filtrados por año, trimestre y estado de desocupación
-        df_filtrado = df[(df["ANO4"] == anio) & (df["TRIMESTRE"] == trimestre)]
-        df_desocupados = df_filtrado[df_filtrado["ESTADO"] == 2]
-
-        conteo = df_desocupados.groupby("NIVEL_ED_str")["PONDERA"].sum()
+        # Desocupados del año y trimestre elegidos, por nivel educativo
+        conteo = consultar_cubo(cubo, ["NIVEL_ED_str"], {"ANO4": anio, "TRIMESTRE": trimestre, "ESTADO": 2})
         conteo = conteo.sort_values()
         conteo = conteo.reset_index()
         conteo.columns = ["Nivel educativo", "Cantidad"]
@@ -72,28 +68,48 @@ def mostrar_desocupacion_por_estudios():
         st.error("Error al procesar los datos. Verifique las columnas requeridas.")
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 5.2 - - - - - - - - - - - - - - - - - - - - - - - - - -
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 5.2 - - - - - - - - - - - - - - - - - - - - - - - - - - 
-def calcular_tasa(datos_empleo, tipo='desempleo'):
+COLUMNAS_5_2 = {'ANO4': 'int64', 'TRIMESTRE': 'int64', 'AGLOMERADO': 'int64', 'PONDERA': 'int64',
+                'CONDICION_LABORAL': 'object'}
+
+@st.cache_data(show_spinner="Calculando las tasas...", max_entries=4)
+def tabla_tasas(version):
     """
-    Calcula la tasa de desempleo ponderada para un conjunto de registros.
+    Calcula las tasas de empleo y desempleo de todos los aglomerados y períodos,
+    una sola vez por versión del archivo de individuos.
 
     Parameters
     ----------
-    datos_empleo : pd.DataFrame
-        Subconjunto de registros con las columnas 'PONDERA' y 'CONDICION_LABORAL'.
+    version : tuple
+        Versión del archivo de individuos (ver version_archivo). Solo forma parte de la clave de la caché.
 
     Returns
     -------
-    float
-        Tasa de desempleo expresada en porcentaje.
+    tuple or None
+        (aglomerados ordenados, tabla de tasas_laborales por AGLOMERADO y PERIODO),
+        o None si faltan columnas necesarias.
     """
-    
-    ocupados = datos_empleo[datos_empleo['CONDICION_LABORAL'].str.startswith('Ocupado')]['PONDERA'].sum()
-    desocupados = datos_empleo[datos_empleo['CONDICION_LABORAL'] == 'Desocupado.']['PONDERA'].sum()
-    total = ocupados + desocupados
-    if tipo == 'empleo':
-        return (ocupados / total) * 100 if total != 0 else 0
-    elif tipo== 'desempleo':
-        return (desocupados / total) * 100 if total != 0 else 0
+
+    datos_personas = cargar_csv(PROCESSED_DATA_INDIVIDUAL, COLUMNAS_5_2)
+
+    columnas = {'ANO4', 'TRIMESTRE', 'PONDERA', 'CONDICION_LABORAL', 'AGLOMERADO'}
+    if not columnas.issubset(datos_personas.columns):
+        return None
+
+    datos_personas['ANO4'] = pd.to_numeric(datos_personas['ANO4'], errors='coerce')
+    datos_personas['TRIMESTRE'] = pd.to_numeric(datos_personas['TRIMESTRE'], errors='coerce')
+    datos_personas['PONDERA'] = pd.to_numeric(datos_personas['PONDERA'], errors='coerce')
+    datos_personas['AGLOMERADO'] = datos_personas['AGLOMERADO'].astype(str)
+    datos_personas['CONDICION_LABORAL'] = datos_personas['CONDICION_LABORAL'].astype(str)
+
+    aglomerados = sorted(datos_personas['AGLOMERADO'].unique())
+
+    datos_personas = datos_personas.dropna(subset=['ANO4','TRIMESTRE','PONDERA','AGLOMERADO','CONDICION_LABORAL'])
+    datos_personas['PERIODO'] = datos_personas['ANO4'].astype(str) + 'TRIM' + datos_personas['TRIMESTRE'].astype(str)
+
+    tasas = tasas_laborales(codigos_condicion(datos_personas['CONDICION_LABORAL']), datos_personas['PONDERA'].to_numpy(),
+                            claves={'AGLOMERADO': datos_personas['AGLOMERADO'].to_numpy(),
+                                    'PERIODO': datos_personas['PERIODO'].to_numpy()})
+    return aglomerados, tasas
 
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -MAIN 5.2 - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -101,6 +117,7 @@ def evolucion_desempleo():
     """
     Grafica la evolución de la tasa de desempleo a lo largo del tiempo,
     ya sea a nivel país o filtrado por un aglomerado en particular.
+    Las tasas de todos los aglomerados se calculan una vez; al cambiar de aglomerado solo se filtran.
 
     Returns
     -------
@@ -115,35 +132,27 @@ def evolucion_desempleo():
         Warning
             Si faltan columnas necesarias para calcular la tasa de desempleo.
     """
+    import matplotlib.pyplot as plt
     try:
-        datos_personas = pd.read_csv(PROCESSED_DATA_INDIVIDUAL, delimiter=';')
-
-        columnas = {'ANO4', 'TRIMESTRE', 'PONDERA', 'CONDICION_LABORAL', 'AGLOMERADO'}
-        if not columnas.issubset(datos_personas.columns):
+        calculo = tabla_tasas(version_archivo(PROCESSED_DATA_INDIVIDUAL))
+        if calculo is None:
             st.warning("Faltan columnas necesarias para calcular desempleo.")
             return
+        aglomerados, tasas = calculo
 
-        datos_personas['ANO4'] = pd.to_numeric(datos_personas['ANO4'], errors='coerce')
-        datos_personas['TRIMESTRE'] = pd.to_numeric(datos_personas['TRIMESTRE'], errors='coerce')
-        datos_personas['PONDERA'] = pd.to_numeric(datos_personas['PONDERA'], errors='coerce')
-        datos_personas['AGLOMERADO'] = datos_personas['AGLOMERADO'].astype(str)
-        datos_personas['CONDICION_LABORAL'] = datos_personas['CONDICION_LABORAL'].astype(str)
-        
-        aglomerados = sorted(datos_personas['AGLOMERADO'].unique())
         selec_aglo = st.selectbox('Seleccione un aglomerado (Opcional)', ['Total País'] + aglomerados)
         
         if selec_aglo != 'Total País':
-            datos_personas = datos_personas[datos_personas['AGLOMERADO'] == selec_aglo]
+            tasas = tasas[tasas['AGLOMERADO'] == selec_aglo]
             nombre_aglomerado = aglo_dict().get(selec_aglo,selec_aglo)
         else:
+            # Las sumas de todos los aglomerados de cada período, con las tasas recalculadas
+            tasas = agregar_tasas(tasas.groupby('PERIODO', as_index=False)[['ocupados', 'desocupados', 'poblacion']].sum())
             nombre_aglomerado = 'Total País'
         
-        datos_personas = datos_personas.dropna(subset=['ANO4','TRIMESTRE','PONDERA','AGLOMERADO','CONDICION_LABORAL'])
-        datos_personas['PERIODO'] = datos_personas['ANO4'].astype(str) + 'TRIM' + datos_personas['TRIMESTRE'].astype(str)
-        
         tipos = ['desempleo', 'empleo']
         selec_tipo = st.selectbox('Seleccione la tasa de empleo o desempleo', tipos)
-        resumen = datos_personas.groupby('PERIODO', group_keys=False).apply(lambda grupo: calcular_tasa(grupo, selec_tipo)).reset_index(name='Tasa')
+        resumen = tasas[['PERIODO', selec_tipo]].rename(columns={selec_tipo: 'Tasa'}).reset_index(drop=True)
 
         fig, ax = plt.subplots(figsize=(12, 6))
         ax.plot(resumen['PERIODO'], resumen['Tasa'], marker='o', linestyle='-', color='tomato')
@@ -162,6 +171,7 @@ def evolucion_desempleo():
         st.error('Error en los parametros de llamada de la función.')
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 5.4 - - - - - - - - - - - - - - - - - - - - - - - - - - 
+COLUMNAS_5_4 = {'AGLOMERADO': 'int64', 'PONDERA': 'int64', 'ESTADO': 'int64', 'PP04A': 'float64'}
 
 def informacion_ocupacion():
     """
@@ -172,6 +182,7 @@ def informacion_ocupacion():
         Warning: Si no hay datos válidos para mostrar.
         st.error: Si no se encuentran las columnas requeridas en el DataFrame.
     """
+    import matplotlib.pyplot as plt
     ocupacion_principal = {
         1.0: 'Estatal',
         2.0: 'Privada',
@@ -179,7 +190,7 @@ def informacion_ocupacion():
     }
 
     try:
-        df = pd.read_csv(PROCESSED_DATA_INDIVIDUAL, delimiter=';')
+        df = cargar_csv(PROCESSED_DATA_INDIVIDUAL, COLUMNAS_5_4)
         
         # Verificación de columnas
         columnas_requeridas = ['PONDERA', 'PP04A', 'ESTADO', 'AGLOMERADO']
@@ -252,6 +263,8 @@ def informacion_ocupacion():
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 5.5 - - - - - - - - - - - - - - - - - - - - - - - - - - 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 5.5 - - - - - - - - - - - - - - - - - - - - - - - - - - 
+COLUMNAS_5_5 = {'ANO4': 'int64', 'TRIMESTRE': 'int64', 'AGLOMERADO': 'int64', 'PONDERA': 'int64', 'ESTADO': 'int64'}
+
 def conseguir_data(arch):
     """
     Obtiene el año y trimestre mínimo y máximo presentes en el DataFrame.
@@ -289,24 +302,16 @@ def conseguir_tasas(data):
     if data is None or data.empty:
         return pd.DataFrame() 
 
-    # Filtrar población activa, ocupada y desocupada
-    activos = data[data['ESTADO'].isin([1, 2])]
-    ocupados = data[data['ESTADO'] == 1]
-    desocupados = data[data['ESTADO'] == 2]
-
-    # Agrupar por aglomerado y sumar ponderaciones
-    activos_ag = activos.groupby('AGLOMERADO')['PONDERA'].sum()
-    ocupados_ag = ocupados.groupby('AGLOMERADO')['PONDERA'].sum()
-    desocupados_ag = desocupados.groupby('AGLOMERADO')['PONDERA'].sum()
-
-    # Evitar división por cero
-    activos_ag = activos_ag.replace(0, pd.NA)
+    # Ocupados, desocupados y tasas de cada aglomerado en una sola pasada
+    tasas = tasas_laborales(codigos_estado(data['ESTADO']), data['PONDERA'].to_numpy(),
+                            claves={'AGLOMERADO': data['AGLOMERADO'].to_numpy()})
+    # Solo los aglomerados con población activa
+    tasas = tasas[tasas['activos'] > 0].set_index('AGLOMERADO')
 
-    # Calcular tasas y llenar nulos con 0
     tasas = pd.DataFrame({
-        'Tasa de Empleo (%)': (ocupados_ag / activos_ag * 100).round(2),
-        'Tasa de Desempleo (%)': (desocupados_ag / activos_ag * 100).round(2)
-    }).fillna(0)
+        'Tasa de Empleo (%)': tasas['empleo'].round(2),
+        'Tasa de Desempleo (%)': tasas['desempleo'].round(2)
+    })
 
     return tasas
 
@@ -385,9 +390,11 @@ def muestra_tasas_empleoydesempleo():
     - Muestra advertencias si no hay datos o no se pueden determinar los períodos.
     - Captura y muestra errores al generar el mapa interactivo.
     """
+    import folium
+    from streamlit_folium import folium_static
     try:
         # Cargar datos procesados individuales
-        arch = pd.read_csv(PROCESSED_DATA_INDIVIDUAL, sep=';')
+        arch = cargar_csv(PROCESSED_DATA_INDIVIDUAL, COLUMNAS_5_5)
     except Exception as e:
         st.error(f"No se pudo cargar el archivo de datos: {e}")
         return
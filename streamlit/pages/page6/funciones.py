@@ -1,10 +1,8 @@
-import matplotlib.pyplot as plt
 import streamlit as st
 import sys
 import pandas as pd 
 from pathlib import Path
-import time
-import plotly.express as px
+import io
 
 current_dir = Path().resolve()
 src_dir = current_dir.parents[2] / "src"
@@ -15,6 +13,8 @@ if str(src_dir) not in sys.path:
     
 from funcionalidad import *
 from constantes import *
+from cargador import cargar_csv, cargar_cubo, version_archivo
+from cubo import consultar_cubo
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 6.1 - - - - - - - - - - - - - - - - - - - - - - - - - - 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 6.1 - - - - - - - - - - - - - - - - - - - - - - - - - - 
@@ -36,17 +36,17 @@ def mostrar_educacion_por_nivel():
     Warning
         Si faltan columnas necesarias para el análisis.
     """
+    import plotly.express as px
     try:
-        df = pd.read_csv(PROCESSED_DATA_INDIVIDUAL, sep=";")
+        cubo = cargar_cubo(PROCESSED_DATA_INDIVIDUAL, ["ANO4", "NIVEL_ED_str"])
     except Exception as e:
         st.error(f"No se pudo cargar el archivo procesado: {e}")
 
 
-    anios = sorted(df["ANO4"].dropna().unique())
+    anios = sorted(cubo["ANO4"].dropna().unique())
     anio = st.selectbox("Seleccioná un año", anios, key="anio_1_6_1")
-    df_filtrado = df[df["ANO4"] == anio]
 
-    conteo = df_filtrado.groupby("NIVEL_ED_str")["PONDERA"].sum().reset_index()
+    conteo = consultar_cubo(cubo, ["NIVEL_ED_str"], {"ANO4": anio}).reset_index()
     conteo.columns = ["Nivel educativo", "Cantidad"]
     conteo = conteo.sort_values(by="Cantidad")
 
@@ -63,6 +63,7 @@ def mostrar_educacion_por_nivel():
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -INCISO 6.2 - - - - - - - - - - - - - - - - - - - - - - - - - -
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -AUX 6.2 - - - - - - - - - - - - - - - - - - - - - - - - - - 
+COLUMNAS_6_2 = {'CH06': 'int64', 'PONDERA': 'int64', 'NIVEL_ED_str': 'object'}
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -MAIN 6.2 - - - - - - - - - - - - - - - - - - - - - - - - - -
 def nivel_educativo_mas_comun_por_grupo():
     """
@@ -81,8 +82,9 @@ def nivel_educativo_mas_comun_por_grupo():
     Warning
         Si faltan columnas necesarias para el análisis.
     """
+    import matplotlib.pyplot as plt
     try:
-        datos_personas = pd.read_csv(PROCESSED_DATA_INDIVIDUAL, delimiter=';')
+        datos_personas = cargar_csv(PROCESSED_DATA_INDIVIDUAL, COLUMNAS_6_2)
 
         columnas = {'CH06', 'NIVEL_ED_str', 'PONDERA'}
         if not columnas.issubset(datos_personas.columns):
@@ -155,27 +157,32 @@ def mostrar_aglo(aglomerado):
     """
     return f' {aglo_dict()[aglomerado]}'
 
-def convertir(archivo_hogares, archivo_personas):
+@st.cache_data(show_spinner="Generando el ranking...", max_entries=4)
+def convertir(archivo_hogares, archivo_personas, versiones=None):
     """
-    Convierte los datos de hogares y personas en un archivo CSV con el top 5 de aglomerados universitarios.
+    Convierte los datos de hogares y personas en un CSV en memoria con el top 5 de aglomerados universitarios.
+    El resultado se calcula una sola vez por versión de los archivos.
     Parameters:
         archivo_hogares (str): Ruta al archivo de datos de hogares procesados.
         archivo_personas (str): Ruta al archivo de datos de personas procesados.
+        versiones (tuple): Versiones de los dos archivos (ver version_archivo). Solo forman parte de la clave de la caché.
     Returns:
-        None
+        bytes: Contenido del CSV (UTF-8), o None si no se pudo calcular el ranking.
     """
     top_5 = top_5_aglomerados_universitarios(archivo_hogares, archivo_personas, ok = True)
-    archivo_nuevo_csv = "Top 5 aglomerados universitarios.csv"
+    if top_5 is None:
+        return None
 
-    with open(archivo_nuevo_csv, mode='w', newline='', encoding='utf-8') as nuevo_arch:
-        escritor = csv.writer(nuevo_arch, delimiter=';')
-        
-        # Escribir encabezado
-        escritor.writerow(["Aglomerado", "Porcentaje (%)"])
-        
-        # Escribir los 5 primeros formateados
-        for codigo, porcentaje in top_5[:5]:
-            escritor.writerow([mostrar_aglo(codigo), f"{porcentaje:.2f}"])
+    nuevo_arch = io.StringIO(newline='')
+    escritor = csv.writer(nuevo_arch, delimiter=';')
+    
+    # Escribir encabezado
+    escritor.writerow(["Aglomerado", "Porcentaje (%)"])
+    
+    # Escribir los 5 primeros formateados
+    for codigo, porcentaje in top_5[:5]:
+        escritor.writerow([mostrar_aglo(codigo), f"{porcentaje:.2f}"])
+    return nuevo_arch.getvalue().encode('utf-8')
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -MAIN 6.3 - - - - - - - - - - - - - - - - - - - - - - - - - -
 def convertir_top5_csv():
     """
@@ -198,34 +205,31 @@ def convertir_top5_csv():
         hacer = st.button('Continuar')
         
         if hacer:
-            convertir(PROCESSED_DATA_HOGAR, PROCESSED_DATA_INDIVIDUAL)
-            
-            # Barra de progreso simulada
-            barra_placeholder = st.empty()
-            with barra_placeholder:
-                barra = st.progress(0)
-                for pct in range(0, 101):
-                    time.sleep(0.02)
-                    barra.progress(pct)
-            barra_placeholder.empty()
+            versiones = (version_archivo(PROCESSED_DATA_HOGAR), version_archivo(PROCESSED_DATA_INDIVIDUAL))
+            contenido = convertir(PROCESSED_DATA_HOGAR, PROCESSED_DATA_INDIVIDUAL, versiones)
+            if contenido is None:
+                st.error("No se pudo calcular el ranking de aglomerados universitarios.")
+                return
             
             st.success('El archivo CSV con los 5 aglomerados con más universitarios se creó exitosamente.')
             
-            # Botón para descargar el archivo recién creado
-            with open("Top 5 aglomerados universitarios.csv", "rb") as file:
-                st.download_button(
-                    label="📥 Descargar CSV",
-                    data=file,
-                    file_name="top5_aglomerados.csv",
-                    mime='text/csv'
-                )
+            # Botón para descargar el CSV generado en memoria
+            st.download_button(
+                label="📥 Descargar CSV",
+                data=contenido,
+                file_name="top5_aglomerados.csv",
+                mime='text/csv'
+            )
                 
     except ValueError:
         st.error("Error: se esperaba un número pero se recibió otro dato.")
+    except FileNotFoundError:
+        st.error("No se encontraron los archivos procesados.")
 
 
 
 #- - - - - - - - - - - - - - - - - - - - - - - - - - - -MAIN 6.4 - - - - - - - - - - - - - - - - - - - - - - - - - -
+COLUMNAS_6_4 = {'CODUSU': 'object', 'ANO4': 'int64', 'PONDERA': 'int64', 'CH06': 'int64', 'CH09': 'int64'}
 
 def informacion_sobre_alfabetizacion():
     """
@@ -242,7 +246,7 @@ def informacion_sobre_alfabetizacion():
     """
     # Cargar datos
     try:
-        df = pd.read_csv(PROCESSED_DATA_INDIVIDUAL, sep=";")
+        df = cargar_csv(PROCESSED_DATA_INDIVIDUAL, COLUMNAS_6_4)
     except Exception as e:
         st.error(f"No se pudo cargar el archivo procesado: {e}")
 
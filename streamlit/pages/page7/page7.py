@@ -2,7 +2,6 @@ import streamlit as st
 import pandas as pd
 from pathlib import Path
 import sys
-import matplotlib.pyplot as plt
 
 current_dir = Path().resolve()
 src_dir = current_dir.parent / "src"
@@ -12,6 +11,9 @@ if str(src_dir) not in sys.path:
     sys.path.append(str(src_dir))
 
 from constantes import *
+from cargador import cargar_csv
+
+COLUMNAS_HOGAR = {'ANO4': 'int64', 'TRIMESTRE': 'int64', 'IX_TOT': 'int64', 'ITF': 'int64', 'PONDERA': 'int64'}
 
 
 def pagina7():
@@ -41,7 +43,7 @@ def pagina7():
 
     # === Cargar datasets ===
     try:
-        df_hogar = pd.read_csv(DATA_HOGAR, sep=';')
+        df_hogar = cargar_csv(DATA_HOGAR, COLUMNAS_HOGAR)
     except Exception as e:
         st.error(f"No se pudo cargar el archivo de hogares: {e}")
         return
@@ -82,7 +84,7 @@ def pagina7():
 
     # Cargar datos de la canasta básica
     try:
-        df_canasta = pd.read_csv(CANASTA)  # Por defecto separa por coma
+        df_canasta = cargar_csv(CANASTA, sep=',')
     except Exception as e:
         st.error(f"No se pudo cargar el archivo de canasta básica: {e}")
         return
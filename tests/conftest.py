@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Los módulos de src se importan por nombre (from constantes import ...), igual que en la app y los notebooks
+SRC_PATH = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
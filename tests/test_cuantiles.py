@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+import cuantiles
+from cuantiles import CUARTILES, DECILES, MEDIANA, cuantiles_ponderados, nombre_cuantil
+
+
+def cuantil_expandido(valores, pesos, cuantil):
+    """
+    Cuantil ponderado calculado a mano: cada valor se repite tantas veces como su peso
+    y se busca el primero en el que la cantidad acumulada alcanza cuantil veces el total.
+    """
+
+    expandidos = np.sort(np.repeat(valores, pesos))
+    for valor in np.unique(expandidos):
+        if (expandidos <= valor).sum() >= cuantil * len(expandidos):
+            return valor
+
+
+def esperado_por_grupo(df, cuantiles_pedidos):
+    """ Resultado de cuantiles_ponderados armado grupo por grupo con los pesos expandidos. """
+
+    filas = []
+    for (anio, trimestre), grupo in df.groupby(["ANO4", "TRIMESTRE"]):
+        expandidos = np.repeat(grupo["VALOR"].to_numpy(), grupo["PESO"].to_numpy())
+        if len(expandidos) == 0:
+            continue # los grupos sin peso no aparecen en el resultado
+        fila = {"ANO4": anio, "TRIMESTRE": trimestre, "total": len(expandidos), "media": expandidos.mean()}
+        for cuantil in cuantiles_pedidos:
+            fila[nombre_cuantil(cuantil)] = cuantil_expandido(grupo["VALOR"], grupo["PESO"], cuantil)
+        filas.append(fila)
+    return pd.DataFrame(filas)
+
+
+def datos(valores, semilla=0):
+    """ Filas al azar de varios períodos, con valores repetidos y pesos en 0. """
+
+    generador = np.random.default_rng(semilla)
+    cantidad = 400
+    df = pd.DataFrame({
+        "ANO4": generador.choice([2020, 2021], cantidad),
+        "TRIMESTRE": generador.choice([1, 2, 3], cantidad),
+        "VALOR": generador.choice(valores, cantidad),
+        "PESO": generador.choice([0, 0, 1, 2, 5, 40], cantidad),
+    })
+    # Un período en el que todas las filas pesan 0
+    df.loc[(df["ANO4"] == 2021) & (df["TRIMESTRE"] == 3), "PESO"] = 0
+    return df
+
+
+def calcular(df, cuantiles_pedidos):
+    return cuantiles_ponderados(df["VALOR"].to_numpy(), df["PESO"].to_numpy(), cuantiles_pedidos,
+                                {"ANO4": df["ANO4"].to_numpy(), "TRIMESTRE": df["TRIMESTRE"].to_numpy()})
+
+
+@pytest.mark.parametrize("cuantiles_pedidos", [MEDIANA, CUARTILES, DECILES], ids=["mediana", "cuartiles", "deciles"])
+@pytest.mark.parametrize("valores", [np.arange(0, 12), np.array([0.5, 1.25, 1.25, 3.0, 7.5, 10.0])],
+                         ids=["enteros", "decimales"])
+def test_igual_a_expandir_los_pesos(valores, cuantiles_pedidos):
+    df = datos(valores)
+    resultado = calcular(df, cuantiles_pedidos)
+    pd.testing.assert_frame_equal(resultado, esperado_por_grupo(df, cuantiles_pedidos), check_dtype=False)
+
+
+def test_enteros_sin_histograma(monkeypatch):
+    # Con muchos valores distintos los enteros se ordenan en lugar de usar el histograma
+    monkeypatch.setattr(cuantiles, "CELDAS_HISTOGRAMA", 0)
+    df = datos(np.arange(0, 12), semilla=1)
+    pd.testing.assert_frame_equal(calcular(df, DECILES), esperado_por_grupo(df, DECILES), check_dtype=False)
+
+
+def test_empates_en_el_limite():
+    # La mitad del peso está en 1 y la otra mitad en 2: la mediana es el primer valor que alcanza la mitad
+    resultado = cuantiles_ponderados(np.array([2, 1, 2, 1]), np.array([1, 1, 1, 1]), CUARTILES)
+    assert list(resultado.loc[0, ["P25", "P50", "P75"]]) == [1, 1, 2]
+    assert resultado.loc[0, "media"] == 1.5
+
+
+def test_pesos_en_cero_no_cuentan():
+    resultado = cuantiles_ponderados(np.array([1.0, 100.0, 3.0]), np.array([1, 0, 1]), MEDIANA)
+    assert resultado.loc[0, "P50"] == 1.0
+    assert resultado.loc[0, "total"] == 2
+    assert resultado.loc[0, "media"] == 2.0
+
+
+def test_sin_filas():
+    vacio = np.array([], dtype=np.int64)
+    resultado = cuantiles_ponderados(vacio, vacio, CUARTILES, {"ANO4": vacio})
+    assert len(resultado) == 0
+    assert list(resultado.columns) == ["ANO4", "total", "media", "P25", "P50", "P75"]
@@ -0,0 +1,89 @@
+import shutil
+from pathlib import Path
+import pytest
+import cache_columnas
+import indice_hogares
+import funcionalidad as fu
+from indice_periodos import agrupar_por_periodo
+
+# Muestra chica de hogares y personas procesados (dos trimestres, seis aglomerados), con las
+# columnas que usan los incisos
+DATOS = Path(__file__).resolve().parent / "datos"
+
+# Respuestas a los input de los incisos que piden datos, en el orden en que se piden
+ENTRADAS = {2: ["1", "2020"], 9: ["13"], 10: ["13", "32"], 11: ["2020"], 13: ["2020"]}
+
+# Función de consola de cada inciso, que lo ejecuta por separado
+FUNCIONES = {
+    1: lambda hogar, individual: fu.porcentaje_alfabetizacion(individual),
+    2: lambda hogar, individual: fu.porcentaje_inmigrantes_academicos(individual),
+    3: lambda hogar, individual: fu.menor_desocupacion_anio_trim(individual),
+    4: lambda hogar, individual: fu.top_5_aglomerados_universitarios(hogar, individual),
+    5: lambda hogar, individual: fu.porcentaje_aglomerados_propietarios(hogar),
+    6: lambda hogar, individual: fu.viviendas_esp(hogar),
+    7: lambda hogar, individual: fu.porc_aglo_estudios(individual),
+    8: lambda hogar, individual: fu.imprimir_region_inquilinos(hogar),
+    9: lambda hogar, individual: fu.imprimir_formacion_por_aglomerado(individual),
+    10: lambda hogar, individual: fu.comparacion_dos_aglomerados(individual),
+    11: lambda hogar, individual: fu.algomerado_material_precario(hogar),
+    12: lambda hogar, individual: fu.jubilados_habitabilidad_insuficiente(hogar, individual),
+    13: lambda hogar, individual: fu.cantidad_universitarios_en_vivienda_insuficiente_en_anio(individual, hogar),
+}
+
+
+@pytest.fixture(params=["sin_indices", "con_indices"])
+def archivos(request, tmp_path, monkeypatch):
+    """
+    Copia la muestra a una carpeta temporal y devuelve (hogares, personas). Con 'con_indices' se arman
+    además el índice de períodos, el índice de hogares y la caché de columnas, para que los incisos
+    tomen los caminos que los usan.
+    """
+
+    monkeypatch.setattr(cache_columnas, "CACHE_COLUMNAS_PATH", tmp_path / "columnas")
+    monkeypatch.setattr(indice_hogares, "INDICE_HOGARES_PATH", tmp_path / "hogares")
+    hogar = tmp_path / "hogar_procesado.csv"
+    individual = tmp_path / "individual_procesado.csv"
+    shutil.copy(DATOS / hogar.name, hogar)
+    shutil.copy(DATOS / individual.name, individual)
+    if request.param == "con_indices":
+        for archivo in (hogar, individual):
+            agrupar_por_periodo(archivo)
+            cache_columnas.escribir_cache(archivo)
+        indice_hogares.escribir_indice_hogares(hogar)
+    return hogar, individual
+
+
+def ejecutar(llamada, entradas, monkeypatch, capsys):
+    """ Ejecuta llamada respondiendo los input con entradas y devuelve (resultado, lo impreso). """
+
+    respuestas = iter(entradas)
+    monkeypatch.setattr("builtins.input", lambda mensaje="": next(respuestas))
+    resultado = llamada()
+    return resultado, capsys.readouterr().out
+
+
+@pytest.mark.parametrize("inciso", sorted(FUNCIONES))
+def test_cada_inciso_igual_a_su_funcion(inciso, archivos, monkeypatch, capsys):
+    hogar, individual = archivos
+    entradas = ENTRADAS.get(inciso, [])
+    _, esperado = ejecutar(lambda: FUNCIONES[inciso](hogar, individual), entradas, monkeypatch, capsys)
+    _, salida = ejecutar(lambda: fu.ejecutar_incisos([inciso], hogar, individual), entradas, monkeypatch, capsys)
+    assert salida == esperado
+    assert "Error" not in salida and "inexistente" not in salida
+
+
+def test_todos_los_incisos_juntos(archivos, monkeypatch, capsys):
+    hogar, individual = archivos
+    esperado = ""
+    for inciso in sorted(FUNCIONES):
+        esperado += ejecutar(lambda: FUNCIONES[inciso](hogar, individual), ENTRADAS.get(inciso, []),
+                             monkeypatch, capsys)[1]
+    top_5, _ = ejecutar(lambda: fu.top_5_aglomerados_universitarios(hogar, individual, ok=True), [],
+                        monkeypatch, capsys)
+
+    entradas = [respuesta for inciso in sorted(ENTRADAS) for respuesta in ENTRADAS[inciso]]
+    resultados, salida = ejecutar(lambda: fu.ejecutar_incisos(None, hogar, individual), entradas, monkeypatch, capsys)
+
+    # Juntos, los incisos imprimen en otro orden (primero los de hogares), pero lo mismo
+    assert sorted(salida.splitlines()) == sorted(esperado.splitlines())
+    assert resultados[4] == top_5
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from tasas import DESOCUPADO, OCUPADO, OTRO, codigos_condicion, codigos_estado, tasas_laborales
+
+
+def tasas_expandidas(df):
+    """
+    Tasas calculadas a mano: cada persona se repite tantas veces como su peso
+    y se cuentan ocupados, desocupados y población de cada grupo.
+    """
+
+    filas = []
+    for (anio, aglomerado), grupo in df.groupby(["ANO4", "AGLOMERADO"]):
+        condiciones = np.repeat(grupo["CONDICION"].to_numpy(), grupo["PESO"].to_numpy())
+        ocupados = int((condiciones == OCUPADO).sum())
+        desocupados = int((condiciones == DESOCUPADO).sum())
+        activos = ocupados + desocupados
+        filas.append({
+            "ANO4": anio, "AGLOMERADO": aglomerado, "ocupados": ocupados, "desocupados": desocupados,
+            "poblacion": len(condiciones), "activos": activos,
+            "empleo": ocupados / activos * 100 if activos else 0,
+            "desempleo": desocupados / activos * 100 if activos else 0,
+            "actividad": activos / len(condiciones) * 100 if len(condiciones) else 0,
+        })
+    return pd.DataFrame(filas)
+
+
+def test_igual_a_expandir_los_pesos():
+    generador = np.random.default_rng(0)
+    cantidad = 500
+    df = pd.DataFrame({
+        "ANO4": generador.choice([2020, 2021], cantidad),
+        "AGLOMERADO": generador.choice([2, 13, 33], cantidad),
+        "CONDICION": generador.choice([OTRO, OCUPADO, DESOCUPADO], cantidad),
+        "PESO": generador.choice([0, 1, 3, 70], cantidad),
+    })
+    # Un grupo sin peso y otro sin activos: sus tasas son 0
+    df.loc[(df["ANO4"] == 2021) & (df["AGLOMERADO"] == 2), "PESO"] = 0
+    df.loc[(df["ANO4"] == 2021) & (df["AGLOMERADO"] == 13), "CONDICION"] = OTRO
+
+    resultado = tasas_laborales(df["CONDICION"].to_numpy(), df["PESO"].to_numpy(),
+                                {"ANO4": df["ANO4"].to_numpy(), "AGLOMERADO": df["AGLOMERADO"].to_numpy()})
+    pd.testing.assert_frame_equal(resultado, tasas_expandidas(df), check_dtype=False)
+
+
+def test_un_solo_grupo_sin_activos():
+    resultado = tasas_laborales(np.array([OTRO, OTRO]), np.array([5, 0]))
+    assert resultado.loc[0, ["ocupados", "desocupados", "poblacion"]].tolist() == [0, 0, 5]
+    assert resultado.loc[0, ["empleo", "desempleo", "actividad"]].tolist() == [0, 0, 0]
+
+
+def test_codigos():
+    assert codigos_estado([1, 2, 3, 4, 0]).tolist() == [OCUPADO, DESOCUPADO, OTRO, OTRO, OTRO]
+    textos = ["Ocupado Autónomo.", "Ocupado dependiente.", "Desocupado.", "Inactivo.", "", None, np.nan]
+    assert codigos_condicion(textos).tolist() == [OCUPADO, OCUPADO, DESOCUPADO, OTRO, OTRO, OTRO, OTRO]
+    # Con las categorías de la caché de columnas los valores ya vienen codificados
+    assert codigos_condicion([1, 0, 1], ["Desocupado.", "Ocupado dependiente."]).tolist() == [OCUPADO, DESOCUPADO, OCUPADO]
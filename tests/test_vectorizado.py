@@ -0,0 +1,76 @@
+import csv
+import io
+import pytest
+from procesamiento import procesar_archivo, procesar_individuos, procesar_hogares
+from vectorizado import a_dataframe, procesar_individuos_columnar, procesar_hogares_columnar
+
+# Archivos unificados chicos con los casos difíciles: códigos vacíos, filas con columnas de menos,
+# separadores y saltos de línea dentro de campos entre comillas y valores fuera de las tablas
+INDIVIDUOS = (
+    "CODUSU;ANO4;TRIMESTRE;NRO_HOGAR;COMPONENTE;AGLOMERADO;PONDERA;CH04;CH06;NIVEL_ED;ESTADO;CAT_OCUP;OBS\n"
+    '"TQRMNOPX1";2020;1;1;1;33;120;1;35;6;1;1;texto\n'
+    '"TQRMNOPX1";2020;1;1;2;33;120;2;17;3;3;0;"con ; separador"\n'
+    '"TQRMNOPX2";2020;1;1;1;13;90;;;;;;\n'
+    '"TQRMNOPX3";2020;1;1;1;13;90;9;-1;7;0;9;"línea\npartida"\n'
+    '"TQRMNOPX4";2020;1;1;1;13;90;2;abc;9;2;\n'
+    '"TQRMNOPX5";2020;2;1;1;32;75;1\n'
+    '"TQRMNOPX6";2020;2;1;1;32;75;1;18;5;4;3;"comillas ""dobles"""\n'
+    '"TQRMNOPX7";2020;2;1;1;32;75;2;99;2;1;4;x\n'
+    '"TQRMNOPX8";2020;2;1;1;32;75;1; 40;4;1;2;x\n'
+    '"TQRMNOPX9";2020;2;1;1;32;75;2;50;1;1;9;x\n'
+)
+
+HOGARES = (
+    "CODUSU;ANO4;TRIMESTRE;NRO_HOGAR;AGLOMERADO;PONDERA;IX_TOT;V4;IV2;IV6;IV7;IV8;IV9;IV11;OBS\n"
+    '"TQRMNOPX1";2020;1;1;33;120;1;1;1;1;1;1;1;1;texto\n'
+    '"TQRMNOPX2";2020;1;1;33;120;3; 5;2;2;1;2;1;1;"con ; separador"\n'
+    '"TQRMNOPX3";2020;1;1;13;90;6;9;0;3;4;1;3;4;\n'
+    '"TQRMNOPX4";2020;1;1;13;90;;;;;;;;;\n'
+    '"TQRMNOPX5";2020;1;1;13;90;2;x;abc;1;3;1;2;2;"línea\npartida"\n'
+    '"TQRMNOPX6";2020;2;1;32;75;4;7;1;2;3;1;2;1\n'
+    '"TQRMNOPX7";2020;2;1;32;75;5;2;2;1;2;1;1;4;x\n'
+    '"TQRMNOPX8";2020;2;1;32;75;2\n'
+    '"TQRMNOPX9";2020;2;1;32;75;3;4;3;2;4;1;1;1;"comillas ""dobles"""\n'
+)
+
+CASOS = [("I", INDIVIDUOS), ("H", HOGARES)]
+
+
+def procesar(texto, indicator, motor, tamanio_bloque):
+    """ Procesa un archivo unificado en memoria y devuelve el CSV procesado. """
+
+    procesado = io.StringIO(newline="")
+    procesar_archivo(io.StringIO(texto, newline=""), procesado, indicator, motor, tamanio_bloque)
+    return procesado.getvalue()
+
+
+@pytest.mark.parametrize("indicator, texto", CASOS, ids=["I", "H"])
+@pytest.mark.parametrize("tamanio_bloque", [1, 2, 1000])
+def test_motor_columnar_escribe_el_mismo_archivo(indicator, texto, tamanio_bloque):
+    esperado = procesar(texto, indicator, "filas", tamanio_bloque)
+    assert procesar(texto, indicator, "columnar", tamanio_bloque) == esperado
+
+
+@pytest.mark.parametrize("indicator, texto", CASOS, ids=["I", "H"])
+def test_motor_columnar_sobre_un_archivo_ya_procesado(indicator, texto):
+    procesado = procesar(texto, indicator, "filas", 1000)
+    assert procesar(procesado, indicator, "columnar", 3) == procesar(procesado, indicator, "filas", 1000)
+
+
+@pytest.mark.parametrize("indicator, texto, procesar_filas, procesar_columnas", [
+    ("I", INDIVIDUOS, procesar_individuos, procesar_individuos_columnar),
+    ("H", HOGARES, procesar_hogares, procesar_hogares_columnar),
+], ids=["I", "H"])
+def test_columnas_nuevas_por_bloque(indicator, texto, procesar_filas, procesar_columnas):
+    columnas = texto.split("\n", 1)[0].split(";")
+    cuerpo = texto.split("\n", 1)[1]
+    registros = [dict(zip(columnas, campos + [""] * (len(columnas) - len(campos))))
+                 for campos in csv.reader(io.StringIO(cuerpo), delimiter=";")]
+    bloque = a_dataframe(cuerpo, columnas)
+
+    procesar_filas(registros)
+    procesar_columnas(bloque)
+
+    for col in set(registros[0]) - set(columnas):
+        esperado = ["" if registro[col] is None else registro[col] for registro in registros]
+        assert list(bloque[col]) == esperado, col